@@ -0,0 +1,172 @@
+import base64
+import json
+import logging
+import threading
+import time
+import uuid
+import requests
+import streamlit as st
+from decouple import config
+from api.client import BASE_URL, get_client
+
+
+# Configuração básica de logging
+logging.basicConfig(level=logging.INFO)
+
+# Antecedência, em segundos, com que o token de acesso é renovado antes de expirar
+TOKEN_REFRESH_MARGIN = config('TOKEN_REFRESH_MARGIN', default=60, cast=int)
+
+REFRESH_URL = f'{BASE_URL}authentication/token/refresh/'
+
+
+def token_expiry(token):
+    """
+    Instante de expiração (claim `exp`) de um JWT, sem validar a assinatura.
+
+    Returns:
+        float: Timestamp de expiração, ou None se o token não for um JWT.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenPair:
+    """
+    Tokens JWT de uma sessão (acesso e renovação).
+
+    Pode ser renovado por qualquer thread (carga concorrente, 401 durante
+    uma requisição); renovações simultâneas resultam em uma só chamada à API.
+    `owner` identifica o login a que os tokens pertencem (ex.: no outbox).
+    """
+
+    def __init__(self, access, refresh=None, owner=None):
+        self.access = access
+        self.refresh = refresh
+        self.owner = owner or uuid.uuid4().hex
+        self.__set_expiry()
+        self.__lock = threading.Lock()
+
+    def __set_expiry(self):
+        self.expires_at = token_expiry(self.access)
+        self.lifetime = self.expires_at - time.time() if self.expires_at is not None else None
+
+    def expiring(self, margin=TOKEN_REFRESH_MARGIN) -> bool:
+        """Se o token de acesso expira dentro de `margin` segundos."""
+        if self.expires_at is None:
+            return False
+        # Tokens de vida curta são renovados na metade da validade, não a cada uso
+        return self.expires_at - time.time() <= min(margin, self.lifetime / 2)
+
+    def renew(self, stale=None) -> bool:
+        """
+        Obtém um novo token de acesso com o token de renovação.
+
+        Args:
+            stale (str): Token que motivou a renovação; se outra thread já o
+                substituiu, nada é feito.
+
+        Returns:
+            bool: True se há um token de acesso novo.
+        """
+        with self.__lock:
+            if stale is not None and stale != self.access:
+                return True
+            if not self.refresh:
+                return False
+            try:
+                response = get_client().post(REFRESH_URL, json={'refresh': self.refresh})
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Erro ao renovar o token: {e}")
+                return False
+            if response.status_code != 200:
+                logging.warning(f"Renovação do token recusada. Status code: {response.status_code}")
+                return False
+            data = response.json()
+            self.access = data['access']
+            # Com rotação de tokens a API devolve também um novo token de renovação
+            self.refresh = data.get('refresh', self.refresh)
+            self.__set_expiry()
+            logging.info("Token de acesso renovado.")
+            return True
+
+
+class BearerAuth(requests.auth.AuthBase):
+    """
+    Autenticação Bearer com o token atual do TokenPair.
+
+    Uma resposta 401 dispara a renovação do token e a requisição é repetida
+    uma única vez; se a renovação falhar, o 401 original é devolvido.
+    """
+
+    def __init__(self, tokens: TokenPair):
+        self.tokens = tokens
+
+    def __call__(self, request):
+        request.headers['Authorization'] = f'Bearer {self.tokens.access}'
+        request.register_hook('response', self.__retry_on_401)
+        return request
+
+    def __retry_on_401(self, response, **kwargs):
+        if response.status_code != 401:
+            return response
+        stale = response.request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not self.tokens.renew(stale):
+            return response
+
+        logging.info(f"Repetindo {response.request.method} {response.request.url} com o token renovado.")
+        response.content  # Libera a conexão para reuso
+        response.close()
+        prepared = response.request.copy()
+        prepared.headers['Authorization'] = f'Bearer {self.tokens.access}'
+        prepared.deregister_hook('response', self.__retry_on_401)
+        retried = response.connection.send(prepared, **kwargs)
+        retried.history.append(response)
+        retried.request = prepared
+        return retried
+
+
+def start_session(response: dict, username: str = None):
+    """
+    Guarda na sessão os tokens devolvidos pelo login.
+
+    O usuário identifica o dono dos tokens, para que envios pendentes de um
+    login anterior (ex.: no outbox) sejam retomados com os tokens novos.
+    """
+    st.session_state.auth_tokens = TokenPair(response['access'], response.get('refresh'), owner=username)
+    st.session_state.token = response['access']
+
+
+def get_auth() -> BearerAuth:
+    """
+    Autenticação da sessão, renovando o token de acesso antes de expirar.
+
+    Também mantém `st.session_state.token` igual ao token atual, inclusive
+    após renovações feitas por outras threads.
+
+    Returns:
+        BearerAuth: Para o argumento `auth` das requisições.
+    """
+    tokens = st.session_state.get('auth_tokens')
+    if tokens is None:
+        # Sessão sem token de renovação (ex.: token definido diretamente)
+        tokens = TokenPair(st.session_state.token)
+        st.session_state.auth_tokens = tokens
+    if tokens.expiring():
+        tokens.renew(tokens.access)
+    st.session_state.token = tokens.access
+    return BearerAuth(tokens)
+
+
+def expire_session():
+    """
+    Encerra apenas a autenticação da sessão.
+
+    Os dados em cache na sessão (resultados, produtos, tabelas) são
+    mantidos e reaproveitados após o novo login.
+    """
+    st.session_state.pop('token', None)
+    st.session_state.pop('auth_tokens', None)
@@ -0,0 +1,128 @@
+import logging
+import threading
+import streamlit as st
+from api.store import get_store
+
+
+# Configuração básica de logging
+logging.basicConfig(level=logging.INFO)
+
+# Registros do cache em disco (EntityStore) descartados junto com cada entidade.
+# Os resultados em disco não entram: são sincronizados de forma incremental
+# pelo ResultService, e descartá-los forçaria uma recarga completa.
+STORE_ENTRIES = {
+    'results': (),
+    'products': ('products',),
+    'samples': ('samples', 'sample_stats'),
+    'assemblies': ('assemblies',),
+}
+
+
+class EntityCache:
+    """
+    Cache das entidades (results, products, samples, assemblies) em duas
+    camadas, com um namespace por entidade.
+
+    Camada compartilhada (processo): uma versão por entidade, passada como
+    argumento às funções com `st.cache_data` dos repositórios. Uma gravação
+    muda a versão da entidade, de modo que só as entradas dela deixam de ser
+    usadas, e descarta seus registros no cache em disco.
+
+    Camada da sessão: a cópia em `st.session_state[entidade]`, a versão
+    compartilhada da qual ela veio e uma versão local, que muda a cada
+    alteração da cópia (tabelas, índices e figuras derivados a usam).
+    """
+
+    def __init__(self, store=None):
+        self.__store = store or get_store()
+        self.__versions = {}
+        self.__lock = threading.Lock()
+
+    def version(self, entity) -> int:
+        """Versão compartilhada da entidade (chave do st.cache_data)."""
+        with self.__lock:
+            return self.__versions.get(entity, 0)
+
+    def invalidate(self, entity) -> int:
+        """
+        Marca a entidade como alterada na API para todas as sessões.
+
+        Returns:
+            int: Nova versão compartilhada.
+        """
+        with self.__lock:
+            version = self.__versions[entity] = self.__versions.get(entity, 0) + 1
+        for name in STORE_ENTRIES.get(entity, (entity,)):
+            self.__store.invalidate(name)
+        logging.info(f"Cache de '{entity}' invalidado (versão {version}).")
+        return version
+
+    # --- Camada da sessão ---
+
+    def is_current(self, entity) -> bool:
+        """Se a cópia da sessão já considera a última alteração compartilhada."""
+        return st.session_state.get(f'{entity}_shared_version', 0) == self.version(entity)
+
+    def mark_current(self, entity):
+        st.session_state[f'{entity}_shared_version'] = self.version(entity)
+
+    def get(self, entity):
+        """Cópia da sessão, ou None se ausente ou anterior a uma alteração de outra sessão."""
+        if entity not in st.session_state:
+            return None
+        if not self.is_current(entity):
+            logging.info(f"Cópia de '{entity}' da sessão desatualizada; recarregando.")
+            return None
+        return st.session_state[entity]
+
+    def put(self, entity, data):
+        """Guarda na sessão os dados obtidos na versão compartilhada atual."""
+        st.session_state[entity] = data
+        self.mark_current(entity)
+        self.bump(entity)
+
+    def patch(self, entity, update=None):
+        """
+        Aplica à cópia da sessão uma alteração feita por esta sessão (já
+        propagada à camada compartilhada pelo repositório), sem recarregar.
+
+        Args:
+            entity (str): Entidade.
+            update (callable): Recebe a cópia atual e devolve a nova; None
+                quando a cópia já foi alterada no lugar.
+        """
+        if entity not in st.session_state:
+            return
+        if update is not None:
+            st.session_state[entity] = update(st.session_state[entity])
+        # Se só a gravação desta sessão separa a cópia da versão atual, ela
+        # continua em dia; senão, outra sessão também gravou e a cópia é recarregada
+        if st.session_state.get(f'{entity}_shared_version', 0) == self.version(entity) - 1:
+            self.mark_current(entity)
+        self.bump(entity)
+
+    def session_version(self, entity) -> int:
+        """Versão da cópia da sessão; muda a cada alteração."""
+        return st.session_state.get(f'{entity}_version', 0)
+
+    def bump(self, entity):
+        st.session_state[f'{entity}_version'] = self.session_version(entity) + 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Retorna o cache de entidades único do processo.
+
+    Returns:
+        EntityCache: Cache compartilhado pelas sessões.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EntityCache()
+    return _cache
@@ -0,0 +1,295 @@
+import logging
+import threading
+import requests
+from concurrent.futures import Future
+from decouple import config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Configuração básica de logging
+logging.basicConfig(level=logging.INFO)
+
+# URL base da API; pode apontar para o servidor local de testes (api/stub_server.py)
+BASE_URL = config('API_BASE_URL', default='https://verdann.pythonanywhere.com/api/v1/')
+
+
+class ApiClient:
+    """
+    Cliente HTTP compartilhado por todos os repositórios.
+
+    Mantém uma única `requests.Session` com pool de conexões (keep-alive),
+    novas tentativas com backoff exponencial apenas para verbos idempotentes
+    e timeouts (conexão, leitura) definidos por verbo. GETs idênticos e com
+    a mesma credencial, em andamento ao mesmo tempo (single-flight),
+    compartilham uma só requisição.
+    """
+
+    # Timeouts no formato (conexão, leitura), em segundos
+    DEFAULT_TIMEOUTS = {
+        'GET': (3.05, 10),
+        'POST': (3.05, 15),
+        'PUT': (3.05, 15),
+        'DELETE': (3.05, 10),
+    }
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, max_retries=3,
+                 backoff_factor=0.5, timeouts=None):
+        """
+        Args:
+            pool_connections (int): Número de pools (hosts) mantidos em cache.
+            pool_maxsize (int): Máximo de conexões abertas por host.
+            max_retries (int): Número máximo de novas tentativas.
+            backoff_factor (float): Fator do backoff exponencial entre tentativas.
+            timeouts (dict): Sobrescreve os timeouts padrão por verbo.
+        """
+        self.__timeouts = {**self.DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True,  # Limita o pool em vez de abrir conexões extras
+        )
+
+        self.__session = requests.Session()
+        self.__session.mount('https://', adapter)
+        self.__session.mount('http://', adapter)
+
+        # Validadores e payload decodificado por endpoint (GET condicional)
+        self.__validators = {}
+        self.__validators_lock = threading.Lock()
+        self.__validator_hits = 0
+        self.__validator_misses = 0
+
+        # Requisições em andamento por chave (single-flight)
+        self.__inflight = {}
+        self.__inflight_lock = threading.Lock()
+        self.__flights = 0
+        self.__coalesced = 0
+
+    def request(self, method, url, **kwargs):
+        """
+        Executa uma requisição usando a sessão compartilhada.
+
+        Args:
+            method (str): Verbo HTTP.
+            url (str): URL completa do recurso.
+            **kwargs: Argumentos repassados para `requests.Session.request`.
+
+        Returns:
+            requests.Response: Resposta da API.
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.__timeouts.get(method, self.__timeouts['GET']))
+        return self.__session.request(method, url, **kwargs)
+
+    def coalesce(self, key, fetch):
+        """
+        Executa `fetch` uma única vez para chamadas simultâneas com a mesma chave.
+
+        A primeira chamada faz a requisição; as que chegarem enquanto ela
+        estiver em andamento, de qualquer sessão do processo, aguardam e
+        recebem o mesmo resultado (ou a mesma exceção). Por isso `fetch`
+        não deve ter efeitos na sessão de quem chamou (ex.: `st.error`).
+
+        Args:
+            key (hashable): Identifica o recurso (ex.: URL e parâmetros).
+            fetch (callable): Função sem argumentos que busca e decodifica.
+
+        Returns:
+            Resultado de `fetch`, compartilhado entre as chamadas agrupadas.
+        """
+        with self.__inflight_lock:
+            flight = self.__inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self.__inflight[key] = flight
+                self.__flights += 1
+            else:
+                self.__coalesced += 1
+
+        if not leader:
+            logging.info(f"Requisição agrupada a outra em andamento: {key[0]}")
+            return flight.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self.__inflight_lock:
+                del self.__inflight[key]
+
+    def get_shared(self, url, decode, **kwargs):
+        """
+        GET agrupado com outros idênticos em andamento (ver `coalesce`).
+
+        Só a resposta é compartilhada: cada chamada a decodifica com o seu
+        `decode`, recebendo um payload próprio (que pode alterar) e tratando
+        os erros (ex.: 401) na sua própria sessão.
+
+        Args:
+            url (str): URL completa do recurso.
+            decode (callable): Trata a resposta e devolve o payload.
+            **kwargs: Argumentos repassados para `requests.Session.request`.
+
+        Returns:
+            Payload decodificado.
+        """
+        response = self.coalesce(
+            self.__flight_key('GET', url, kwargs),
+            lambda: self.get(url, **kwargs),
+        )
+        return decode(response)
+
+    def get_conditional(self, url, decode, **kwargs):
+        """
+        GET condicional usando os validadores (ETag/Last-Modified) guardados
+        para o endpoint, agrupado com outros idênticos em andamento.
+
+        Em uma resposta 304 devolve o payload já decodificado da última
+        resposta 200 do endpoint, sem ler nem decodificar o corpo; esse
+        payload é compartilhado e não deve ser alterado. Nas demais
+        respostas, como em `get_shared`, cada chamada decodifica a resposta
+        com o seu `decode` (e seus efeitos na sessão).
+
+        Args:
+            url (str): URL completa do recurso.
+            decode (callable): Trata a resposta e devolve o payload
+                (normalmente o `_handle_response` do repositório).
+            **kwargs: Argumentos repassados para `requests.Session.request`.
+
+        Returns:
+            Payload decodificado.
+        """
+        key = (url, tuple(sorted((kwargs.get('params') or {}).items())))
+        response, cached = self.coalesce(
+            self.__flight_key('GET?', url, kwargs),
+            lambda: self.__get_conditional(key, url, **kwargs),
+        )
+        if cached is not None:
+            return cached
+
+        payload = decode(response)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and payload is not None and (etag or last_modified):
+            with self.__validators_lock:
+                self.__validators[key] = {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'payload': payload,
+                }
+        return payload
+
+    @staticmethod
+    def __flight_key(kind, url, kwargs):
+        # A credencial entra na chave: uma chamada nunca recebe a resposta
+        # obtida com o token de outra sessão
+        auth = kwargs.get('auth')
+        tokens = getattr(auth, 'tokens', None)
+        credential = tokens.access if tokens is not None else (kwargs.get('headers') or {}).get('Authorization')
+        return (url, kind, credential, tuple(sorted((kwargs.get('params') or {}).items())))
+
+    def __get_conditional(self, key, url, **kwargs):
+        """Requisição compartilhada: (resposta, payload guardado se 304)."""
+        headers = dict(kwargs.pop('headers', None) or {})
+        with self.__validators_lock:
+            entry = self.__validators.get(key)
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            with self.__validators_lock:
+                self.__validator_hits += 1
+            logging.info(f"304 Not Modified: {url} (payload reutilizado)")
+            return response, entry['payload']
+
+        with self.__validators_lock:
+            self.__validator_misses += 1
+        return response, None
+
+    def validator_stats(self):
+        """
+        Estatísticas das requisições condicionais, para monitoramento.
+
+        Returns:
+            dict: Acertos (304), falhas (corpo completo) e endpoints validados.
+        """
+        with self.__validators_lock:
+            return {
+                'hits': self.__validator_hits,
+                'misses': self.__validator_misses,
+                'endpoints': len(self.__validators),
+            }
+
+    def coalesce_stats(self):
+        """
+        Estatísticas do agrupamento de requisições, para monitoramento.
+
+        Returns:
+            dict: Requisições feitas, chamadas agrupadas e em andamento.
+        """
+        with self.__inflight_lock:
+            return {
+                'requests': self.__flights,
+                'coalesced': self.__coalesced,
+                'inflight': len(self.__inflight),
+            }
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """Fecha todas as conexões do pool."""
+        self.__session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Retorna o cliente HTTP único do processo, criando-o na primeira chamada.
+
+    Returns:
+        ApiClient: Cliente compartilhado.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logging.info("Criando cliente HTTP compartilhado...")
+                _client = ApiClient()
+    return _client
@@ -0,0 +1,426 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from decouple import config
+from api.auth import TokenPair
+from api.store import STORE_PATH
+
+
+# Configuração básica de logging
+logging.basicConfig(level=logging.INFO)
+
+# Registros enviados por requisição do worker
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+# Intervalo, em segundos, entre verificações da fila sem novos registros
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=5, cast=float)
+# Espera máxima, em segundos, entre novas tentativas de um registro
+OUTBOX_MAX_BACKOFF = 300
+# Tempo, em segundos, que registros sincronizados ficam no diário
+OUTBOX_RETENTION = 24 * 60 * 60
+
+# Códigos que indicam falha temporária: o registro volta para a fila
+RETRY_STATUS_CODES = (408, 429)
+
+PENDING = 'pending'
+SYNCED = 'synced'
+FAILED = 'failed'
+# Credenciais recusadas (401 após a renovação falhar): espera um novo login do dono
+NEEDS_LOGIN = 'needs_login'
+
+
+class Outbox:
+    """
+    Diário durável (SQLite) de gravações ainda não confirmadas pela API.
+
+    Cada registro é gravado com uma chave de idempotência antes de qualquer
+    envio; um worker em segundo plano envia os pendentes em lotes, com
+    backoff exponencial em falhas temporárias. Após um reinício do
+    processo os pendentes são reenviados com a mesma chave, e a API
+    descarta as duplicatas.
+
+    Cada registro guarda o login que o gravou (`TokenPair.owner`) e é
+    enviado com os tokens desse login. Só o token de acesso vai para o
+    diário, e apenas enquanto o dono tiver pendentes, para que o envio
+    continue após um reinício; o token de renovação fica só em memória.
+    Se a API recusar as credenciais, os registros esperam um novo login
+    do dono (`resume`) em vez de voltar para a fila.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.__path = path
+        self.__senders = {}
+        self.__owners = {}
+        self.__wake = threading.Event()
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__worker = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.__connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS outbox ('
+                ' key TEXT PRIMARY KEY,'
+                ' entity TEXT NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' next_attempt REAL NOT NULL,'
+                ' last_error TEXT,'
+                ' result TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' synced_at REAL,'
+                ' owner TEXT)'
+            )
+            # Diários criados antes da coluna owner
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(outbox)')}
+            if 'owner' not in columns:
+                conn.execute('ALTER TABLE outbox ADD COLUMN owner TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS outbox_due ON outbox (entity, status, next_attempt)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS outbox_owners ('
+                ' owner TEXT PRIMARY KEY,'
+                ' access TEXT NOT NULL,'
+                ' refresh TEXT)'
+            )
+            # Diários antigos guardavam também o token de renovação
+            conn.execute('UPDATE outbox_owners SET refresh = NULL WHERE refresh IS NOT NULL')
+
+    def __connect(self):
+        return sqlite3.connect(self.__path, timeout=10)
+
+    def enqueue(self, entity, items, tokens):
+        """
+        Grava os registros como pendentes e acorda o worker.
+
+        Args:
+            entity (str): Entidade de destino (ex.: 'results').
+            items (list): Payloads a enviar.
+            tokens (TokenPair): Tokens da sessão que grava; os registros
+                são enviados com eles.
+
+        Returns:
+            list: Chave de idempotência de cada registro, na mesma ordem.
+        """
+        now = time.time()
+        keys = [str(uuid.uuid4()) for _ in items]
+        with self.__lock:
+            self.__owners[tokens.owner] = tokens
+        with self.__connect() as conn:
+            self.__save_owner(conn, tokens)
+            conn.executemany(
+                'INSERT INTO outbox (key, entity, payload, status, next_attempt, created_at, owner)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(key, entity, json.dumps(item), PENDING, now, now, tokens.owner) for key, item in zip(keys, items)]
+            )
+        logging.info(f"{len(items)} registros de '{entity}' gravados no outbox.")
+        self.__wake.set()
+        return keys
+
+    def due(self, entity, limit=OUTBOX_BATCH_SIZE):
+        """Registros pendentes cujo próximo envio já venceu, por ordem de criação."""
+        with self.__connect() as conn:
+            rows = conn.execute(
+                'SELECT key, payload, attempts, owner FROM outbox'
+                ' WHERE entity = ? AND status = ? AND next_attempt <= ?'
+                ' ORDER BY created_at LIMIT ?',
+                (entity, PENDING, time.time(), limit)
+            ).fetchall()
+        return [
+            {'key': key, 'payload': json.loads(payload), 'attempts': attempts, 'owner': owner}
+            for key, payload, attempts, owner in rows
+        ]
+
+    def mark_synced(self, key, result):
+        with self.__connect() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ?, result = ?, last_error = NULL, synced_at = ? WHERE key = ?',
+                (SYNCED, json.dumps(result), time.time(), key)
+            )
+
+    def mark_retry(self, key, attempts, error):
+        delay = min(2 ** attempts, OUTBOX_MAX_BACKOFF)
+        with self.__connect() as conn:
+            conn.execute(
+                'UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE key = ?',
+                (attempts + 1, time.time() + delay, error, key)
+            )
+
+    def mark_failed(self, key, error, status=FAILED):
+        with self.__connect() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ?, last_error = ? WHERE key = ?',
+                (status, error, key)
+            )
+
+    def resume(self, tokens):
+        """
+        Devolve à fila os registros do login que esperavam novas credenciais.
+
+        Args:
+            tokens (TokenPair): Tokens do novo login do mesmo dono.
+
+        Returns:
+            int: Quantidade de registros retomados.
+        """
+        with self.__connect() as conn:
+            resumed = conn.execute(
+                'UPDATE outbox SET status = ?, next_attempt = ? WHERE owner = ? AND status = ?',
+                (PENDING, time.time(), tokens.owner, NEEDS_LOGIN)
+            ).rowcount
+            if resumed:
+                self.__save_owner(conn, tokens)
+        if resumed:
+            with self.__lock:
+                self.__owners[tokens.owner] = tokens
+            logging.info(f"{resumed} registros do outbox retomados após novo login.")
+            self.__wake.set()
+        return resumed
+
+    def entries(self, entity, keys=None, limit=50):
+        """
+        Registros mais recentes da entidade, para exibição.
+
+        Args:
+            entity (str): Entidade.
+            keys (iterable): Restringe às chaves informadas.
+            limit (int): Quantidade máxima de registros.
+
+        Returns:
+            list: Dicionários com key, payload, status, attempts, last_error,
+            result, created_at e synced_at.
+        """
+        query = 'SELECT key, payload, status, attempts, last_error, result, created_at, synced_at FROM outbox WHERE entity = ?'
+        params = [entity]
+        if keys is not None:
+            keys = list(keys)
+            query += f" AND key IN ({','.join('?' * len(keys))})"
+            params += keys
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        with self.__connect() as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+        return [
+            {
+                'key': key,
+                'payload': json.loads(payload),
+                'status': status,
+                'attempts': attempts,
+                'last_error': last_error,
+                'result': json.loads(result) if result else None,
+                'created_at': created_at,
+                'synced_at': synced_at,
+            }
+            for key, payload, status, attempts, last_error, result, created_at, synced_at in rows
+        ]
+
+    def synced_since(self, entity, since):
+        """
+        Registros confirmados pela API após `since`.
+
+        Returns:
+            tuple: (resultados devolvidos pela API, novo `since`).
+        """
+        with self.__connect() as conn:
+            rows = conn.execute(
+                'SELECT result, synced_at FROM outbox'
+                ' WHERE entity = ? AND status = ? AND synced_at > ? ORDER BY synced_at',
+                (entity, SYNCED, since)
+            ).fetchall()
+        if not rows:
+            return [], since
+        return [json.loads(result) for result, _ in rows], rows[-1][1]
+
+    def counts(self, entity):
+        """Quantidade de registros por estado (pending, synced, failed, needs_login)."""
+        with self.__connect() as conn:
+            rows = conn.execute(
+                'SELECT status, COUNT(*) FROM outbox WHERE entity = ? GROUP BY status', (entity,)
+            ).fetchall()
+        return {PENDING: 0, SYNCED: 0, FAILED: 0, NEEDS_LOGIN: 0, **dict(rows)}
+
+    def prune(self, max_age=OUTBOX_RETENTION):
+        """
+        Remove registros sincronizados há mais de `max_age` segundos e os
+        tokens de logins sem registros pendentes.
+        """
+        with self.__connect() as conn:
+            conn.execute(
+                'DELETE FROM outbox WHERE status = ? AND synced_at < ?',
+                (SYNCED, time.time() - max_age)
+            )
+            conn.execute(
+                'DELETE FROM outbox_owners WHERE owner NOT IN'
+                ' (SELECT owner FROM outbox WHERE status = ? AND owner IS NOT NULL)',
+                (PENDING,)
+            )
+            owners = {row[0] for row in conn.execute('SELECT owner FROM outbox_owners')}
+        with self.__lock:
+            for owner in set(self.__owners) - owners:
+                del self.__owners[owner]
+
+    @staticmethod
+    def __save_owner(conn, tokens):
+        conn.execute(
+            'INSERT INTO outbox_owners (owner, access) VALUES (?, ?)'
+            ' ON CONFLICT (owner) DO UPDATE SET access = excluded.access',
+            (tokens.owner, tokens.access)
+        )
+
+    def __release_owner(self, owner, tokens):
+        """
+        Após um envio: grava o token de acesso (que pode ter sido renovado)
+        se o dono ainda tem pendentes, ou esquece seus tokens se não tem.
+        """
+        with self.__connect() as conn:
+            pending = conn.execute(
+                'SELECT 1 FROM outbox WHERE owner = ? AND status = ? LIMIT 1', (owner, PENDING)
+            ).fetchone()
+            if pending:
+                self.__save_owner(conn, tokens)
+                return
+            conn.execute('DELETE FROM outbox_owners WHERE owner = ?', (owner,))
+        with self.__lock:
+            if self.__owners.get(owner) is tokens:
+                del self.__owners[owner]
+
+    def __tokens(self, owner):
+        """Tokens do login dono dos registros (lidos do diário após um reinício)."""
+        with self.__lock:
+            tokens = self.__owners.get(owner)
+        if tokens is not None or owner is None:
+            return tokens
+        with self.__connect() as conn:
+            row = conn.execute(
+                'SELECT access FROM outbox_owners WHERE owner = ?', (owner,)
+            ).fetchone()
+        if row is None:
+            return None
+        with self.__lock:
+            # Sem token de renovação: se o acesso expirar, o dono precisa entrar de novo
+            return self.__owners.setdefault(owner, TokenPair(row[0], owner=owner))
+
+    def start(self, entity, sender):
+        """
+        Registra o envio de uma entidade e inicia o worker, se necessário.
+
+        Args:
+            entity (str): Entidade.
+            sender (callable): sender(payloads, keys, tokens) -> lista de
+                {'ok', 'result', 'error', 'status'}, um por payload.
+        """
+        with self.__lock:
+            self.__senders[entity] = sender
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, name='outbox-worker', daemon=True)
+                self.__worker.start()
+
+    def flush(self):
+        """Envia um lote de cada entidade; devolve quantos registros foram tratados."""
+        with self.__lock:
+            senders = dict(self.__senders)
+        with self.__flush_lock:
+            return self.__flush(senders)
+
+    def __flush(self, senders):
+        handled = 0
+        for entity, sender in senders.items():
+            batch = self.due(entity)
+            if not batch:
+                continue
+            # Cada login envia os próprios registros, com os próprios tokens
+            by_owner = {}
+            for entry in batch:
+                by_owner.setdefault(entry['owner'], []).append(entry)
+            for owner, entries in by_owner.items():
+                self.__send(entity, sender, owner, entries)
+            handled += len(batch)
+        return handled
+
+    def __send(self, entity, sender, owner, entries):
+        tokens = self.__tokens(owner)
+        if tokens is None:
+            # Registros gravados antes da coluna owner não têm a quem esperar
+            status = FAILED if owner is None else NEEDS_LOGIN
+            for entry in entries:
+                logging.error(f"Registro {entry['key']} sem credenciais para envio.")
+                self.mark_failed(entry['key'], 'Sem credenciais para envio; faça login novamente.', status)
+            return
+
+        logging.info(f"Enviando {len(entries)} registros de '{entity}' do outbox...")
+        try:
+            outcomes = sender([e['payload'] for e in entries], [e['key'] for e in entries], tokens)
+        except Exception as e:
+            logging.error(f"Falha ao enviar o outbox de '{entity}': {e}")
+            outcomes = [{'ok': False, 'result': None, 'error': str(e), 'status': None}] * len(entries)
+        rejected_tokens = False
+        for entry, outcome in zip(entries, outcomes):
+            if outcome['ok']:
+                self.mark_synced(entry['key'], outcome['result'])
+            elif outcome.get('status') == 401:
+                # O sender já tentou renovar o token: só um novo login resolve
+                rejected_tokens = True
+                self.mark_failed(entry['key'], outcome['error'], NEEDS_LOGIN)
+            elif outcome.get('status') is None or outcome['status'] >= 500 or outcome['status'] in RETRY_STATUS_CODES:
+                self.mark_retry(entry['key'], entry['attempts'], outcome['error'])
+            else:
+                logging.error(f"Registro {entry['key']} rejeitado pela API: {outcome['error']}")
+                self.mark_failed(entry['key'], outcome['error'])
+
+        if rejected_tokens:
+            logging.warning(f"Credenciais recusadas; registros de '{entity}' aguardam novo login do dono.")
+            self.__forget_owner(owner, tokens)
+        else:
+            self.__release_owner(owner, tokens)
+
+    def __forget_owner(self, owner, tokens):
+        """Descarta os tokens recusados do dono; os pendentes esperam novo login."""
+        with self.__lock:
+            current = self.__owners.get(owner)
+        if current is not None and current is not tokens:
+            # O dono já entrou de novo durante o envio: segue com os tokens novos
+            self.resume(current)
+            return
+        with self.__connect() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ? WHERE owner = ? AND status = ?', (NEEDS_LOGIN, owner, PENDING)
+            )
+            conn.execute('DELETE FROM outbox_owners WHERE owner = ?', (owner,))
+        with self.__lock:
+            self.__owners.pop(owner, None)
+
+    def __run(self):
+        while True:
+            self.__wake.wait(OUTBOX_POLL_INTERVAL)
+            self.__wake.clear()
+            try:
+                # Lotes cheios indicam mais registros vencidos na fila
+                while self.flush() >= OUTBOX_BATCH_SIZE:
+                    pass
+                self.prune()
+            except Exception as e:
+                logging.error(f"Erro no worker do outbox: {e}")
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """
+    Retorna o outbox único do processo.
+
+    Returns:
+        Outbox: Diário de gravações compartilhado.
+    """
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = Outbox()
+    return _outbox
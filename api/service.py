@@ -1,5 +1,6 @@
 import logging
 import requests
+from api.client import BASE_URL, get_client
 
 
 # Configuração básica de logging
@@ -9,8 +10,9 @@ logging.basicConfig(level=logging.INFO)
 class Auth:
 
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
         self.__auth_url = f'{self.__base_url}authentication/token/'
+        self.__client = get_client()
 
     def get_token(self, username, password):
         """
@@ -35,10 +37,9 @@ class Auth:
 
             # Fazer requisição POST para obter o token
             logging.info("Fazendo requisição de autenticação...")
-            auth_response = requests.post(
+            auth_response = self.__client.post(
                 self.__auth_url,
-                data=auth_payload,
-                timeout=10  # Timeout de 10 segundos
+                data=auth_payload
             )
 
             # Tratar a resposta
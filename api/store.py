@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from decouple import config
+
+
+# Configuração básica de logging
+logging.basicConfig(level=logging.INFO)
+
+# Arquivo SQLite compartilhado por todas as sessões e reinícios do processo
+STORE_PATH = config('CACHE_DB_PATH', default='.cache/extracao.sqlite3')
+# Idade, em segundos, a partir da qual uma entidade é atualizada em segundo plano
+STORE_MAX_AGE = config('CACHE_MAX_AGE', default=300, cast=int)
+
+
+class EntityStore:
+    """
+    Cache persistente das entidades da API em um arquivo SQLite.
+
+    Cada entidade (products, samples, ...) é guardada como um único
+    payload JSON, com número de versão e horário da última busca.
+
+    Conjuntos grandes e sincronizados por delta (results) são guardados
+    registro a registro, por ID (ver `save_records`), para que cada
+    sincronização grave apenas o que mudou.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.__path = path
+        self.__refreshing = set()
+        self.__lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.__connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entities ('
+                ' name TEXT PRIMARY KEY,'
+                ' payload TEXT NOT NULL,'
+                ' version INTEGER NOT NULL,'
+                ' fetched_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS record_sets ('
+                ' name TEXT PRIMARY KEY,'
+                ' version INTEGER NOT NULL,'
+                ' fetched_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                ' name TEXT NOT NULL,'
+                ' id INTEGER NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' PRIMARY KEY (name, id))'
+            )
+
+    def __connect(self):
+        # Uma conexão por operação: sqlite3 não compartilha conexões entre threads
+        return sqlite3.connect(self.__path, timeout=10)
+
+    def load(self, name):
+        """
+        Lê uma entidade do disco.
+
+        Args:
+            name (str): Nome da entidade.
+
+        Returns:
+            dict: {'payload', 'version', 'fetched_at'} ou None se não existir.
+        """
+        with self.__connect() as conn:
+            row = conn.execute(
+                'SELECT payload, version, fetched_at FROM entities WHERE name = ?',
+                (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'payload': json.loads(row[0]), 'version': row[1], 'fetched_at': row[2]}
+
+    def save(self, name, payload):
+        """
+        Grava uma entidade. A versão só muda se o conteúdo mudou.
+
+        Args:
+            name (str): Nome da entidade.
+            payload: Dados serializáveis em JSON.
+
+        Returns:
+            int: Versão gravada.
+        """
+        text = json.dumps(payload, separators=(',', ':'))
+        now = time.time()
+        with self.__connect() as conn:
+            row = conn.execute(
+                'SELECT payload, version FROM entities WHERE name = ?', (name,)
+            ).fetchone()
+            if row and row[0] == text:
+                conn.execute('UPDATE entities SET fetched_at = ? WHERE name = ?', (now, name))
+                return row[1]
+            version = row[1] + 1 if row else 1
+            conn.execute(
+                'INSERT OR REPLACE INTO entities (name, payload, version, fetched_at)'
+                ' VALUES (?, ?, ?, ?)',
+                (name, text, version, now)
+            )
+        logging.info(f"Entidade '{name}' gravada no cache local (versão {version}).")
+        return version
+
+    def load_records(self, name):
+        """
+        Lê um conjunto guardado registro a registro, na ordem de inclusão.
+
+        Returns:
+            dict: {'payload' (lista), 'version', 'fetched_at'} ou None se não existir.
+        """
+        with self.__connect() as conn:
+            meta = conn.execute(
+                'SELECT version, fetched_at FROM record_sets WHERE name = ?', (name,)
+            ).fetchone()
+            if meta is None:
+                return None
+            rows = conn.execute(
+                'SELECT payload FROM records WHERE name = ? ORDER BY rowid', (name,)
+            ).fetchall()
+        return {'payload': [json.loads(row[0]) for row in rows], 'version': meta[0], 'fetched_at': meta[1]}
+
+    def replace_records(self, name, records):
+        """
+        Substitui todo o conjunto (carga completa).
+
+        Args:
+            name (str): Nome do conjunto.
+            records (list): Registros com 'id', serializáveis em JSON.
+
+        Returns:
+            int: Versão gravada.
+        """
+        with self.__connect() as conn:
+            conn.execute('DELETE FROM records WHERE name = ?', (name,))
+            # Formato anterior (um único payload) deixa de ser usado
+            conn.execute('DELETE FROM entities WHERE name = ?', (name,))
+            self.__write_records(conn, name, records)
+            version = self.__touch_records(conn, name)
+        logging.info(f"Conjunto '{name}' gravado no cache local: {len(records)} registros (versão {version}).")
+        return version
+
+    def save_records(self, name, changed=(), deleted_ids=()):
+        """
+        Grava apenas os registros alterados e remove os excluídos, em uma
+        única transação; os demais registros não são reescritos.
+
+        Args:
+            name (str): Nome do conjunto.
+            changed (iterable): Registros criados ou alterados (com 'id').
+            deleted_ids (iterable): IDs dos registros excluídos.
+
+        Returns:
+            int: Versão gravada.
+        """
+        changed, deleted_ids = list(changed), list(deleted_ids)
+        with self.__connect() as conn:
+            self.__write_records(conn, name, changed)
+            conn.executemany(
+                'DELETE FROM records WHERE name = ? AND id = ?',
+                [(name, record_id) for record_id in deleted_ids]
+            )
+            version = self.__touch_records(conn, name, bump=bool(changed or deleted_ids))
+        if changed or deleted_ids:
+            logging.info(
+                f"Conjunto '{name}' atualizado no cache local: {len(changed)} gravados, "
+                f"{len(deleted_ids)} removidos (versão {version})."
+            )
+        return version
+
+    @staticmethod
+    def __write_records(conn, name, records):
+        # Upsert mantém o rowid (e portanto a ordem) dos registros existentes
+        conn.executemany(
+            'INSERT INTO records (name, id, payload) VALUES (?, ?, ?)'
+            ' ON CONFLICT (name, id) DO UPDATE SET payload = excluded.payload',
+            [(name, record['id'], json.dumps(record, separators=(',', ':'))) for record in records]
+        )
+
+    @staticmethod
+    def __touch_records(conn, name, bump=True):
+        row = conn.execute('SELECT version FROM record_sets WHERE name = ?', (name,)).fetchone()
+        version = (row[0] if row else 0) + (1 if bump or row is None else 0)
+        conn.execute(
+            'INSERT OR REPLACE INTO record_sets (name, version, fetched_at) VALUES (?, ?, ?)',
+            (name, version, time.time())
+        )
+        return version
+
+    def invalidate(self, name):
+        """Remove a entidade do disco, forçando nova busca na próxima leitura."""
+        with self.__connect() as conn:
+            conn.execute('DELETE FROM entities WHERE name = ?', (name,))
+            conn.execute('DELETE FROM records WHERE name = ?', (name,))
+            conn.execute('DELETE FROM record_sets WHERE name = ?', (name,))
+        logging.info(f"Entidade '{name}' removida do cache local.")
+
+    def read_through(self, name, fetch, max_age=STORE_MAX_AGE):
+        """
+        Lê a entidade do disco, buscando na API apenas se ela não existir.
+
+        Se o registro local estiver mais velho que `max_age`, ele é devolvido
+        mesmo assim e uma atualização é disparada em segundo plano.
+
+        Args:
+            name (str): Nome da entidade.
+            fetch (callable): Busca o payload na API; não deve usar `st.*`.
+                Retornar None indica falha e nada é gravado.
+            max_age (float): Idade máxima, em segundos, antes da atualização.
+
+        Returns:
+            Payload da entidade.
+        """
+        entry = self.load(name)
+        if entry is None:
+            logging.info(f"Entidade '{name}' ausente no cache local; buscando na API...")
+            payload = fetch()
+            if payload is not None:
+                self.save(name, payload)
+            return payload
+
+        if time.time() - entry['fetched_at'] >= max_age:
+            self.refresh_in_background(name, fetch)
+        return entry['payload']
+
+    def refresh_in_background(self, name, fetch):
+        """Atualiza a entidade em uma thread, sem duplicar atualizações em curso."""
+        with self.__lock:
+            if name in self.__refreshing:
+                return
+            self.__refreshing.add(name)
+
+        def refresh():
+            try:
+                payload = fetch()
+                if payload is not None:
+                    self.save(name, payload)
+            except Exception as e:
+                logging.error(f"Erro ao atualizar '{name}' em segundo plano: {e}")
+            finally:
+                with self.__lock:
+                    self.__refreshing.discard(name)
+
+        threading.Thread(target=refresh, name=f'store-refresh-{name}', daemon=True).start()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Retorna o cache persistente único do processo.
+
+    Returns:
+        EntityStore: Cache compartilhado.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EntityStore()
+    return _store
@@ -0,0 +1,398 @@
+"""
+Servidor local que imita a API de Extração para testes offline.
+
+Uso:
+    python -m api.stub_server --port 8000 --results 5000
+    API_BASE_URL=http://127.0.0.1:8000/api/v1/ streamlit run app.py
+
+Com --no-pushdown o servidor não anuncia filtros nem agregações, para
+exercitar a avaliação local das consultas; com --no-bulk não aceita
+cadastro de resultados em lote.
+
+Qualquer usuário/senha não vazios são aceitos no login. Os tokens são JWTs
+sem assinatura válida, com expiração (`exp`) de --token-ttl segundos para o
+token de acesso; POST authentication/token/refresh/ emite um novo token de
+acesso. Tokens que não são JWT (ex.: em testes) continuam aceitos.
+"""
+import argparse
+import base64
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+from flask import Flask, abort, jsonify, request
+
+
+logging.basicConfig(level=logging.INFO)
+
+PREFIX = '/api/v1'
+PART_NUMBERS = ['IM-10001', 'IM-10002', 'IM-20001-A', 'IM-30005']
+SAMPLE_TYPES = ['centragem', 'cone']
+SAMPLE_SIDES = ['direito', 'esquerdo']
+RESULT_FILTERS = ['part_number', 'sample_type', 'production_batch', 'sample_side']
+AGGREGATES = {
+    'count': len,
+    'sum': sum,
+    'avg': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _iso(value):
+    return value.isoformat().replace('+00:00', 'Z')
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+
+
+def make_token(token_type, ttl):
+    """JWT sem assinatura válida, suficiente para exercitar a expiração."""
+    header = {'alg': 'HS256', 'typ': 'JWT'}
+    payload = {'token_type': token_type, 'exp': int(time.time() + ttl), 'jti': uuid.uuid4().hex}
+    return f'{_b64(header)}.{_b64(payload)}.stub'
+
+
+def read_token(token):
+    """Payload de um token emitido por `make_token`, ou None se não for um JWT."""
+    try:
+        payload = token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return None
+
+
+class StubDatabase:
+    """Armazena as entidades em memória, protegidas por um lock."""
+
+    def __init__(self, results=1000, seed=42):
+        self.lock = threading.Lock()
+        rng = random.Random(seed)
+        now = _now()
+
+        self.products = [
+            {'id': i, 'part_number': pn, 'project': rng.choice(['GM', 'VW', 'ONIX'])}
+            for i, pn in enumerate(PART_NUMBERS, start=1)
+        ]
+        self.assemblies = [{'id': i, 'name': f'Montagem {i}'} for i in range(1, 4)]
+        self.samples = [
+            {
+                'id': i,
+                'assembly': rng.choice(self.assemblies)['id'],
+                'products': [rng.choice(self.products)['id']],
+                'created_at': _iso(now - timedelta(days=rng.randint(0, 30))),
+            }
+            for i in range(1, 21)
+        ]
+        self.results = {}
+        for i in range(1, results + 1):
+            taken = now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+            self.results[i] = self._build_result(i, {
+                'sample': rng.choice(self.samples)['id'],
+                'force_N': round(rng.uniform(400, 900), 1),
+                'result_percentage': round(rng.uniform(0, 100), 1),
+                'comment': rng.choice(['', '', '', 'Rebarba', 'Reteste']),
+                'sample_type': rng.choice(SAMPLE_TYPES),
+                'sample_side': rng.choice(SAMPLE_SIDES),
+                'production_batch': f'L{rng.randint(1, 40):03d}',
+                'sample_taken_datetime': _iso(taken),
+                'sample_extraction_datetime': _iso(taken + timedelta(minutes=30)),
+            }, updated_at=taken + timedelta(minutes=30))
+        self.next_result_id = results + 1
+        # Chave de idempotência -> ID do resultado criado com ela
+        self.idempotency_keys = {}
+
+    def _build_result(self, result_id, data, updated_at=None):
+        product = self.products[(data.get('sample') or 1) % len(self.products)]
+        return {
+            **data,
+            'id': result_id,
+            'product_id': product['id'],
+            'product': {'id': product['id'], 'part_number': product['part_number']},
+            'updated_at': _iso(updated_at or _now()),
+        }
+
+    def create_result(self, data, key=None):
+        """Cria o resultado; com uma chave já usada, devolve o existente.
+
+        Returns:
+            tuple: (resultado, criado)
+        """
+        with self.lock:
+            if key and key in self.idempotency_keys:
+                return self.results.get(self.idempotency_keys[key]), False
+            result = self._build_result(self.next_result_id, data)
+            self.results[result['id']] = result
+            self.next_result_id += 1
+            if key:
+                self.idempotency_keys[key] = result['id']
+            return result, True
+
+    def update_result(self, result_id, data):
+        with self.lock:
+            if result_id not in self.results:
+                return None
+            current = {k: v for k, v in self.results[result_id].items() if k not in ('id', 'product', 'product_id', 'updated_at')}
+            result = self._build_result(result_id, {**current, **data})
+            self.results[result_id] = result
+            return result
+
+    def delete_result(self, result_id):
+        with self.lock:
+            return self.results.pop(result_id, None) is not None
+
+
+def _paginate(items):
+    """Pagina como o PageNumberPagination do DRF; sem `page`, devolve a lista."""
+    if 'page' not in request.args:
+        return jsonify(items)
+    page = int(request.args.get('page', 1))
+    page_size = int(request.args.get('page_size', 100))
+    start = (page - 1) * page_size
+    has_next = start + page_size < len(items)
+    return jsonify({
+        'count': len(items),
+        'next': f'{request.base_url}?{_query(page=page + 1)}' if has_next else None,
+        'previous': f'{request.base_url}?{_query(page=page - 1)}' if page > 1 else None,
+        'results': items[start:start + page_size],
+    })
+
+
+def _conditional(payload):
+    """Responde com ETag e devolve 304 quando o cliente já tem a versão atual."""
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def _query(**overrides):
+    return urlencode({**request.args.to_dict(), **overrides})
+
+
+def _filter_results(results):
+    """Aplica os filtros `<campo>=v1,v2` da consulta."""
+    for field in RESULT_FILTERS:
+        if field not in request.args:
+            continue
+        accepted = set(request.args[field].split(','))
+        if field == 'part_number':
+            results = [r for r in results if r['product']['part_number'] in accepted]
+        else:
+            results = [r for r in results if str(r.get(field)) in accepted]
+    return results
+
+
+def _project(results):
+    """Mantém apenas os campos de `fields=a,b`, se informado."""
+    if 'fields' not in request.args:
+        return results
+    fields = request.args['fields'].split(',')
+    return [{f: r[f] for f in fields if f in r} for r in results]
+
+
+def _aggregate(results):
+    """Calcula `aggregate=avg:force_N,count` sobre os resultados."""
+    values = {}
+    for spec in request.args.get('aggregate', 'count').split(','):
+        function, _, field = spec.partition(':')
+        if function not in AGGREGATES:
+            abort(400)
+        if function == 'count':
+            values[spec] = len(results)
+            continue
+        numbers = [float(r[field]) for r in results if r.get(field) is not None]
+        values[spec] = AGGREGATES[function](numbers) if numbers else None
+    return values
+
+
+def create_app(db=None, pushdown=True, bulk=True, token_ttl=300, refresh_ttl=24 * 60 * 60):
+    """
+    Cria a aplicação Flask do servidor local.
+
+    Args:
+        db (StubDatabase): Base em memória; uma nova é criada se omitida.
+        pushdown (bool): Se False, ignora filtros, projeção e agregações,
+            como uma API que não os suporta.
+        bulk (bool): Se False, não expõe o cadastro em lote de resultados.
+        token_ttl (int): Validade, em segundos, dos tokens de acesso.
+        refresh_ttl (int): Validade, em segundos, dos tokens de renovação.
+
+    Returns:
+        Flask: Aplicação pronta para `app.run()` ou `app.test_client()`.
+    """
+    app = Flask(__name__)
+    app.config['db'] = db = db or StubDatabase()
+
+    @app.before_request
+    def check_token():
+        if request.path.startswith(f'{PREFIX}/authentication/'):
+            return None
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer '):
+            return jsonify({'detail': 'As credenciais de autenticação não foram fornecidas.'}), 401
+        payload = read_token(authorization.removeprefix('Bearer '))
+        if payload is not None and (payload.get('token_type') != 'access' or payload.get('exp', 0) <= time.time()):
+            return jsonify({'detail': 'O token informado não é válido para qualquer tipo de token',
+                            'code': 'token_not_valid'}), 401
+        return None
+
+    @app.post(f'{PREFIX}/authentication/token/')
+    def token():
+        if not request.form.get('username') or not request.form.get('password'):
+            return jsonify({'detail': 'Credenciais inválidas'}), 401
+        return jsonify({'access': make_token('access', token_ttl), 'refresh': make_token('refresh', refresh_ttl)})
+
+    @app.post(f'{PREFIX}/authentication/token/refresh/')
+    def refresh_token():
+        payload = read_token((request.get_json(silent=True) or request.form).get('refresh') or '')
+        if payload is None or payload.get('token_type') != 'refresh' or payload.get('exp', 0) <= time.time():
+            return jsonify({'detail': 'O token informado não é válido para qualquer tipo de token',
+                            'code': 'token_not_valid'}), 401
+        return jsonify({'access': make_token('access', token_ttl)})
+
+    @app.get(f'{PREFIX}/results/')
+    def list_results():
+        with db.lock:
+            results = sorted(db.results.values(), key=lambda r: r['id'])
+        if updated_after := request.args.get('updated_after'):
+            results = [r for r in results if r['updated_at'] > updated_after]
+        if id_after := request.args.get('id_after'):
+            results = [r for r in results if r['id'] > int(id_after)]
+        if pushdown:
+            results = _project(_filter_results(results))
+        return _paginate(results)
+
+    @app.get(f'{PREFIX}/results/capabilities/')
+    def result_capabilities():
+        if not pushdown:
+            abort(404)
+        return jsonify({'filters': RESULT_FILTERS, 'fields': True, 'aggregates': list(AGGREGATES)})
+
+    @app.get(f'{PREFIX}/results/aggregate/')
+    def aggregate_results():
+        if not pushdown:
+            abort(404)
+        with db.lock:
+            results = list(db.results.values())
+        return jsonify(_aggregate(_filter_results(results)))
+
+    @app.get(f'{PREFIX}/results/ids/')
+    def list_result_ids():
+        with db.lock:
+            return jsonify(sorted(db.results))
+
+    @app.post(f'{PREFIX}/results/')
+    def create_result():
+        result, created = db.create_result(request.get_json(), request.headers.get('Idempotency-Key'))
+        return jsonify(result), 201 if created else 200
+
+    @app.post(f'{PREFIX}/results/bulk/')
+    def bulk_create_results():
+        if not bulk:
+            abort(404)
+        items = request.get_json()
+        if not isinstance(items, list):
+            return jsonify({'detail': 'Esperada uma lista de resultados.'}), 400
+        outcomes = []
+        for item in items:
+            key = item.pop('idempotency_key', None)
+            missing = [f for f in ('sample', 'force_N', 'result_percentage') if item.get(f) is None]
+            if missing:
+                outcomes.append({'status': 400, 'errors': {f: ['Campo obrigatório.'] for f in missing}})
+            else:
+                result, created = db.create_result(item, key)
+                outcomes.append({'status': 201 if created else 200, 'result': result})
+        return jsonify(outcomes)
+
+    @app.route(f'{PREFIX}/results/<int:result_id>/', methods=['GET', 'PUT', 'DELETE'])
+    def result_detail(result_id):
+        if request.method == 'DELETE':
+            if not db.delete_result(result_id):
+                abort(404)
+            return '', 204
+        if request.method == 'PUT':
+            result = db.update_result(result_id, request.get_json())
+        else:
+            result = db.results.get(result_id)
+        if result is None:
+            abort(404)
+        return jsonify(result)
+
+    @app.get(f'{PREFIX}/products/')
+    def list_products():
+        return _conditional(db.products)
+
+    @app.post(f'{PREFIX}/products/')
+    def create_product():
+        with db.lock:
+            product = {**request.get_json(), 'id': max((p['id'] for p in db.products), default=0) + 1}
+            db.products.append(product)
+        return jsonify(product), 201
+
+    @app.route(f'{PREFIX}/products/<int:product_id>/', methods=['PUT', 'DELETE'])
+    def product_detail(product_id):
+        with db.lock:
+            product = next((p for p in db.products if p['id'] == product_id), None)
+            if product is None:
+                abort(404)
+            if request.method == 'DELETE':
+                db.products.remove(product)
+                return '', 204
+            product.update(request.get_json(), id=product_id)
+        return jsonify(product)
+
+    @app.get(f'{PREFIX}/assembly/')
+    def list_assemblies():
+        return _conditional(db.assemblies)
+
+    @app.post(f'{PREFIX}/assembly/')
+    def create_assembly():
+        with db.lock:
+            assembly = {**request.get_json(), 'id': len(db.assemblies) + 1}
+            db.assemblies.append(assembly)
+        return jsonify(assembly), 201
+
+    @app.get(f'{PREFIX}/samples/')
+    def list_samples():
+        return _conditional(db.samples)
+
+    @app.get(f'{PREFIX}/samples/stats/')
+    def sample_stats():
+        week_ago = _iso(_now() - timedelta(days=7))
+        return _conditional({
+            'total_samples': len(db.samples),
+            'last_week_samples': sum(1 for s in db.samples if s['created_at'] >= week_ago),
+        })
+
+    @app.post(f'{PREFIX}/samples/')
+    def create_sample():
+        with db.lock:
+            sample = {**request.get_json(), 'id': len(db.samples) + 1, 'created_at': _iso(_now())}
+            db.samples.append(sample)
+        return jsonify(sample), 201
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local da API de Extração')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--results', type=int, default=1000, help='Quantidade de resultados gerados')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-pushdown', action='store_true', help='Desativa filtros e agregações no servidor')
+    parser.add_argument('--no-bulk', action='store_true', help='Desativa o cadastro de resultados em lote')
+    parser.add_argument('--token-ttl', type=int, default=300, help='Validade, em segundos, do token de acesso')
+    args = parser.parse_args()
+    db = StubDatabase(results=args.results, seed=args.seed)
+    create_app(
+        db, pushdown=not args.no_pushdown, bulk=not args.no_bulk, token_ttl=args.token_ttl
+    ).run(port=args.port, threaded=True)
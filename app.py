@@ -1,8 +1,10 @@
 # app.py
 import streamlit as st
 from home.page import show_home
+from home.warmup import cancel_warmup, start_catalog_warmup
 from login.page import show_login
 from results.page import show_results
+from results.repository import start_outbox
 
 # Configuração DEVE ser a PRIMEIRA instrução Streamlit
 st.set_page_config(
@@ -12,6 +14,11 @@ st.set_page_config(
 )
 
 def main():
+    # Catálogos compartilhados aquecidos uma vez por processo (WARMUP_ON_START)
+    start_catalog_warmup()
+    # Envios pendentes de execuções anteriores seguem sem esperar um login
+    start_outbox()
+
     if 'token' not in st.session_state:
         show_login()
     else:
@@ -24,6 +31,7 @@ def main():
             )
             
             if st.button('Logout', use_container_width=True):
+                cancel_warmup()
                 st.session_state.clear()
                 st.rerun()
 
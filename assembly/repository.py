@@ -1,34 +1,42 @@
 import logging
-import requests
 import streamlit as st
+from api.auth import expire_session, get_auth
+from api.cache import get_cache
+from api.client import BASE_URL, get_client
+from api.store import get_store
 
 logging.basicConfig(level=logging.INFO)
 
 class AssemblyRepository:
 
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
+        self.__client = get_client()
+        self.__store = get_store()
+        self.__cache = get_cache()
         self.__assemblies_url = f'{self.__base_url}assembly/'
         
         if 'token' not in st.session_state:
             logging.error("Token de autorização não encontrado.")
             raise Exception("Token de autorização não encontrado.")
             
-        self.__headers = {
-            'Authorization': f'Bearer {st.session_state.token}'
-        }
+        # Token renovado antes de expirar; em 401 a requisição é repetida uma vez
+        self.__auth = get_auth()
+
+    def get_assemblies(self):
+        """Obtém as montagens (cache compartilhado por versão da entidade)"""
+        return self.__get_assemblies(self.__cache.version('assemblies'))
 
     @st.cache_data(ttl=300, hash_funcs={type('AssemblyRepository', (), {}): lambda _: None})
-    def get_assemblies(_self):
-        """Obtém as montagens da API"""
+    def __get_assemblies(_self, version):
+        """Obtém as montagens (cache local atualizado em segundo plano)"""
         try:
             logging.info(f"GET {_self.__assemblies_url}")
-            response = requests.get(_self.__assemblies_url, headers=_self.__headers, timeout=10)
-            result = _self._handle_response(response)
+            result = _self.__store.read_through('assemblies', _self.__fetch_assemblies)
             
             if result is None:
                 st.error("Sessão expirada. Faça login novamente.")
-                st.session_state.clear()
+                expire_session()
                 st.rerun()
                 
             return result
@@ -38,6 +46,14 @@ class AssemblyRepository:
 
     # ... (demais métodos permanecem iguais)
     
+    def __fetch_assemblies(self):
+        """Busca as montagens na API (usado também pela atualização em segundo plano)"""
+        return self.__client.get_conditional(
+            self.__assemblies_url,
+            self._handle_response,
+            auth=self.__auth
+        )
+
     def _handle_response(self, response):
         """Trata a resposta da API"""
         if response.status_code in (200, 201):
@@ -51,18 +67,15 @@ class AssemblyRepository:
         response.raise_for_status()
 
     def create_assembly(self, assembly_data):
-        """Cria uma nova montagem e limpa o cache"""
+        """Cria uma nova montagem e invalida apenas o cache de montagens"""
         try:
-            response = requests.post(
+            response = self.__client.post(
                 self.__assemblies_url,
-                headers=self.__headers,
-                json=assembly_data,
-                timeout=10
+                auth=self.__auth,
+                json=assembly_data
             )
             result = self._handle_response(response)
-            
-            # Limpar cache do método get_assemblies
-            st.cache_data.clear()  # 👈 Limpa todo o cache
+            self.__cache.invalidate('assemblies')
             return result
         except Exception as e:
             logging.error(f"Erro ao criar montagem: {e}")
@@ -72,20 +85,22 @@ class AssemblyRepository:
     def update_assembly(self, assembly_id, updated_data):
         """Atualiza uma montagem existente"""
         url = f"{self.__assemblies_url}{assembly_id}/"
-        response = requests.put(
+        response = self.__client.put(
             url,
-            headers=self.__headers,
-            json=updated_data,
-            timeout=10
+            auth=self.__auth,
+            json=updated_data
         )
-        return self._handle_response(response)
+        result = self._handle_response(response)
+        self.__cache.invalidate('assemblies')
+        return result
 
     def delete_assembly(self, assembly_id):
         """Exclui uma montagem"""
         url = f"{self.__assemblies_url}{assembly_id}/"
-        response = requests.delete(
+        response = self.__client.delete(
             url,
-            headers=self.__headers,
-            timeout=10
+            auth=self.__auth
         )
-        return self._handle_response(response)
\ No newline at end of file
+        result = self._handle_response(response)
+        self.__cache.invalidate('assemblies')
+        return result
\ No newline at end of file
@@ -1,5 +1,6 @@
 import logging
 import streamlit as st
+from api.cache import get_cache
 from assembly.repository import AssemblyRepository
 
 
@@ -11,6 +12,7 @@ class AssemblyService:
 
     def __init__(self):
         self.assembly_repository = AssemblyRepository()
+        self.__cache = get_cache()
 
     def get_assemblies(self):
         """
@@ -19,9 +21,10 @@ class AssemblyService:
         Returns:
             list: Lista de montagens.
         """
-        if 'assemblies' in st.session_state:
+        assemblies = self.__cache.get('assemblies')
+        if assemblies is not None:
             logging.info("Montagens carregadas do cache.")
-            return st.session_state.assemblies
+            return assemblies
         try:
             logging.info("Buscando montagens na API...")
             assemblies = self.assembly_repository.get_assemblies()
@@ -29,7 +32,7 @@ class AssemblyService:
             logging.error(f"Erro ao obter montagens: {e}")
             st.error(f"Erro ao obter montagens: {e}")
             return []
-        st.session_state.assemblies = assemblies
+        self.__cache.put('assemblies', assemblies)
         logging.info(f"{len(assemblies)} montagens carregadas e armazenadas no cache.")
         return assemblies
 
@@ -59,10 +62,8 @@ class AssemblyService:
             st.error(f"Erro ao criar montagem: {e}")
             return None
 
-        # Inicializar o estado de sessão se necessário
-        if 'assemblies' not in st.session_state:
-            st.session_state.assemblies = []
-        st.session_state.assemblies.append(new_assembly)
+        # Atualiza a cópia da sessão sem recarregar (o repositório já invalidou a compartilhada)
+        self.__cache.patch('assemblies', lambda assemblies: assemblies + [new_assembly])
         logging.info("Nova montagem criada e adicionada ao cache.")
         return new_assembly
 
@@ -106,11 +107,10 @@ class AssemblyService:
             return None
 
         # Atualizar o cache
-        if 'assemblies' in st.session_state:
-            st.session_state.assemblies = [
-                updated_assembly if assembly['id'] == assembly_id else assembly
-                for assembly in st.session_state.assemblies
-            ]
+        self.__cache.patch('assemblies', lambda assemblies: [
+            updated_assembly if assembly['id'] == assembly_id else assembly
+            for assembly in assemblies
+        ])
         logging.info("Montagem atualizada e cache atualizado.")
         return updated_assembly
 
@@ -139,9 +139,8 @@ class AssemblyService:
             return False
 
         # Atualizar o cache
-        if 'assemblies' in st.session_state:
-            st.session_state.assemblies = [
-                assembly for assembly in st.session_state.assemblies if assembly['id'] != assembly_id
-            ]
+        self.__cache.patch('assemblies', lambda assemblies: [
+            assembly for assembly in assemblies if assembly['id'] != assembly_id
+        ])
         logging.info("Montagem excluída e cache atualizado.")
         return success
\ No newline at end of file
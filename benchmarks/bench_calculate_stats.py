@@ -0,0 +1,99 @@
+"""
+Compara o calculate_stats original (laços em Python sobre a lista de
+dicionários) com a versão vetorizada sobre o ResultFrame.
+
+Uso:
+    python -m benchmarks.bench_calculate_stats --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+from results.frame import ResultFrame
+from results.stats import calculate_stats
+
+
+def make_results(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'force_N': round(rng.uniform(400, 900), 1),
+            'result_percentage': round(rng.uniform(0, 100), 1),
+            'comment': rng.choice(['', '', '', 'Rebarba']),
+            'sample_type': rng.choice(['centragem', 'cone']),
+            'sample_side': rng.choice(['direito', 'esquerdo']),
+            'production_batch': f'L{rng.randint(1, 200):03d}',
+            'part_number': f'IM-{rng.randint(10000, 10040)}',
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_calculate_stats(results):
+    """Implementação anterior, mantida aqui apenas como referência."""
+    stats = {
+        'total': len(results),
+        'results_by_type': [],
+        'force_stats': {'average': 0, 'max': 0, 'min': 0},
+        'percentage_stats': {'average': 0, 'max': 0, 'min': 0},
+        'sample_counts': {'centragem': 0, 'cone': 0},
+        'comment_count': 0
+    }
+    type_counter = {}
+    force_values = []
+    percentage_values = []
+    for result in results:
+        sample_type = result.get('sample_type', 'Não especificado')
+        type_counter[sample_type] = type_counter.get(sample_type, 0) + 1
+        if (force := result.get('force_N')) is not None:
+            force_values.append(force)
+            stats['sample_counts'][sample_type] += 1
+        if (percentage := result.get('result_percentage')) is not None:
+            percentage_values.append(percentage)
+        if result.get('comment'):
+            stats['comment_count'] += 1
+    if force_values:
+        stats['force_stats'] = {'average': sum(force_values)/len(force_values), 'max': max(force_values), 'min': min(force_values)}
+    if percentage_values:
+        stats['percentage_stats'] = {'average': sum(percentage_values)/len(percentage_values), 'max': max(percentage_values), 'min': min(percentage_values)}
+    stats['results_by_type'] = [{'type': k, 'count': v} for k, v in type_counter.items()]
+    for sample_type in ['centragem', 'cone']:
+        filtered = [r for r in results if r.get('sample_type') == sample_type]
+        force_list = [r['force_N'] for r in filtered if 'force_N' in r]
+        percent_list = [r['result_percentage'] for r in filtered if 'result_percentage' in r]
+        stats[f'average_force_{sample_type}'] = sum(force_list)/len(force_list) if force_list else 0
+        stats[f'average_percentage_{sample_type}'] = sum(percent_list)/len(percent_list) if percent_list else 0
+    return stats
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'original (s)':>14} {'vetorizado (s)':>15} {'speedup':>8} {'frame (s)':>10}")
+    for n in args.sizes:
+        results = make_results(n)
+        legacy_time, legacy = best_of(lambda: legacy_calculate_stats(results), args.repeat)
+        frame_time, frame = best_of(lambda: ResultFrame.from_records(results), 1)
+        new_time, new = best_of(lambda: calculate_stats(frame), args.repeat)
+
+        assert new['total'] == legacy['total']
+        assert new['comment_count'] == legacy['comment_count']
+        assert abs(new['force_stats']['average'] - legacy['force_stats']['average']) < 0.05
+
+        print(f"{n:>10} {legacy_time:>14.4f} {new_time:>15.4f} {legacy_time / new_time:>7.1f}x {frame_time:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
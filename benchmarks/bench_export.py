@@ -0,0 +1,99 @@
+"""
+Compara o download original (CSV inteiro montado em memória a cada
+renderização) com a exportação em blocos para arquivo, em tempo e pico de
+memória residente (RSS), que inclui as alocações em C do pyarrow e dos
+writers de Excel, invisíveis ao tracemalloc.
+
+Uso:
+    python -m benchmarks.bench_export --sizes 10000 100000 1000000
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import os
+import resource
+import tempfile
+import threading
+import time
+import pyarrow as pa
+from benchmarks.bench_calculate_stats import make_results
+from results.export import WRITERS, available_formats
+from results.frame import ResultFrame
+
+
+def legacy_csv(df, path):
+    """Implementação anterior: o CSV inteiro como bytes em memória."""
+    data = df.to_csv(index=False).encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def rss():
+    """Memória residente atual do processo, em bytes."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # Sem /proc (ex.: macOS) resta o pico do processo, em bytes no macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def release_memory():
+    """Devolve ao sistema a memória livre retida pelos alocadores."""
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    libc = ctypes.util.find_library('c')
+    if libc and hasattr(ctypes.CDLL(libc), 'malloc_trim'):
+        ctypes.CDLL(libc).malloc_trim(0)
+
+
+def measure(func, interval=0.005):
+    """Tempo e pico de RSS acima do início, amostrado em outra thread."""
+    # Sem isso o alocador reaproveita páginas já residentes e o pico some
+    release_memory()
+    baseline = rss()
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(interval):
+            peak = max(peak, rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        func()
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    peak = max(peak, rss())
+    return elapsed, (peak - baseline) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    writers = {'csv (original)': legacy_csv}
+    writers.update({fmt: WRITERS[fmt] for fmt in available_formats()})
+
+    print(f"{'linhas':>10} {'formato':>16} {'tempo (s)':>10} {'pico (MiB)':>11} {'arquivo (MiB)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.sizes:
+            df = ResultFrame.from_records(make_results(n)).df
+            for name, writer in writers.items():
+                path = os.path.join(directory, 'export')
+                elapsed, peak = measure(lambda: writer(df, path))
+                size = os.path.getsize(path) / 2 ** 20 if os.path.exists(path) else 0
+                print(f"{n:>10} {name:>16} {elapsed:>10.3f} {peak:>11.1f} {size:>14.1f}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import logging
+import time
+import pandas as pd
+import streamlit as st
+
+
+logging.basicConfig(level=logging.INFO)
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DisplayTable:
+    """
+    Tabela de exibição de uma entidade: campos aninhados achatados, datas
+    convertidas e já formatadas e colunas em ordem estável (alfabética,
+    independente da ordem das chaves nos registros).
+
+    É construída uma vez por versão dos dados; a seleção de colunas da
+    página é só uma projeção sobre ela.
+    """
+
+    def __init__(self, records: list, version=None, datetime_columns=()):
+        started = time.perf_counter()
+        df = pd.json_normalize(records) if records else pd.DataFrame()
+        df = df[sorted(df.columns)]
+
+        # Datas convertidas uma única vez; a coluna exibida recebe o texto formatado
+        self.timestamps = {}
+        for column in datetime_columns:
+            if column in df.columns:
+                parsed = pd.to_datetime(df[column], errors='coerce', format='ISO8601')
+                self.timestamps[column] = parsed
+                df[column] = parsed.dt.strftime(DATETIME_FORMAT)
+
+        self.frame = df
+        self.version = version
+        self.__projection = None
+        logging.info(
+            f"Tabela de exibição construída: {len(df)} linhas, {len(df.columns)} colunas "
+            f"em {time.perf_counter() - started:.2f}s."
+        )
+
+    @property
+    def columns(self) -> list:
+        return list(self.frame.columns)
+
+    def project(self, columns) -> pd.DataFrame:
+        """Colunas selecionadas, na ordem pedida; a última projeção é reaproveitada."""
+        columns = tuple(c for c in columns if c in self.frame.columns)
+        if self.__projection is None or self.__projection[0] != columns:
+            self.__projection = (columns, self.frame[list(columns)])
+        return self.__projection[1]
+
+
+def display_table(entity: str, version, load, datetime_columns=()) -> DisplayTable:
+    """
+    Tabela de exibição da entidade guardada na sessão, refeita apenas
+    quando a versão dos dados muda (cadastro, edição, exclusão ou recarga).
+
+    Args:
+        entity (str): Nome da entidade (ex.: 'results').
+        version (int): Versão atual dos dados da entidade.
+        load (callable): Devolve os registros; só é chamado ao reconstruir.
+        datetime_columns (iterable): Colunas de data a converter e formatar.
+    """
+    tables = st.session_state.setdefault('display_tables', {})
+    table = tables.get(entity)
+    if table is None or table.version != version:
+        table = DisplayTable(load(), version, datetime_columns)
+        tables[entity] = table
+    return table
@@ -0,0 +1,80 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def sort_order(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Posições das linhas ordenadas pela coluna (ordenação estável, ausentes no fim)."""
+    series = df[column]
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+        # NaN já vai para o fim no argsort
+        return np.argsort(series.to_numpy(), kind='stable')
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+    else:
+        # Texto com None, tipos misturados, datas ou inteiros anuláveis: códigos
+        # densos como em server_grid, comparando como texto se preciso
+        try:
+            codes, _ = pd.factorize(series, sort=True)
+        except TypeError:
+            codes, _ = pd.factorize(series.astype('string'), sort=True)
+    # Ausentes (-1) depois de todos os valores
+    return np.argsort(np.where(codes < 0, len(series), codes), kind='stable')
+
+
+def paged_table(df: pd.DataFrame, key: str, search=None, cache=None, gradient_columns=(), column_config=None):
+    """
+    Tabela paginada: ordena, busca e fatia no servidor e envia ao navegador
+    (e estiliza) apenas a página visível.
+
+    Args:
+        df (pandas.DataFrame): Linhas a exibir.
+        key (str): Prefixo das chaves dos widgets.
+        search (callable): search(texto) -> rótulos do índice de `df` que
+            atendem à busca (ex.: `ResultIndex.search`); None oculta a busca.
+        cache: Objeto com `derived(nome, build)` (ex.: FilteredView) para
+            guardar as ordenações já calculadas.
+        gradient_columns (iterable): Colunas numéricas com gradiente de cor,
+            na escala da coluna inteira e não só da página.
+        column_config (dict): Repassado a `st.dataframe`.
+    """
+    col_search, col_sort, col_dir, col_size = st.columns([3, 2, 1, 1])
+    text = col_search.text_input('Buscar', key=f'{key}_search', placeholder='Peça, tipo, lote ou lado') if search else ''
+    sort_by = col_sort.selectbox('Ordenar por', ['(original)'] + list(df.columns), key=f'{key}_sort')
+    descending = col_dir.toggle('Decrescente', key=f'{key}_desc')
+    page_size = col_size.selectbox('Linhas', PAGE_SIZES, key=f'{key}_size')
+
+    # Posições (iloc) das linhas na ordem escolhida
+    if sort_by == '(original)':
+        positions = np.arange(len(df))
+    elif cache is not None:
+        positions = cache.derived(f'sort:{sort_by}', lambda d: sort_order(d, sort_by))
+    else:
+        positions = sort_order(df, sort_by)
+    if descending:
+        positions = positions[::-1]
+    if text.strip():
+        matches = np.isin(df.index.to_numpy(), search(text))
+        positions = positions[matches[positions]]
+
+    pages = max(math.ceil(len(positions) / page_size), 1)
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = 1
+    page = st.number_input(f'Página (de {pages})', min_value=1, max_value=pages, key=f'{key}_page')
+    start = (page - 1) * page_size
+    page_df = df.iloc[positions[start:start + page_size]]
+
+    styler = page_df.style
+    for column in gradient_columns:
+        if column in page_df.columns:
+            full = df[column]
+            styler = styler.background_gradient(cmap='Blues', subset=[column], vmin=full.min(), vmax=full.max())
+    st.dataframe(styler, use_container_width=True, column_config=column_config)
+    st.caption(
+        f"Linhas {start + 1 if len(positions) else 0}–{start + len(page_df)} de {len(positions)}"
+        + (f" (busca em {len(df)})" if text.strip() else '')
+    )
@@ -0,0 +1,240 @@
+import json
+import logging
+import math
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
+
+
+logging.basicConfig(level=logging.INFO)
+
+BLOCK_SIZES = (50, 100, 250, 500)
+# Consultas (ordenação + filtros) guardadas por fonte
+GRID_QUERY_CACHE_ENTRIES = 8
+
+
+def _text_mask(series, condition):
+    text = series.astype('string').str.lower()
+    value = str(condition.get('filter') or '').lower()
+    kind = condition.get('type', 'contains')
+    if kind == 'contains':
+        return text.str.contains(value, regex=False)
+    if kind == 'notContains':
+        return ~text.str.contains(value, regex=False)
+    if kind == 'equals':
+        return text == value
+    if kind == 'notEqual':
+        return text != value
+    if kind == 'startsWith':
+        return text.str.startswith(value)
+    if kind == 'endsWith':
+        return text.str.endswith(value)
+    return None
+
+
+def _range_mask(values, kind, low, high):
+    if kind == 'equals':
+        return values == low
+    if kind == 'notEqual':
+        return values != low
+    if kind == 'lessThan':
+        return values < low
+    if kind == 'lessThanOrEqual':
+        return values <= low
+    if kind == 'greaterThan':
+        return values > low
+    if kind == 'greaterThanOrEqual':
+        return values >= low
+    if kind == 'inRange':
+        return (values >= low) & (values <= high)
+    return None
+
+
+def _number_mask(series, condition):
+    values = pd.to_numeric(series, errors='coerce')
+    return _range_mask(values, condition.get('type'), condition.get('filter'), condition.get('filterTo'))
+
+
+def _date_mask(series, condition):
+    # O filtro de datas do AG Grid compara apenas o dia
+    values = pd.to_datetime(series, errors='coerce')
+    if getattr(values.dt, 'tz', None) is not None:
+        values = values.dt.tz_localize(None)
+    values = values.dt.normalize()
+    low = pd.to_datetime(condition.get('dateFrom'), errors='coerce')
+    high = pd.to_datetime(condition.get('dateTo'), errors='coerce')
+    return _range_mask(values, condition.get('type'), low, high)
+
+
+def condition_mask(series: pd.Series, condition: dict):
+    """
+    Máscara de uma condição do modelo de filtros do AG Grid.
+
+    Suporta os filtros de texto, número, data e conjunto (set), inclusive
+    condições combinadas com AND/OR; filtros desconhecidos são ignorados.
+
+    Returns:
+        numpy.ndarray: Máscara booleana, ou None se a condição for ignorada.
+    """
+    if 'conditions' in condition:
+        masks = [m for m in (condition_mask(series, c) for c in condition['conditions']) if m is not None]
+        if not masks:
+            return None
+        combine = np.logical_or if condition.get('operator') == 'OR' else np.logical_and
+        return combine.reduce(masks)
+
+    kind = condition.get('type')
+    if kind == 'blank':
+        return series.isna().to_numpy() | (series.astype('string') == '').fillna(True).to_numpy()
+    if kind == 'notBlank':
+        return ~condition_mask(series, {'type': 'blank'})
+
+    filter_type = condition.get('filterType')
+    if filter_type == 'set':
+        return series.astype('string').isin([str(v) for v in condition.get('values', [])]).to_numpy()
+    mask = {'text': _text_mask, 'number': _number_mask, 'date': _date_mask}.get(filter_type)
+    if mask is None:
+        logging.warning(f"Filtro '{filter_type}' não suportado na grade; ignorado.")
+        return None
+    result = mask(series, condition)
+    return None if result is None else result.fillna(False).to_numpy(dtype=bool)
+
+
+class GridSource:
+    """
+    Linhas de uma grade paginada no servidor.
+
+    Guarda as chaves de ordenação de cada coluna e as últimas consultas
+    (ordenação e filtros), de modo que trocar de página só fatia posições
+    já calculadas.
+    """
+
+    def __init__(self, df: pd.DataFrame, version=None, max_queries=GRID_QUERY_CACHE_ENTRIES):
+        self.df = df
+        self.version = version
+        self.max_queries = max_queries
+        self.__sort_keys = {}
+        self.__queries = OrderedDict()
+
+    def sort_key(self, column) -> np.ndarray:
+        """Códigos densos da coluna, na ordem dos valores (ausentes primeiro)."""
+        if column not in self.__sort_keys:
+            series = self.df[column]
+            try:
+                codes, _ = pd.factorize(series, sort=True)
+            except TypeError:
+                # Colunas com tipos misturados são ordenadas como texto
+                codes, _ = pd.factorize(series.astype('string'), sort=True)
+            self.__sort_keys[column] = codes
+        return self.__sort_keys[column]
+
+    def filter_mask(self, filter_model: dict) -> np.ndarray:
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, condition in filter_model.items():
+            if column not in self.df.columns:
+                continue
+            column_mask = condition_mask(self.df[column], condition)
+            if column_mask is not None:
+                mask &= column_mask
+        return mask
+
+    def positions(self, sort_model: list, filter_model: dict) -> np.ndarray:
+        """
+        Posições (iloc) das linhas que atendem aos filtros, na ordem pedida.
+
+        Args:
+            sort_model (list): `sortModel` do AG Grid ([{'colId', 'sort'}]).
+            filter_model (dict): `filterModel` do AG Grid, por coluna.
+        """
+        sort_model = [s for s in sort_model if s.get('colId') in self.df.columns]
+        query = json.dumps([sort_model, filter_model], sort_keys=True, default=str)
+        positions = self.__queries.get(query)
+        if positions is not None:
+            self.__queries.move_to_end(query)
+            return positions
+
+        positions = np.flatnonzero(self.filter_mask(filter_model)) if filter_model else np.arange(len(self.df))
+        if sort_model:
+            # lexsort usa a última chave como principal; em ordem decrescente
+            # os ausentes (-1) vão para o fim, como no AG Grid
+            keys = [
+                -(self.sort_key(s['colId'])[positions] + 1) if s.get('sort') == 'desc' else self.sort_key(s['colId'])[positions]
+                for s in reversed(sort_model)
+            ]
+            positions = positions[np.lexsort(keys)]
+
+        self.__queries[query] = positions
+        while len(self.__queries) > self.max_queries:
+            self.__queries.popitem(last=False)
+        return positions
+
+
+def grid_source(df: pd.DataFrame, key: str, version=None) -> GridSource:
+    """Fonte da grade guardada na sessão enquanto a versão dos dados não mudar."""
+    source = st.session_state.get(f'{key}_source')
+    if source is None or version is None or source.version != version or list(source.df.columns) != list(df.columns):
+        source = GridSource(df, version)
+        st.session_state[f'{key}_source'] = source
+    return source
+
+
+def server_grid(df: pd.DataFrame, key: str, version=None, configure=None, **grid_args):
+    """
+    AgGrid paginada no servidor: ordenação e filtros feitos na grade são
+    devolvidos ao Python, aplicados sobre o DataFrame em memória, e só o
+    bloco da página atual é enviado ao navegador.
+
+    Args:
+        df (pandas.DataFrame): Todas as linhas.
+        key (str): Chave da grade e prefixo dos demais widgets.
+        version (int): Versão dos dados; com ela, ordenações e filtros já
+            calculados são reaproveitados entre reexecuções.
+        configure (callable): Recebe o GridOptionsBuilder para ajustes
+            (ex.: barra lateral, filtros de colunas).
+        **grid_args: Repassados a `AgGrid`.
+
+    Returns:
+        AgGridReturn: Resposta da grade.
+    """
+    source = grid_source(df, key, version)
+
+    # Estado enviado pela grade na última interação (ordenação e filtros)
+    response = st.session_state.get(key)
+    state = (response.get('gridState') if isinstance(response, dict) else None) or {}
+    sort_model = state.get('sort', {}).get('sortModel', [])
+    filter_model = state.get('filter', {}).get('filterModel', {})
+    positions = source.positions(sort_model, filter_model)
+
+    col_size, col_page = st.columns([1, 3])
+    block_size = col_size.selectbox('Linhas', BLOCK_SIZES, key=f'{key}_size')
+    pages = max(math.ceil(len(positions) / block_size), 1)
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = 1
+    page = col_page.number_input(f'Página (de {pages})', min_value=1, max_value=pages, key=f'{key}_page')
+    start = (page - 1) * block_size
+    block = df.iloc[positions[start:start + block_size]]
+
+    builder = GridOptionsBuilder.from_dataframe(df.iloc[:0])
+    builder.configure_default_column(sortable=True, filterable=True, resizable=True)
+    if configure is not None:
+        configure(builder)
+    grid_options = builder.build()
+    # A paginação é feita aqui; a grade só mostra o bloco recebido
+    grid_options['pagination'] = False
+    grid_options['initialState'] = {name: state[name] for name in ('sort', 'filter') if name in state}
+
+    grid = AgGrid(
+        data=block,
+        gridOptions=grid_options,
+        update_mode=GridUpdateMode.SORTING_CHANGED | GridUpdateMode.FILTERING_CHANGED,
+        data_return_mode=DataReturnMode.AS_INPUT,
+        key=key,
+        **grid_args,
+    )
+    st.caption(
+        f"Linhas {start + 1 if len(positions) else 0}–{start + len(block)} de {len(positions)}"
+        + (f" (filtradas de {len(df)})" if len(positions) != len(df) else '')
+    )
+    return grid
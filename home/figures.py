@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from collections import OrderedDict
+from home.scatter import build_scatter, scatter_mode
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Quantidade máxima de figuras guardadas por sessão
+FIGURE_CACHE_MAX_ENTRIES = 24
+
+
+class FigureCache:
+    """
+    Cache LRU das figuras Plotly do dashboard.
+
+    A chave é (tipo da figura, chave da visão filtrada); como a chave da
+    visão inclui a versão dos dados, uma figura só é refeita quando os
+    dados ou os filtros que a alimentam mudam. Pode ser usado ao mesmo
+    tempo pela página e pelo aquecimento da sessão.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__figures = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_or_build(self, kind, key, build):
+        """
+        Devolve a figura em cache ou a constrói e guarda.
+
+        Args:
+            kind (str): Tipo da figura (ex.: 'scatter').
+            key (hashable): Chave dos dados de entrada (ver `FilteredView.key`).
+            build (callable): Função sem argumentos que monta a figura.
+
+        Returns:
+            plotly.graph_objects.Figure: Figura pronta para exibição.
+        """
+        cache_key = (kind, key)
+        with self.__lock:
+            figure = self.__figures.get(cache_key)
+            if figure is not None:
+                self.hits += 1
+                self.__figures.move_to_end(cache_key)
+                return figure
+            self.misses += 1
+
+        # Construída fora do lock: uma figura lenta não bloqueia as demais
+        started = time.perf_counter()
+        figure = build()
+        logging.info(f"Figura '{kind}' construída em {time.perf_counter() - started:.2f}s.")
+        with self.__lock:
+            self.__figures[cache_key] = figure
+            self.__figures.move_to_end(cache_key)
+            while len(self.__figures) > self.max_entries:
+                self.__figures.popitem(last=False)
+        return figure
+
+    def stats(self) -> dict:
+        """Acertos, falhas e número de figuras guardadas."""
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses, 'figures': len(self.__figures)}
+
+
+def cached_figure(kind, view, build):
+    """
+    Figura da visão filtrada, construída apenas uma vez por versão dos
+    dados e seleção de filtros.
+
+    Args:
+        kind (str): Tipo da figura.
+        view (FilteredView): Visão que alimenta a figura.
+        build (callable): Recebe o DataFrame da visão e devolve a figura.
+    """
+    if view.key is None:
+        return build(view.frame.df)
+    if 'home_figures' not in st.session_state:
+        st.session_state.home_figures = FigureCache()
+    return st.session_state.home_figures.get_or_build(kind, view.key, lambda: build(view.frame.df))
+
+
+def line_figure(view):
+    """Evolução da força média por lote e tipo de amostra."""
+    return px.line(
+        view.derived('force_by_batch', lambda d: d.groupby(['sample_type', 'production_batch'], observed=True).mean(numeric_only=True).reset_index()),
+        x='production_batch',
+        y='force_N',
+        color='sample_type',
+        markers=True,
+        title="Evolução da Força por Lote e Tipo",
+        labels={
+            "force_N": "Força (N)",
+            "production_batch": "Lote de Produção"
+        }
+    )
+
+
+def treemap_figure(view):
+    """Proporção de resultados por tipo de amostra."""
+    return px.treemap(
+        pd.DataFrame(view.stats['results_by_type']),
+        path=['type'],
+        values='count',
+        title="Distribuição por Tipo",
+        color='count',
+        color_continuous_scale='Viridis'
+    )
+
+
+def histogram_figure(df):
+    """Distribuição de força por tipo de amostra."""
+    return px.histogram(
+        df,
+        x='force_N',
+        nbins=20,
+        color='sample_type',
+        marginal='box',
+        title='Distribuição de Força por Tipo'
+    )
+
+
+def scatter_figure(view, mode):
+    """Dispersão força x percentual no modo pedido: (figura, pontos enviados)."""
+    return cached_figure(f'scatter:{mode}', view, lambda df: build_scatter(df, mode))
+
+
+def build_default_figures(view):
+    """
+    Constrói (e guarda no cache) as figuras que as abas do dashboard
+    mostram sem interação: linha, dispersão no modo automático, treemap
+    e histograma.
+    """
+    if view.frame.df.empty:
+        return
+    cached_figure('line', view, lambda _: line_figure(view))
+    scatter_figure(view, scatter_mode(len(view.frame.df)))
+    if view.stats.get('total', 0):
+        cached_figure('treemap', view, lambda _: treemap_figure(view))
+        cached_figure('histogram', view, histogram_figure)
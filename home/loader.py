@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Tempo máximo, em segundos, de espera pelo conjunto das fontes do dashboard
+LOAD_BUDGET = 15
+
+# Pool compartilhado pelo processo; as threads são reaproveitadas entre reruns
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dashboard-loader')
+
+
+def load_concurrently(sources: dict, budget: float = LOAD_BUDGET, foreground=None):
+    """
+    Executa as fontes de dados em paralelo e reúne o que chegar no prazo.
+
+    As tarefas rodam com o contexto da sessão Streamlit atual, de modo que
+    os serviços podem usar `st.session_state` normalmente.
+
+    Args:
+        sources (dict): Nome -> função sem argumentos que carrega a fonte.
+        budget (float): Prazo total, em segundos, para todas as fontes.
+        foreground (tuple): (nome, função) executada na thread atual enquanto
+            as demais carregam (ex.: a carga que desenha a prévia na tela).
+
+    Returns:
+        tuple: (dados, erros) — dicionários por nome da fonte. Fontes que
+        falharam ou estouraram o prazo aparecem apenas em `erros`.
+    """
+    ctx = get_script_run_ctx()
+    started = time.monotonic()
+
+    def run(name, fetch):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        begin = time.monotonic()
+        value = fetch()
+        logging.info(f"Fonte '{name}' carregada em {time.monotonic() - begin:.2f}s.")
+        return value
+
+    futures = {_executor.submit(run, name, fetch): name for name, fetch in sources.items()}
+    data, errors = {}, {}
+
+    if foreground is not None:
+        name, fetch = foreground
+        try:
+            data[name] = fetch()
+        except Exception as e:
+            logging.error(f"Erro ao carregar '{name}': {e}")
+            errors[name] = str(e)
+
+    remaining = max(budget - (time.monotonic() - started), 0)
+    done, pending = wait(futures, timeout=remaining)
+    for future in done:
+        name = futures[future]
+        try:
+            data[name] = future.result()
+        except Exception as e:
+            logging.error(f"Erro ao carregar '{name}': {e}")
+            errors[name] = str(e)
+    for future in pending:
+        name = futures[future]
+        logging.warning(f"Fonte '{name}' não respondeu em {budget}s.")
+        errors[name] = f'Tempo limite de {budget}s excedido'
+
+    logging.info(f"Carga concorrente concluída em {time.monotonic() - started:.2f}s.")
+    return data, errors
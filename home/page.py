@@ -1,39 +1,72 @@
-import matplotlib.pyplot as plt
 import streamlit as st
-import plotly.express as px
-import pandas as pd
-import statsmodels.api as sm
+from results.aggregates import GroupAggregate
+from results.export import EXPORT_FORMATS, available_formats
 from results.service import ResultService
 from products.service import ProductService
+from samples.service import SampleService
+from assembly.service import AssemblyService
+from components.paged_table import paged_table
+from home.figures import cached_figure, histogram_figure, line_figure, scatter_figure, treemap_figure
+from home.loader import load_concurrently
+from home.scatter import SCATTER_MODES, scatter_mode
+from home.warmup import wait_for_warmup
 
 def show_home():
     result_service = ResultService()
     product_service = ProductService()
+    sample_service = SampleService()
+    assembly_service = AssemblyService()
+
+    # Sessão sem resultados: o dashboard aparece antes das páginas de
+    # resultados (e do aquecimento) terminarem, com os KPIs gerais agregados
+    # pela API, se ela oferecer, ou parciais das páginas já recebidas
+    preview = st.empty()
+    remote_kpis = None
+    if not result_service.has_cached_results():
+        remote_kpis = result_service.get_remote_kpis()
+        if remote_kpis is not None:
+            show_kpi_preview(preview, remote_kpis)
 
     with st.spinner("Carregando dados... 💾"):
+        # Aquecimento iniciado no login: espera a busca e as estruturas
+        # derivadas em vez de repeti-las; se não ficarem prontas a tempo,
+        # a carga abaixo segue normalmente (e reaproveita o que já chegou)
+        wait_for_warmup('tables')
         try:
-            # Carregar dados com relacionamento
-            results = result_service.get_results_with_products()  # Novo método
-            products = product_service.get_products()
-            result_stats = result_service.calculate_stats(results)
+            # Catálogos carregam em paralelo enquanto a primeira página
+            # de resultados aparece na tela
+            _, errors = load_concurrently(
+                {
+                    'produtos': product_service.get_products,
+                    'amostras': sample_service.get_samples,
+                    'montagens': assembly_service.get_assemblies,
+                },
+                foreground=('resultados', lambda: stream_dashboard(result_service, preview, remote_kpis)),
+            )
+            if 'resultados' in errors:
+                raise Exception(errors['resultados'])
+            for source, error in errors.items():
+                st.warning(f"⚠️ Falha ao carregar {source}: {error}")
+
+            # Carregar dados com relacionamento, em formato colunar
+            frame = result_service.get_result_frame()
+            index = result_service.get_result_index()
+            # KPIs gerais lidos direto dos agregados incrementais
+            result_stats = result_service.get_kpis()
         except Exception as e:
             st.error(f"🚨 Erro ao carregar dados: {str(e)}", icon="🚨")
             return
+    preview.empty()
 
     # Verificação de consistência
-    if not results:
+    if not len(frame):
         st.warning("Nenhum resultado encontrado")
         return
 
     # Preparar dados para filtros
-    part_numbers = list({
-        result['product'].get('part_number', 'N/A') 
-        for result in results 
-        if 'product' in result
-    })
-    
-    sample_types = list({result['sample_type'] for result in results})
-    production_batches = list({result['production_batch'] for result in results})
+    part_numbers = index.values('part_number')
+    sample_types = index.values('sample_type')
+    production_batches = index.values('production_batch')
 
     # --- Filtros ---
     with st.sidebar:
@@ -64,178 +97,42 @@ def show_home():
             options=["Todos"] + production_batches
         )
 
-    # --- Lógica de filtragem robusta ---
-    filtered_data = []
-    for result in results:
-        # Verificação de produto
-        part_number = result.get('product', {}).get('part_number', 'N/A')
-        product_match = (
-            "Todos" in selected_parts or
-            part_number in selected_parts
-        )
-        
-        # Verificação de tipo
-        type_match = (
-            "Todos" in selected_types or
-            result['sample_type'] in selected_types
-        )
-        
-        # Verificação de lote
-        batch_match = (
-            selected_batch == "Todos" or
-            result['production_batch'] == selected_batch
-        )
-        
-        # Verificação de lado
-        side_match = (
-            sample_side == "Todos" or
-            result['sample_side'] == sample_side.lower()
-        )
-
-        if all([product_match, type_match, batch_match, side_match]):
-            filtered_data.append(result)
+    # --- Filtragem pelo índice invertido ("Todos" não restringe) ---
+    criteria = dict(
+        part_number=None if "Todos" in selected_parts else selected_parts,
+        sample_type=None if "Todos" in selected_types else selected_types,
+        production_batch=None if selected_batch == "Todos" else selected_batch,
+        sample_side=None if sample_side == "Todos" else sample_side.lower(),
+    )
+    view = result_service.get_filtered_view(**criteria)
+    df = view.frame.df
 
     # --- Feedback visual ---
-    if not filtered_data:
+    if df.empty:
         st.warning("Nenhum resultado corresponde aos filtros selecionados")
         st.stop()
 
-    # --- Recálculo de Estatísticas ---
-    filtered_stats = result_service.calculate_stats(filtered_data)
+    # --- KPIs da seleção (agregados ou estatísticas da visão em cache) ---
+    filtered_kpis = result_service.get_kpis(**criteria)
 
     # --- Layout Principal ---
     st.title("📊 Dashboard de Testes de Amostras")
     
     # --- KPIs Principais ---
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric(
-            label=" Total de Testes",
-            value=f"{filtered_stats.get('total', 0):,}".replace(',', '.'),
-            delta=f"{(filtered_stats.get('total',0)/result_stats.get('total',1))*100:.1f}% do total"
-        )
-    with col2:
-        st.metric(
-            label=" Força Média (N)",
-            value=f"{filtered_stats.get('average_force', 0):.2f} N",
-            delta=f"{filtered_stats.get('average_force',0) - result_stats.get('average_force',0):+.2f} N"
-        )
-    with col3:
-        st.metric(
-            label=" Percentual Médio",
-            value=f"{filtered_stats.get('average_percentage', 0):.2f}%",
-            delta=f"{filtered_stats.get('average_percentage',0) - result_stats.get('average_percentage',0):+.2f}%"
-        )
-    with col4:
-        st.metric(
-            label=" Comentários",
-            value=filtered_stats.get('samples_with_comments', 0),
-            delta=f"{filtered_stats.get('samples_with_comments',0)/result_stats.get('samples_with_comments',1)*100:.1f}%"
-        )
+    show_kpis(filtered_kpis, result_stats)
 
     # --- Gráficos Dinâmicos ---
+    if not any(criteria.values()):
+        # Figuras da visão sem filtros já em construção no aquecimento
+        wait_for_warmup('figures')
+    # Cada aba é um fragmento: interações dentro dela reexecutam só a aba
     tab1, tab2, tab3 = st.tabs(["📈 Análise Geral", "🔍 Detalhamento", "🗃️ Dados Brutos"])
-    
     with tab1:
-        # Gráfico de comparação entre tipos
-        if filtered_data:
-            df = pd.DataFrame(filtered_data)
-            
-            # Gráfico de linhas comparativo
-            st.subheader("Comparação de Força por Tipo")
-            fig_line = px.line(
-                df.groupby(['sample_type', 'production_batch']).mean(numeric_only=True).reset_index(),
-                x='production_batch',
-                y='force_N',
-                color='sample_type',
-                markers=True,
-                title="Evolução da Força por Lote e Tipo",
-                labels={
-                    "force_N": "Força (N)",
-                    "production_batch": "Lote de Produção"
-                }
-            )
-            st.plotly_chart(fig_line, use_container_width=True)
-
-            # Gráfico de dispersão interativo
-            st.subheader("Relação Força vs Percentual")
-            fig_scatter = px.scatter(
-                df,
-                x='force_N',
-                y='result_percentage',
-                color='sample_type',
-                size='result_percentage',
-                hover_data=['production_batch', 'comment'],
-                trendline='ols',
-                title='Correlação entre Força e Percentual'
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
-            
-        else:
-            st.warning("Nenhum dado disponível para exibição")
-
+        show_analysis(view)
     with tab2:
-        # Análise detalhada por tipo
-        st.subheader("Análise por Tipo de Amostra")
-        if filtered_stats.get('total', 0) > 0:
-            # Verifica se filtered_data existe
-            if 'filtered_data' in locals():
-                df = pd.DataFrame(filtered_data)
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    # Treemap de distribuição
-                    st.subheader("Proporção de Tipos")
-                    fig_tree = px.treemap(
-                        pd.DataFrame(filtered_stats['results_by_type']),
-                        path=['type'],
-                        values='count',
-                        title="Distribuição por Tipo",
-                        color='count',
-                        color_continuous_scale='Viridis'
-                    )
-                    st.plotly_chart(fig_tree, use_container_width=True)
-                    
-                with col2:
-                    # Histograma de força
-                    st.subheader("Distribuição de Força")
-                    fig_hist = px.histogram(
-                        df,
-                        x='force_N',
-                        nbins=20,
-                        color='sample_type',
-                        marginal='box',
-                        title='Distribuição de Força por Tipo'
-                    )
-                    st.plotly_chart(fig_hist, use_container_width=True)
-        else:
-            st.info("Selecione filtros para ver detalhes")
-
+        show_details(view)
     with tab3:
-        # Visualização de dados brutos
-        st.subheader("Registros Filtrados")
-        if filtered_data:
-            df = pd.DataFrame(filtered_data)
-            st.dataframe(
-                df.style.background_gradient(cmap='Blues'),
-                use_container_width=True,
-                column_config={
-                    "comment": st.column_config.TextColumn(
-                        "Comentário",
-                        help="Comentários adicionais sobre o teste"
-                    )
-                }
-            )
-            
-            # Botão de download
-            st.download_button(
-                label=".Download CSV",
-                data=df.to_csv(index=False).encode('utf-8'),
-                file_name='dados_filtrados.csv',
-                mime='text/csv'
-            )
-        else:
-            st.warning("Nenhum dado corresponde aos filtros selecionados")
+        show_raw_data(view, index, result_service)
 
     # --- Rodapé ---
     st.markdown(
@@ -258,4 +155,176 @@ def show_home():
         </div>
         """,
         unsafe_allow_html=True
-    )
\ No newline at end of file
+    )
+
+def show_kpis(filtered_kpis: dict, result_stats: dict):
+    """KPIs da seleção atual comparados ao total."""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(
+            label=" Total de Testes",
+            value=f"{filtered_kpis.get('total', 0):,}".replace(',', '.'),
+            delta=f"{(filtered_kpis.get('total',0)/(result_stats.get('total') or 1))*100:.1f}% do total"
+        )
+    with col2:
+        st.metric(
+            label=" Força Média (N)",
+            value=f"{filtered_kpis.get('average_force', 0):.2f} N",
+            delta=f"{filtered_kpis.get('average_force',0) - result_stats.get('average_force',0):+.2f} N"
+        )
+    with col3:
+        st.metric(
+            label=" Percentual Médio",
+            value=f"{filtered_kpis.get('average_percentage', 0):.2f}%",
+            delta=f"{filtered_kpis.get('average_percentage',0) - result_stats.get('average_percentage',0):+.2f}%"
+        )
+    with col4:
+        st.metric(
+            label=" Comentários",
+            value=filtered_kpis.get('samples_with_comments', 0),
+            delta=f"{filtered_kpis.get('samples_with_comments',0)/(result_stats.get('samples_with_comments') or 1)*100:.1f}%"
+        )
+
+
+def stream_dashboard(result_service, preview, remote_kpis=None):
+    """
+    Carrega os resultados em páginas, redesenhando a prévia do dashboard a
+    cada página recebida.
+
+    Args:
+        result_service (ResultService): Serviço de resultados.
+        preview: Espaço (`st.empty`) da prévia.
+        remote_kpis (dict): KPIs gerais calculados pela API; sem eles, a
+            prévia mostra os KPIs das páginas já recebidas.
+    """
+    if result_service.has_cached_results():
+        return
+    partial = GroupAggregate()
+    received = 0
+    for page in result_service.iter_results():
+        for result in page:
+            partial.apply(result, 1)
+        received += len(page)
+        show_kpi_preview(preview, remote_kpis or partial.kpis(), received, partial=remote_kpis is None)
+
+
+def show_kpi_preview(preview, kpis: dict, received: int = 0, partial: bool = False):
+    """Prévia do dashboard (título e KPIs gerais) enquanto os resultados carregam."""
+    with preview.container():
+        st.title("📊 Dashboard de Testes de Amostras")
+        col1, col2, col3 = st.columns(3)
+        col1.metric(label=" Total de Testes", value=f"{kpis['total']:,}".replace(',', '.'))
+        col2.metric(label=" Força Média (N)", value=f"{kpis['average_force']:.2f} N")
+        col3.metric(label=" Percentual Médio", value=f"{kpis['average_percentage']:.2f}%")
+        if partial:
+            st.caption(f"KPIs parciais: {received:,} resultados recebidos até aqui...".replace(',', '.'))
+        else:
+            st.caption(f"Carregando os resultados para os filtros e gráficos... ({received:,} recebidos)".replace(',', '.'))
+
+
+@st.fragment
+def show_analysis(view):
+    """Aba de análise geral: evolução por lote e dispersão força x percentual."""
+    df = view.frame.df
+    if df.empty:
+        st.warning("Nenhum dado disponível para exibição")
+        return
+
+    # Gráfico de linhas comparativo
+    st.subheader("Comparação de Força por Tipo")
+    fig_line = cached_figure('line', view, lambda _: line_figure(view))
+    st.plotly_chart(fig_line, use_container_width=True)
+
+    # Gráfico de dispersão: o modo acompanha a quantidade de pontos
+    st.subheader("Relação Força vs Percentual")
+    auto_mode = scatter_mode(len(df))
+    choice = st.selectbox(
+        "Modo de exibição",
+        options=['auto'] + list(SCATTER_MODES),
+        format_func=lambda m: f"Automático ({SCATTER_MODES[auto_mode]})" if m == 'auto' else SCATTER_MODES[m],
+        key='scatter_mode',
+    )
+    mode = auto_mode if choice == 'auto' else choice
+    # O ajuste OLS por tipo é refeito só quando a visão muda
+    fig_scatter, shown = scatter_figure(view, mode)
+    unit = 'células' if mode == 'density' else 'pontos'
+    st.caption(
+        f"Modo ativo: {SCATTER_MODES[mode]} · {len(df):,} resultados · {shown:,} {unit} enviados ao navegador".replace(',', '.')
+        + " · retas de tendência (OLS) calculadas sobre todos os resultados"
+    )
+    st.plotly_chart(fig_scatter, use_container_width=True)
+
+
+@st.fragment
+def show_details(view):
+    """Aba de detalhamento: proporção e distribuição de força por tipo."""
+    df = view.frame.df
+    st.subheader("Análise por Tipo de Amostra")
+    if view.stats.get('total', 0) == 0 or df.empty:
+        st.info("Selecione filtros para ver detalhes")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # Treemap de distribuição
+        st.subheader("Proporção de Tipos")
+        fig_tree = cached_figure('treemap', view, lambda _: treemap_figure(view))
+        st.plotly_chart(fig_tree, use_container_width=True)
+
+    with col2:
+        # Histograma de força
+        st.subheader("Distribuição de Força")
+        fig_hist = cached_figure('histogram', view, histogram_figure)
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+
+@st.fragment
+def show_raw_data(view, index, result_service):
+    """Aba de dados brutos: tabela paginada e exportação sob demanda."""
+    df = view.frame.df
+    st.subheader("Registros Filtrados")
+    if df.empty:
+        st.warning("Nenhum dado corresponde aos filtros selecionados")
+        return
+
+    # Só a página visível é estilizada e enviada ao navegador
+    paged_table(
+        df,
+        key='raw_data',
+        search=index.search,
+        cache=view,
+        gradient_columns=df.select_dtypes('number').columns,
+        column_config={
+            "comment": st.column_config.TextColumn(
+                "Comentário",
+                help="Comentários adicionais sobre o teste"
+            )
+        }
+    )
+
+    # Exportação sob demanda, gerada em blocos e em cache por versão e filtros
+    formats = available_formats()
+    col_format, col_action = st.columns([3, 1], vertical_alignment='bottom')
+    fmt = col_format.selectbox(
+        "Exportar como",
+        options=formats,
+        format_func=lambda f: EXPORT_FORMATS[f]['label'],
+        key='export_format',
+    )
+    path = result_service.get_exported(view, fmt)
+    if path is None and col_action.button("Gerar arquivo", key='export_prepare', use_container_width=True):
+        with st.spinner("Gerando arquivo..."):
+            try:
+                path = result_service.export_results(view, fmt)
+            except ValueError as e:
+                st.error(str(e))
+    if path is not None:
+        with open(path, 'rb') as file:
+            col_action.download_button(
+                label="Download",
+                data=file,
+                file_name=f"dados_filtrados.{EXPORT_FORMATS[fmt]['extension']}",
+                mime=EXPORT_FORMATS[fmt]['mime'],
+                use_container_width=True,
+                key='export_download',
+            )
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+# Limites, em número de pontos, de cada modo de renderização automático
+SCATTER_WEBGL_THRESHOLD = 5_000
+SCATTER_DOWNSAMPLE_THRESHOLD = 50_000
+SCATTER_DENSITY_THRESHOLD = 250_000
+# Pontos enviados ao navegador no modo amostrado
+SCATTER_MAX_POINTS = 20_000
+# Células por eixo no modo de densidade
+DENSITY_BINS = 60
+
+SCATTER_MODES = {
+    'svg': 'Pontos (SVG)',
+    'webgl': 'Pontos (WebGL)',
+    'downsample': 'Amostragem estratificada',
+    'density': 'Densidade (2D)',
+}
+
+
+def scatter_mode(points: int) -> str:
+    """Modo de renderização adequado para a quantidade de pontos."""
+    if points <= SCATTER_WEBGL_THRESHOLD:
+        return 'svg'
+    if points <= SCATTER_DOWNSAMPLE_THRESHOLD:
+        return 'webgl'
+    if points <= SCATTER_DENSITY_THRESHOLD:
+        return 'downsample'
+    return 'density'
+
+
+def downsample(df: pd.DataFrame, max_points: int = SCATTER_MAX_POINTS, seed: int = 0) -> pd.DataFrame:
+    """
+    Amostra estratificada por tipo de amostra.
+
+    Cada tipo recebe uma cota proporcional ao seu tamanho e mantém sempre
+    os extremos de força e percentual, para que valores atípicos continuem
+    visíveis.
+
+    Args:
+        df (pandas.DataFrame): Linhas da visão filtrada.
+        max_points (int): Quantidade aproximada de pontos a manter.
+        seed (int): Semente da amostragem (resultado reprodutível).
+
+    Returns:
+        pandas.DataFrame: Linhas selecionadas.
+    """
+    if len(df) <= max_points:
+        return df
+    rng = np.random.default_rng(seed)
+    kept = []
+    for _, group in df.groupby('sample_type', observed=True):
+        quota = max(int(max_points * len(group) / len(df)), 1)
+        extremes = set()
+        for column in ('force_N', 'result_percentage'):
+            # Só valores presentes: idxmin/idxmax de uma coluna vazia não é um rótulo
+            values = group[column][pd.notna(group[column])]
+            if len(values):
+                extremes.update((values.idxmin(), values.idxmax()))
+        rest = group.index.difference(list(extremes))
+        size = min(max(quota - len(extremes), 0), len(rest))
+        kept.extend(extremes)
+        kept.extend(rng.choice(rest, size=size, replace=False))
+    return df.loc[sorted(kept)]
+
+
+def trendlines(df: pd.DataFrame) -> list:
+    """
+    Retas de mínimos quadrados (percentual ~ força) por tipo, ajustadas
+    sobre todas as linhas, independentemente do modo de exibição.
+
+    Returns:
+        list: go.Scatter com a reta de cada tipo.
+    """
+    traces = []
+    for sample_type, group in df.groupby('sample_type', observed=True):
+        data = group[['force_N', 'result_percentage']].dropna()
+        if len(data) < 2 or data['force_N'].nunique() < 2:
+            continue
+        x = data['force_N'].to_numpy(dtype='float64')
+        y = data['result_percentage'].to_numpy(dtype='float64')
+        slope, intercept = np.polyfit(x, y, 1)
+        x_line = np.array([x.min(), x.max()])
+        traces.append(go.Scatter(
+            x=x_line,
+            y=slope * x_line + intercept,
+            mode='lines',
+            name=f'{sample_type} (OLS)',
+            hovertemplate=f'y = {slope:.4f}x + {intercept:.2f}<extra>{sample_type}</extra>',
+        ))
+    return traces
+
+
+def build_scatter(df: pd.DataFrame, mode: str):
+    """
+    Gráfico de força x percentual no modo informado, com as retas de
+    tendência calculadas sobre os dados completos.
+
+    Args:
+        df (pandas.DataFrame): Linhas da visão filtrada.
+        mode (str): Uma das chaves de `SCATTER_MODES`.
+
+    Returns:
+        tuple: (figura, pontos enviados ao navegador)
+    """
+    title = 'Correlação entre Força e Percentual'
+    if mode == 'density':
+        data = df[['force_N', 'result_percentage']].dropna()
+        counts, x_edges, y_edges = np.histogram2d(
+            data['force_N'], data['result_percentage'], bins=DENSITY_BINS
+        )
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            colorscale='Blues',
+            colorbar={'title': 'Resultados'},
+            hovertemplate='Força: %{x:.1f} N<br>Percentual: %{y:.1f}%<br>Resultados: %{z}<extra></extra>',
+        ))
+        fig.update_layout(title=title, xaxis_title='force_N', yaxis_title='result_percentage')
+        shown = DENSITY_BINS * DENSITY_BINS
+    else:
+        points = downsample(df) if mode == 'downsample' else df
+        fig = px.scatter(
+            points,
+            x='force_N',
+            y='result_percentage',
+            color='sample_type',
+            # Tamanho e hover por ponto só compensam com poucos pontos
+            size='result_percentage' if mode == 'svg' else None,
+            hover_data=['production_batch', 'comment'] if mode == 'svg' else None,
+            render_mode='svg' if mode == 'svg' else 'webgl',
+            title=title,
+        )
+        shown = len(points)
+
+    for trace in trendlines(df):
+        fig.add_trace(trace)
+    return fig, shown
@@ -0,0 +1,114 @@
+import dataclasses
+import functools
+import logging
+import threading
+import streamlit as st
+from streamlit.runtime.scriptrunner import ScriptRunContext, add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.state.safe_session_state import SafeSessionState
+from streamlit.runtime.state.session_state import SessionState
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Versões do Streamlit (major, minor) em que o acesso às partes internas
+# abaixo foi verificado; fora delas o aquecimento em segundo plano é
+# desligado e as páginas fazem a carga normalmente
+STREAMLIT_VERSIONS = ((1, 42), (1, 42))
+
+# Campos do ScriptRunContext substituídos na cópia usada fora do script
+CONTEXT_FIELDS = (
+    'session_state', '_enqueue', 'script_requests', 'cursors',
+    'widget_ids_this_run', 'widget_user_keys_this_run', 'form_ids_this_run',
+)
+
+
+def _version() -> tuple:
+    return tuple(int(part) for part in st.__version__.split('.')[:2])
+
+
+@functools.cache
+def supported() -> bool:
+    """
+    Se a versão instalada do Streamlit é uma das verificadas e expõe as
+    partes internas usadas por `detached_context`.
+    """
+    low, high = STREAMLIT_VERSIONS
+    if not low <= _version() <= high:
+        logging.warning(f"Streamlit {st.__version__} não verificado; aquecimento em segundo plano desligado.")
+        return False
+    fields = {field.name for field in dataclasses.fields(ScriptRunContext)}
+    state = SafeSessionState(SessionState(), lambda: None)
+    missing = [f for f in CONTEXT_FIELDS if f not in fields]
+    missing += [a for a in ('_state', '_lock') if not hasattr(state, a)]
+    if missing:
+        logging.warning(f"Streamlit {st.__version__} sem {missing}; aquecimento em segundo plano desligado.")
+        return False
+    return True
+
+
+class _GuardedSessionState(SafeSessionState):
+    """
+    `st.session_state` da sessão visto fora da execução do script.
+
+    Usa o mesmo lock da sessão e, antes de cada gravação, chama
+    `check(state)`, que deve lançar uma exceção para recusá-la.
+    """
+
+    def __init__(self, safe_state, check):
+        object.__setattr__(self, '_state', safe_state._state)
+        object.__setattr__(self, '_lock', safe_state._lock)
+        object.__setattr__(self, '_yield_callback', lambda: None)
+        object.__setattr__(self, '_check', check)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._check(self._state)
+            self._state[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._check(self._state)
+            del self._state[key]
+
+
+def current_context():
+    """Contexto da execução do script atual (None fora de uma sessão)."""
+    return get_script_run_ctx()
+
+
+def detached_context(ctx, check):
+    """
+    Cópia do contexto da sessão para uso em outra thread, fora da execução
+    do script.
+
+    Mantém o `st.session_state` da sessão, com gravações condicionadas a
+    `check`, descarta as mensagens de interface (ex.: `st.error` dos
+    serviços) e ignora `st.rerun`, que não fazem sentido sem uma execução
+    em andamento.
+
+    Args:
+        ctx (ScriptRunContext): Contexto de `current_context()`.
+        check (callable): check(state) chamado sob o lock da sessão antes de
+            cada gravação; lança uma exceção para recusá-la.
+
+    Returns:
+        ScriptRunContext: Cópia do contexto, ou None se a versão do
+        Streamlit não for suportada.
+    """
+    if ctx is None or not supported():
+        return None
+    return dataclasses.replace(
+        ctx,
+        session_state=_GuardedSessionState(ctx.session_state, check),
+        _enqueue=lambda msg: None,
+        script_requests=None,
+        cursors={},
+        widget_ids_this_run=set(),
+        widget_user_keys_this_run=set(),
+        form_ids_this_run=set(),
+    )
+
+
+def attach(ctx):
+    """Associa o contexto à thread atual (ver `detached_context`)."""
+    add_script_run_ctx(threading.current_thread(), ctx)
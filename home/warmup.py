@@ -0,0 +1,279 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from decouple import config
+from api.auth import BearerAuth, TokenPair
+from api.client import BASE_URL, get_client
+from api.store import get_store
+from assembly.service import AssemblyService
+from home.figures import build_default_figures
+from home.loader import load_concurrently
+from home.session_context import attach, current_context, detached_context
+from login.service import Auth
+from products.service import ProductService
+from results.service import ResultService
+from samples.service import SampleService
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Tempo máximo, em segundos, que uma página espera por uma etapa em andamento
+WARMUP_WAIT = config('WARMUP_WAIT', default=15, cast=float)
+
+# Aquecimento dos catálogos compartilhados na inicialização do processo,
+# com uma conta de serviço (desligado sem as credenciais)
+WARMUP_ON_START = config('WARMUP_ON_START', default=False, cast=bool)
+WARMUP_USERNAME = config('WARMUP_USERNAME', default='')
+WARMUP_PASSWORD = config('WARMUP_PASSWORD', default='')
+
+# Etapas, na ordem em que são executadas; as listagens vêm antes das
+# figuras, que são as mais lentas e só servem ao dashboard sem filtros
+WARMUP_STAGES = ('data', 'tables', 'listings', 'figures')
+
+# Filtros do dashboard; todos em None formam a visão inicial (sem filtros)
+DASHBOARD_FILTERS = ('part_number', 'sample_type', 'production_batch', 'sample_side')
+
+# Registros do cache em disco compartilhados por todas as sessões
+CATALOG_ENDPOINTS = {
+    'products': 'products/',
+    'assemblies': 'assembly/',
+    'samples': 'samples/',
+    'sample_stats': 'samples/stats/',
+}
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='session-warmup')
+
+
+class WarmupCancelled(Exception):
+    """O aquecimento tentou gravar em uma sessão que já não é a sua."""
+
+
+def _check_generation(state, generation):
+    """Recusa gravações de um aquecimento que já não é o da sessão."""
+    if 'warmup_generation' not in state or state['warmup_generation'] != generation:
+        raise WarmupCancelled('sessão encerrada ou aquecimento substituído')
+
+
+class Warmup:
+    """
+    Aquecimento dos dados de uma sessão, feito em segundo plano após o login.
+
+    Etapas:
+        data: resultados, produtos, amostras e montagens buscados em paralelo.
+        tables: frame colunar, índice e agregados (KPIs).
+        listings: tabelas de exibição das listagens.
+        figures: visão sem filtros, com estatísticas e figuras do dashboard.
+
+    Tudo é guardado nos mesmos caches da sessão usados pelas páginas, que
+    apenas esperam (com prazo) pela etapa de que precisam; se ela falhar ou
+    não terminar a tempo, a página segue com a carga normal. Nada é gravado
+    depois que a sessão troca de geração (logout ou novo login).
+    """
+
+    def __init__(self, generation=None):
+        self.generation = generation
+        self.started_at = time.time()
+        self.errors = {}
+        self.cancelled = False
+        self.__completed = set()
+        self.__done = {stage: threading.Event() for stage in WARMUP_STAGES}
+
+    @property
+    def running(self) -> bool:
+        return not self.cancelled and not self.__done[WARMUP_STAGES[-1]].is_set()
+
+    def ready(self, stage) -> bool:
+        """Se a etapa terminou sem erros."""
+        return stage in self.__completed
+
+    def wait(self, stage, timeout=WARMUP_WAIT) -> bool:
+        """
+        Espera a etapa terminar.
+
+        Returns:
+            bool: True se ela terminou sem erros dentro do prazo.
+        """
+        self.__done[stage].wait(timeout)
+        return self.ready(stage)
+
+    def cancel(self):
+        """Interrompe o aquecimento antes da próxima etapa (ex.: logout)."""
+        self.cancelled = True
+
+    def run(self, ctx):
+        """Executa as etapas com o contexto da sessão (na thread do pool)."""
+        attach(ctx)
+        result_service = ResultService()
+        product_service = ProductService()
+        sample_service = SampleService()
+        assembly_service = AssemblyService()
+        stages = {
+            'data': lambda: self.__load(result_service, product_service, sample_service, assembly_service),
+            'tables': lambda: self.__build_tables(result_service),
+            'listings': lambda: self.__build_listings(result_service, product_service, sample_service),
+            'figures': lambda: self.__build_figures(result_service),
+        }
+        for stage in WARMUP_STAGES:
+            if not self.__current():
+                self.cancelled = True
+            if self.cancelled or self.errors:
+                # Sem os dados da etapa anterior as seguintes ficam para as páginas
+                self.__done[stage].set()
+                continue
+            started = time.perf_counter()
+            try:
+                stages[stage]()
+                self.__completed.add(stage)
+                logging.info(f"Aquecimento: etapa '{stage}' concluída em {time.perf_counter() - started:.2f}s.")
+            except WarmupCancelled:
+                logging.info(f"Aquecimento: etapa '{stage}' interrompida; a sessão foi encerrada.")
+                self.cancelled = True
+            except Exception as e:
+                logging.error(f"Aquecimento: erro na etapa '{stage}': {e}")
+                self.errors[stage] = str(e)
+            finally:
+                self.__done[stage].set()
+        logging.info(f"Aquecimento da sessão finalizado em {time.time() - self.started_at:.2f}s.")
+
+    def __current(self) -> bool:
+        """Se a sessão ainda é a que iniciou o aquecimento."""
+        return self.generation is None or st.session_state.get('warmup_generation') == self.generation
+
+    def __load(self, result_service, product_service, sample_service, assembly_service):
+        _, errors = load_concurrently({
+            'resultados': result_service.get_results,
+            'produtos': product_service.get_products,
+            'amostras': sample_service.get_samples,
+            'montagens': assembly_service.get_assemblies,
+        })
+        if errors and not self.__current():
+            raise WarmupCancelled('sessão encerrada durante a carga')
+        # Sem os catálogos as tabelas ainda podem ser montadas; sem os resultados, não
+        for source, error in errors.items():
+            logging.warning(f"Aquecimento: falha ao carregar {source}: {error}")
+        if 'resultados' in errors:
+            raise Exception(errors['resultados'])
+
+    def __build_tables(self, result_service):
+        result_service.get_result_frame()
+        result_service.get_result_index()
+        result_service.get_kpis()
+
+    def __build_figures(self, result_service):
+        view = result_service.get_filtered_view(**dict.fromkeys(DASHBOARD_FILTERS))
+        build_default_figures(view)
+
+    def __build_listings(self, result_service, product_service, sample_service):
+        result_service.get_display_table()
+        product_service.get_display_table()
+        sample_service.get_display_table()
+
+
+def start_warmup():
+    """
+    Inicia o aquecimento da sessão atual em segundo plano (chamado no login).
+
+    Returns:
+        Warmup: Aquecimento em andamento, ou None fora de uma sessão Streamlit
+        (ou com uma versão do Streamlit não suportada, ver `home.session_context`).
+    """
+    warmup = st.session_state.get('warmup')
+    if warmup is not None and warmup.running:
+        return warmup
+    # Cada aquecimento grava só enquanto a sessão tiver a sua geração
+    generation = uuid.uuid4().hex
+    ctx = detached_context(current_context(), lambda state: _check_generation(state, generation))
+    if ctx is None:
+        return None
+    st.session_state.warmup_generation = generation
+    warmup = Warmup(generation)
+    st.session_state.warmup = warmup
+    _executor.submit(warmup.run, ctx)
+    logging.info("Aquecimento da sessão iniciado em segundo plano.")
+    return warmup
+
+
+def wait_for_warmup(stage, timeout=WARMUP_WAIT) -> bool:
+    """
+    Espera a etapa do aquecimento da sessão, se houver um em andamento.
+
+    Se o prazo se esgotar, a página assume a carga e as etapas seguintes
+    do aquecimento são canceladas, para não repetirem o mesmo trabalho.
+
+    Returns:
+        bool: True se os dados da etapa já estão nos caches da sessão.
+    """
+    warmup = st.session_state.get('warmup')
+    if warmup is None or warmup.cancelled:
+        return False
+    if not warmup.ready(stage) and warmup.running:
+        logging.info(f"Aguardando a etapa '{stage}' do aquecimento...")
+    if warmup.wait(stage, timeout):
+        return True
+    if warmup.running:
+        logging.warning(f"Etapa '{stage}' do aquecimento não concluída em {timeout}s; carga feita pela página.")
+        warmup.cancel()
+    return False
+
+
+def cancel_warmup():
+    """Interrompe o aquecimento da sessão, se houver, e recusa as gravações seguintes."""
+    st.session_state.pop('warmup_generation', None)
+    warmup = st.session_state.get('warmup')
+    if warmup is not None:
+        warmup.cancel()
+
+
+def warm_catalogs(username=WARMUP_USERNAME, password=WARMUP_PASSWORD):
+    """
+    Preenche o cache em disco com os catálogos (produtos, montagens,
+    amostras e estatísticas), compartilhados por todas as sessões.
+
+    Registros ainda válidos não são buscados de novo; os vencidos são
+    atualizados em segundo plano, como nos repositórios.
+    """
+    response = Auth().get_token(username, password)
+    if 'access' not in response:
+        logging.error(f"Aquecimento dos catálogos: autenticação falhou ({response.get('error')}).")
+        return
+    auth = BearerAuth(TokenPair(response['access'], response.get('refresh')))
+    client = get_client()
+    store = get_store()
+
+    def decode(response):
+        return response.json() if response.status_code == 200 else None
+
+    started = time.perf_counter()
+    for name, path in CATALOG_ENDPOINTS.items():
+        # A URL vai como padrão: a busca pode rodar depois, em segundo plano
+        fetch = lambda url=f'{BASE_URL}{path}': client.get_conditional(url, decode, auth=auth)
+        try:
+            store.read_through(name, fetch)
+        except Exception as e:
+            logging.error(f"Aquecimento dos catálogos: erro em '{name}': {e}")
+    logging.info(f"Catálogos aquecidos em {time.perf_counter() - started:.2f}s.")
+
+
+_catalogs_started = False
+_catalogs_lock = threading.Lock()
+
+
+def start_catalog_warmup():
+    """
+    Aquece os catálogos uma única vez por processo, em segundo plano, se
+    `WARMUP_ON_START` estiver ligado e houver credenciais configuradas.
+    """
+    global _catalogs_started
+    if not WARMUP_ON_START or _catalogs_started:
+        return
+    with _catalogs_lock:
+        if _catalogs_started:
+            return
+        _catalogs_started = True
+    if not WARMUP_USERNAME or not WARMUP_PASSWORD:
+        logging.warning("WARMUP_ON_START ligado sem WARMUP_USERNAME/WARMUP_PASSWORD; aquecimento ignorado.")
+        return
+    threading.Thread(target=warm_catalogs, name='catalog-warmup', daemon=True).start()
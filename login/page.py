@@ -1,5 +1,8 @@
 import streamlit as st
+from api.auth import start_session
+from home.warmup import start_warmup
 from login.service import Auth
+from results.repository import resume_outbox
 
 def show_login():
     st.title("Login")
@@ -11,7 +14,12 @@ def show_login():
         response = auth.get_token(username, password)
         
         if 'access' in response:
-            st.session_state['token'] = response['access']
+            # Guarda também o token de renovação; os dados em cache da sessão são mantidos
+            start_session(response, username)
+            # Envios que esperavam um novo login deste usuário voltam para a fila
+            resume_outbox(st.session_state.auth_tokens)
+            # Dados e estruturas derivadas começam a carregar antes da primeira página
+            start_warmup()
             st.success("Login realizado com sucesso!")
             st.rerun()
         else:
@@ -1,22 +1,23 @@
 import logging
 import requests
+from api.client import BASE_URL, get_client
 
 logging.basicConfig(level=logging.INFO)
 
 class Auth:
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
         self.__auth_url = f'{self.__base_url}authentication/token/'
+        self.__client = get_client()
 
     def get_token(self, username, password):
         try:
             self.validate_credentials(username, password)
             auth_payload = {'username': username, 'password': password}
             logging.info("Fazendo requisição de autenticação...")
-            auth_response = requests.post(
+            auth_response = self.__client.post(
                 self.__auth_url,
-                data=auth_payload,
-                timeout=10
+                data=auth_payload
             )
             return self._handle_response(auth_response)
         except requests.exceptions.RequestException as e:
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 import re
 from datetime import datetime
-from st_aggrid import AgGrid, GridOptionsBuilder, ExcelExportMode
+from st_aggrid import ExcelExportMode
+from components.server_grid import server_grid
 from products.service import ProductService
 
 
@@ -38,36 +38,30 @@ def show_products():
 
         if products:
             st.write('Lista de Produtos:')
-            products_df = pd.json_normalize(products)
+            table = product_service.get_display_table()
 
-            # Permitir que o usuário selecione colunas para exibir
+            # Permitir que o usuário selecione colunas para exibir (projeção da tabela em cache)
             selected_columns = st.multiselect(
                 'Selecionar Colunas',
-                options=products_df.columns,
-                default=list(products_df.columns[:5])
+                options=table.columns,
+                default=table.columns[:5]
             )
-            products_df = products_df[selected_columns]
-
-            # Configurar AgGrid
-            grid_options = GridOptionsBuilder.from_dataframe(products_df)
-            grid_options.configure_pagination(enabled=True)
-            grid_options.configure_side_bar()
-            grid_options.configure_default_column(
-                sortable=True,
-                filterable=True,
-                resizable=True,
-            )
-            grid_options.configure_column('project', filter=True)
+            products_df = table.project(selected_columns)
+
+            # Configurar AgGrid (paginada no servidor)
+            def configure(grid_options):
+                grid_options.configure_side_bar()
+                grid_options.configure_column('project', filter=True)
 
-            AgGrid(
-                data=products_df,
-                gridOptions=grid_options.build(),
+            server_grid(
+                products_df,
+                key='products_grid',
+                version=product_service.get_data_version(),
+                configure=configure,
                 enable_enterprise_modules=True,
                 fit_columns_on_grid_load=True,
                 allow_unsafe_jscode=True,
-                reload_data=True,
                 excel_export_mode=ExcelExportMode.MANUAL,
-                key='products_grid',
             )
         else:
             st.warning('Nenhum Produto encontrado.')
@@ -1,34 +1,42 @@
 import logging
-import requests
 import streamlit as st
+from api.auth import expire_session, get_auth
+from api.cache import get_cache
+from api.client import BASE_URL, get_client
+from api.store import get_store
 
 logging.basicConfig(level=logging.INFO)
 
 class ProductRepository:
 
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
+        self.__client = get_client()
+        self.__store = get_store()
+        self.__cache = get_cache()
         self.__products_url = f'{self.__base_url}products/'
         
         if 'token' not in st.session_state:
             logging.error("Token de autorização não encontrado.")
             raise Exception("Token de autorização não encontrado.")
             
-        self.__headers = {
-            'Authorization': f'Bearer {st.session_state.token}'
-        }
+        # Token renovado antes de expirar; em 401 a requisição é repetida uma vez
+        self.__auth = get_auth()
+
+    def get_products(self):
+        """Obtém os produtos (cache compartilhado por versão da entidade)"""
+        return self.__get_products(self.__cache.version('products'))
 
     @st.cache_data(ttl=300, hash_funcs={type('ProductRepository', (), {}): lambda _: None})
-    def get_products(_self):
-        """Obtém os produtos da API"""
+    def __get_products(_self, version):
+        """Obtém os produtos (cache local atualizado em segundo plano)"""
         try:
             logging.info(f"GET {_self.__products_url}")
-            response = requests.get(_self.__products_url, headers=_self.__headers, timeout=10)
-            result = _self._handle_response(response)
+            result = _self.__store.read_through('products', _self.__fetch_products)
             
             if result is None:
                 st.error("Sessão expirada. Faça login novamente.")
-                st.session_state.clear()
+                expire_session()
                 st.rerun()
                 
             return result
@@ -36,7 +44,49 @@ class ProductRepository:
             logging.error(f"Erro ao obter produtos: {e}")
             raise
 
-    # ... (demais métodos permanecem iguais, mas aplique o mesmo padrão se usarem cache)
+    def create_product(self, product_data):
+        """Cria um novo produto e invalida apenas o cache de produtos"""
+        response = self.__client.post(
+            self.__products_url,
+            auth=self.__auth,
+            json=product_data
+        )
+        result = self._handle_response(response)
+        self.__cache.invalidate('products')
+        return result
+
+    def update_product(self, product_id, updated_data):
+        """Atualiza um produto existente"""
+        url = f"{self.__products_url}{product_id}/"
+        response = self.__client.put(
+            url,
+            auth=self.__auth,
+            json=updated_data
+        )
+        result = self._handle_response(response)
+        self.__cache.invalidate('products')
+        return result
+
+    def delete_product(self, product_id):
+        """Exclui um produto"""
+        url = f"{self.__products_url}{product_id}/"
+        response = self.__client.delete(
+            url,
+            auth=self.__auth
+        )
+        if response.status_code != 204:
+            self._handle_response(response)
+            return False
+        self.__cache.invalidate('products')
+        return True
+
+    def __fetch_products(self):
+        """Busca os produtos na API (usado também pela atualização em segundo plano)"""
+        return self.__client.get_conditional(
+            self.__products_url,
+            self._handle_response,
+            auth=self.__auth
+        )
 
     def _handle_response(self, response):
         """Trata a resposta da API"""
@@ -1,6 +1,8 @@
 import logging
 import streamlit as st
 import re
+from api.cache import get_cache
+from components.display_table import DisplayTable, display_table
 from products.repository import ProductRepository
 
 
@@ -12,6 +14,7 @@ class ProductService:
 
     def __init__(self):
         self.product_repository = ProductRepository()
+        self.__cache = get_cache()
 
     def get_products(self):
         """
@@ -20,9 +23,10 @@ class ProductService:
         Returns:
             list: Lista de produtos.
         """
-        if 'products' in st.session_state:
+        products = self.__cache.get('products')
+        if products is not None:
             logging.info("Produtos carregados do cache.")
-            return st.session_state.products
+            return products
         try:
             logging.info("Buscando produtos na API...")
             products = self.product_repository.get_products()
@@ -30,10 +34,25 @@ class ProductService:
             logging.error(f"Erro ao obter produtos: {e}")
             st.error(f"Erro ao obter produtos: {e}")
             return []
-        st.session_state.products = products
+        self.__cache.put('products', products)
         logging.info(f"{len(products)} produtos carregados e armazenados no cache.")
         return products
 
+    def get_data_version(self) -> int:
+        """Versão dos produtos da sessão; muda a cada alteração do conjunto."""
+        return self.__cache.session_version('products')
+
+    def get_display_table(self) -> DisplayTable:
+        """
+        Obtém a tabela de exibição dos produtos, construída uma única vez
+        por versão dos dados.
+
+        Returns:
+            DisplayTable: Tabela pronta para a listagem.
+        """
+        products = self.get_products()
+        return display_table('products', self.get_data_version(), lambda: products)
+
     def create_product(self, part_number, project):
         """
         Cria um novo produto com base nos parâmetros fornecidos e atualiza a sessão.
@@ -62,10 +81,8 @@ class ProductService:
             st.error(f"Erro ao criar produto: {e}")
             return None
 
-        # Inicializar o estado de sessão se necessário
-        if 'products' not in st.session_state:
-            st.session_state.products = []
-        st.session_state.products.append(new_product)
+        # Atualiza a cópia da sessão sem recarregar (o repositório já invalidou a compartilhada)
+        self.__cache.patch('products', lambda products: products + [new_product])
         logging.info("Novo produto criado e adicionado ao cache.")
         return new_product
 
@@ -117,11 +134,10 @@ class ProductService:
             return None
 
         # Atualizar o cache
-        if 'products' in st.session_state:
-            st.session_state.products = [
-                updated_product if product['id'] == product_id else product
-                for product in st.session_state.products
-            ]
+        self.__cache.patch('products', lambda products: [
+            updated_product if product['id'] == product_id else product
+            for product in products
+        ])
         logging.info("Produto atualizado e cache atualizado.")
         return updated_product
 
@@ -150,9 +166,9 @@ class ProductService:
             return False
 
         # Atualizar o cache
-        if 'products' in st.session_state:
-            st.session_state.products = [
-                product for product in st.session_state.products if product['id'] != product_id
-            ]
+        if success:
+            self.__cache.patch('products', lambda products: [
+                product for product in products if product['id'] != product_id
+            ])
         logging.info("Produto excluído e cache atualizado.")
         return success
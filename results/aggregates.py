@@ -0,0 +1,204 @@
+import heapq
+import logging
+import math
+from collections import Counter
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Dimensões com agregados próprios, além do total geral
+DIMENSIONS = ('sample_type', 'part_number', 'production_batch')
+
+
+def _number(value):
+    """Converte o valor da API (número ou texto decimal) em float, ou None."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def part_number_of(result: dict) -> str:
+    """part_number do resultado, aninhado em 'product' ou já achatado."""
+    product = result.get('product')
+    if isinstance(product, dict) and product.get('part_number'):
+        return product['part_number']
+    return result.get('part_number') or 'N/A'
+
+
+class RunningStats:
+    """
+    Contagem, soma, média e variância mantidas incrementalmente
+    (algoritmo de Welford, inclusive para remoções).
+
+    Mínimo e máximo vêm de dois heaps com remoção preguiçosa: um valor
+    removido só sai do heap quando chega ao topo, de modo que incluir,
+    remover e ler os extremos custam O(log n) amortizado.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.__values = Counter()
+        self.__low = []   # heap de mínimo
+        self.__high = []  # heap de máximo (valores negados)
+
+    def add(self, x: float):
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.__values[x] += 1
+        if self.__values[x] == 1:
+            heapq.heappush(self.__low, x)
+            heapq.heappush(self.__high, -x)
+
+    def remove(self, x: float):
+        if not self.__values.get(x):
+            return
+        self.__values[x] -= 1
+        if not self.__values[x]:
+            del self.__values[x]
+            self.__compact()
+        if self.count == 1:
+            self.count, self.total, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+            return
+        self.count -= 1
+        self.total -= x
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def __compact(self):
+        # Entradas obsoletas só saem pelo topo; reconstrói se passarem da metade
+        if len(self.__low) > 2 * len(self.__values) + 16:
+            self.__low = list(self.__values)
+            heapq.heapify(self.__low)
+            self.__high = [-x for x in self.__values]
+            heapq.heapify(self.__high)
+
+    @property
+    def min(self) -> float:
+        while self.__low and self.__low[0] not in self.__values:
+            heapq.heappop(self.__low)
+        return self.__low[0] if self.__low else 0
+
+    @property
+    def max(self) -> float:
+        while self.__high and -self.__high[0] not in self.__values:
+            heapq.heappop(self.__high)
+        return -self.__high[0] if self.__high else 0
+
+    def summary(self) -> dict:
+        return {
+            'average': self.mean if self.count else 0,
+            'max': self.max,
+            'min': self.min,
+            'std': math.sqrt(self.variance),
+        }
+
+
+class GroupAggregate:
+    """Agregados de um grupo de resultados (total geral ou um valor de dimensão)."""
+
+    def __init__(self):
+        self.rows = 0
+        self.comments = 0
+        self.force = RunningStats()
+        self.percentage = RunningStats()
+
+    def apply(self, result: dict, sign: int):
+        self.rows += sign
+        self.comments += sign if result.get('comment') else 0
+        for stats, field in ((self.force, 'force_N'), (self.percentage, 'result_percentage')):
+            value = _number(result.get(field))
+            if value is None:
+                continue
+            if sign > 0:
+                stats.add(value)
+            else:
+                stats.remove(value)
+
+    def kpis(self) -> dict:
+        """KPIs do grupo, nas mesmas chaves de `calculate_stats`."""
+        force = self.force.summary()
+        percentage = self.percentage.summary()
+        return {
+            'total': self.rows,
+            'force_stats': force,
+            'percentage_stats': percentage,
+            'comment_count': self.comments,
+            'average_force': force['average'],
+            'average_percentage': percentage['average'],
+            'samples_with_comments': self.comments,
+        }
+
+
+class ResultAggregates:
+    """
+    Agregados dos resultados por tipo de amostra, número de peça e lote,
+    atualizados em O(1) a cada criação, alteração, exclusão ou mesclagem
+    incremental, sem percorrer o conjunto completo.
+    """
+
+    def __init__(self):
+        self.overall = GroupAggregate()
+        self.groups = {dimension: {} for dimension in DIMENSIONS}
+
+    @classmethod
+    def from_results(cls, results: list) -> 'ResultAggregates':
+        aggregates = cls()
+        for result in results:
+            aggregates.add(result)
+        logging.info(f"Agregados construídos para {len(results)} resultados.")
+        return aggregates
+
+    def __key(self, dimension, result):
+        if dimension == 'part_number':
+            return part_number_of(result)
+        return result.get(dimension) or 'N/A'
+
+    def __apply(self, result, sign):
+        self.overall.apply(result, sign)
+        for dimension, groups in self.groups.items():
+            key = self.__key(dimension, result)
+            group = groups.setdefault(key, GroupAggregate())
+            group.apply(result, sign)
+            if not group.rows:
+                del groups[key]
+
+    def add(self, result: dict):
+        self.__apply(result, 1)
+
+    def remove(self, result: dict):
+        self.__apply(result, -1)
+
+    def replace(self, old: dict, new: dict):
+        """Aplica uma alteração (old/new podem ser None para inclusão/exclusão)."""
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def kpis(self, dimension=None, value=None) -> dict:
+        """
+        KPIs do dashboard a partir dos agregados.
+
+        Args:
+            dimension (str): Dimensão do grupo; None para o total geral.
+            value (str): Valor da dimensão.
+
+        Returns:
+            dict: total, médias, desvios e comentários, nas mesmas chaves
+            de `calculate_stats`.
+        """
+        group = self.overall if dimension is None else self.groups[dimension].get(str(value), GroupAggregate())
+        return group.kpis()
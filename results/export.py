@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from api.store import STORE_PATH
+
+try:
+    import xlsxwriter
+except ImportError:  # XLSX é opcional
+    xlsxwriter = None
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Linhas serializadas por vez; limita a memória extra da exportação
+EXPORT_CHUNK_ROWS = 50_000
+# Arquivos exportados mantidos em disco por sessão
+EXPORT_CACHE_MAX_FILES = 8
+# Diretório dos arquivos exportados, ao lado do cache local
+EXPORT_DIR = os.path.join(os.path.dirname(STORE_PATH) or '.', 'exports')
+# Idade, em segundos, a partir da qual arquivos de sessões encerradas são apagados
+EXPORT_MAX_AGE = 24 * 60 * 60
+# Limite de linhas de uma planilha do Excel (descontado o cabeçalho)
+XLSX_MAX_ROWS = 1_048_575
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'xlsx': {'label': 'Excel (XLSX)', 'extension': 'xlsx',
+             'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+}
+
+
+def available_formats() -> list:
+    """Formatos de exportação disponíveis no ambiente."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'xlsx' or xlsxwriter is not None]
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df: pd.DataFrame, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(file, index=False, header=i == 0)
+        if df.empty:
+            df.to_csv(file, index=False)
+
+
+def write_parquet(df: pd.DataFrame, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    schema = pa.Schema.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+    # Colunas de texto vazias no primeiro bloco não definem o tipo
+    schema = pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ], metadata=schema.metadata)
+    with pq.ParquetWriter(path, schema) as writer:
+        # Cada bloco vira um row group; o arquivo nunca é montado em memória
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(df: pd.DataFrame, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    if xlsxwriter is None:
+        raise ValueError('Exportação XLSX indisponível: instale o pacote xlsxwriter.')
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f'O Excel comporta no máximo {XLSX_MAX_ROWS:,} linhas; use CSV ou Parquet.'.replace(',', '.'))
+    # constant_memory grava linha a linha, sem manter a planilha em memória;
+    # por isso as linhas são escritas aqui, em ordem, e não via DataFrame.to_excel
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+    })
+    try:
+        sheet = workbook.add_worksheet('Resultados')
+        sheet.write_row(0, 0, [str(c) for c in df.columns])
+        row = 1
+        for chunk in _chunks(df, chunk_rows):
+            # tolist() devolve tipos do Python; ausentes ficam em branco
+            columns = [
+                series.astype(object).where(series.notna(), None).tolist()
+                for _, series in chunk.items()
+            ]
+            for record in zip(*columns):
+                sheet.write_row(row, 0, record)
+                row += 1
+    finally:
+        workbook.close()
+
+
+WRITERS = {'csv': write_csv, 'parquet': write_parquet, 'xlsx': write_xlsx}
+
+
+class ExportCache:
+    """
+    Arquivos exportados por (formato, chave da visão filtrada).
+
+    Como a chave da visão inclui a versão dos dados, downloads repetidos da
+    mesma seleção reaproveitam o arquivo já gravado em disco; os mais
+    antigos são apagados quando o limite de arquivos é atingido.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, max_files=EXPORT_CACHE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        # Versões de dados são contadas por sessão: o prefixo evita colisões
+        self.__prefix = uuid.uuid4().hex[:8]
+        self.__files = OrderedDict()
+        self.prune()
+
+    def prune(self, max_age=EXPORT_MAX_AGE):
+        """Apaga arquivos antigos deixados por sessões já encerradas."""
+        if not os.path.isdir(self.directory):
+            return
+        limit = time.time() - max_age
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path) and os.path.getmtime(path) < limit:
+                os.remove(path)
+
+    def path(self, fmt, key):
+        """Arquivo já exportado para a seleção, ou None."""
+        path = self.__files.get((fmt, key))
+        if path is None or not os.path.exists(path):
+            return None
+        self.__files.move_to_end((fmt, key))
+        return path
+
+    def export(self, df: pd.DataFrame, fmt: str, key) -> str:
+        """
+        Exporta a seleção no formato pedido, em blocos, reaproveitando o
+        arquivo se já existir.
+
+        Args:
+            df (pandas.DataFrame): Linhas a exportar.
+            fmt (str): Uma das chaves de `EXPORT_FORMATS`.
+            key (hashable): Chave da visão (versão dos dados e filtros).
+
+        Returns:
+            str: Caminho do arquivo gerado.
+        """
+        # Sem chave não há como saber se o arquivo ainda corresponde aos dados
+        cached = self.path(fmt, key) if key is not None else None
+        if cached is not None:
+            return cached
+
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha1(repr((fmt, key)).encode()).hexdigest()[:16]
+        path = os.path.join(self.directory, f'{self.__prefix}-{digest}.{EXPORT_FORMATS[fmt]["extension"]}')
+        started = time.perf_counter()
+        partial = f'{path}.partial'
+        try:
+            WRITERS[fmt](df, partial)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.replace(partial, path)
+        logging.info(
+            f"Exportação {fmt} de {len(df)} linhas em {time.perf_counter() - started:.2f}s "
+            f"({os.path.getsize(path) / 1024:.0f} KiB)."
+        )
+
+        self.__files[(fmt, key)] = path
+        while len(self.__files) > self.max_files:
+            _, evicted = self.__files.popitem(last=False)
+            if evicted not in self.__files.values() and os.path.exists(evicted):
+                os.remove(evicted)
+        return path
@@ -0,0 +1,110 @@
+import logging
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+class ResultFrame:
+    """
+    Representação colunar e tipada dos resultados.
+
+    Construída uma única vez por versão dos dados e consumida por filtros,
+    estatísticas, gráficos, tabela e exportação, evitando converter a lista
+    de dicionários em DataFrame a cada rerun.
+    """
+
+    FLOAT_COLUMNS = ('force_N', 'result_percentage')
+    CATEGORY_COLUMNS = ('sample_type', 'sample_side', 'production_batch', 'part_number')
+    DATETIME_COLUMNS = ('sample_taken_datetime', 'sample_extraction_datetime', 'updated_at')
+
+    def __init__(self, df: pd.DataFrame, version=None):
+        self.df = df
+        self.version = version
+
+    @classmethod
+    def from_records(cls, results: list, version=None) -> 'ResultFrame':
+        """
+        Constrói o frame a partir dos resultados da API.
+
+        Args:
+            results (list): Resultados (lista de dicionários).
+            version: Versão dos dados que originaram o frame.
+
+        Returns:
+            ResultFrame: Frame com colunas tipadas.
+        """
+        df = pd.DataFrame.from_records(results)
+
+        # O part_number pode vir aninhado em 'product' ou já achatado
+        if 'product' in df.columns:
+            nested = df['product'].map(lambda p: p.get('part_number') if isinstance(p, dict) else None)
+            if 'part_number' in df.columns:
+                nested = nested.fillna(df['part_number'])
+            df['part_number'] = nested
+            df = df.drop(columns='product')
+
+        for column in cls.FLOAT_COLUMNS:
+            if column not in df.columns:
+                df[column] = pd.Series(dtype='float32')
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+        for column in cls.CATEGORY_COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+            df[column] = df[column].fillna('N/A').astype('category')
+        for column in cls.DATETIME_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], utc=True, format='ISO8601', errors='coerce')
+        if 'comment' not in df.columns:
+            df['comment'] = ''
+        df['comment'] = df['comment'].fillna('')
+
+        logging.info(f"ResultFrame construído: {len(df)} linhas, {df.memory_usage(deep=True).sum() / 1024:.0f} KiB.")
+        return cls(df, version)
+
+    def __len__(self):
+        return len(self.df)
+
+    def unique(self, column: str) -> list:
+        """Valores distintos presentes em uma coluna categórica, ordenados."""
+        if column not in self.df.columns:
+            return []
+        return sorted(str(value) for value in self.df[column].dropna().unique())
+
+    def take(self, positions) -> 'ResultFrame':
+        """
+        Seleciona linhas por posição (ver `ResultIndex.select`).
+
+        Args:
+            positions (numpy.ndarray | None): Posições; None mantém todas.
+
+        Returns:
+            ResultFrame: Frame com as linhas selecionadas.
+        """
+        if positions is None:
+            return self
+        return ResultFrame(self.df.iloc[positions], self.version)
+
+    def filter(self, part_numbers=None, sample_types=None, production_batch=None, sample_side=None) -> 'ResultFrame':
+        """
+        Filtra o frame; critérios None não restringem.
+
+        Args:
+            part_numbers (list): Números de peça aceitos.
+            sample_types (list): Tipos de amostra aceitos.
+            production_batch (str): Lote de produção.
+            sample_side (str): Lado da amostra ('direito' ou 'esquerdo').
+
+        Returns:
+            ResultFrame: Novo frame com as linhas selecionadas.
+        """
+        mask = pd.Series(True, index=self.df.index)
+        if part_numbers is not None:
+            mask &= self.df['part_number'].isin(part_numbers)
+        if sample_types is not None:
+            mask &= self.df['sample_type'].isin(sample_types)
+        if production_batch is not None:
+            mask &= self.df['production_batch'] == production_batch
+        if sample_side is not None:
+            mask &= self.df['sample_side'] == sample_side
+        return ResultFrame(self.df[mask], self.version)
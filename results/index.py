@@ -0,0 +1,110 @@
+import logging
+import numpy as np
+from results.frame import ResultFrame
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+class ResultIndex:
+    """
+    Índice invertido dos filtros do dashboard.
+
+    Para cada valor de `part_number`, `sample_type`, `production_batch` e
+    `sample_side` guarda as posições (ordenadas) das linhas do ResultFrame
+    que o contêm. Uma combinação de filtros é resolvida por união dentro de
+    cada coluna e interseção entre colunas, com custo proporcional às listas
+    envolvidas e não ao total de linhas.
+    """
+
+    COLUMNS = ('part_number', 'sample_type', 'production_batch', 'sample_side')
+
+    def __init__(self, frame: ResultFrame):
+        self.version = frame.version
+        self.size = len(frame)
+        self.__postings = {column: self.__build(frame, column) for column in self.COLUMNS}
+        logging.info(f"Índice de filtros construído para {self.size} linhas.")
+
+    @staticmethod
+    def __build(frame, column):
+        series = frame.df[column]
+        codes = series.cat.codes.to_numpy()
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        counts = np.bincount(codes, minlength=len(series.cat.categories))
+        lists = np.split(order, np.cumsum(counts)[:-1])
+        return {
+            str(value): positions
+            for value, positions in zip(series.cat.categories, lists)
+            if len(positions)
+        }
+
+    def values(self, column: str) -> list:
+        """Valores indexados de uma coluna, ordenados."""
+        return sorted(self.__postings[column])
+
+    def count(self, column: str, value) -> int:
+        """Número de linhas com o valor informado."""
+        return len(self.__postings[column].get(str(value), ()))
+
+    def search(self, text: str, columns=None):
+        """
+        Busca textual nas colunas indexadas.
+
+        Compara o texto (sem diferenciar maiúsculas) com os valores
+        distintos de cada coluna, não com as linhas.
+
+        Args:
+            text (str): Trecho procurado.
+            columns (iterable): Colunas consultadas; todas se omitido.
+
+        Returns:
+            numpy.ndarray: Posições ordenadas das linhas com algum valor
+            que contém o texto.
+        """
+        text = text.strip().lower()
+        lists = [
+            positions
+            for column in (columns or self.COLUMNS)
+            for value, positions in self.__postings[column].items()
+            if text in value.lower()
+        ]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(lists))
+
+    def select(self, **criteria):
+        """
+        Resolve uma combinação de filtros.
+
+        Args:
+            **criteria: Coluna -> valor ou lista de valores aceitos. Valores
+                None não restringem a coluna.
+
+        Returns:
+            numpy.ndarray | None: Posições ordenadas das linhas selecionadas,
+            ou None quando nenhum critério restringe (todas as linhas).
+        """
+        selections = []
+        for column, accepted in criteria.items():
+            if accepted is None:
+                continue
+            if isinstance(accepted, str) or not hasattr(accepted, '__iter__'):
+                accepted = [accepted]
+            postings = self.__postings[column]
+            lists = [postings[str(v)] for v in accepted if str(v) in postings]
+            if not lists:
+                return np.empty(0, dtype=np.int32)
+            # União dos valores aceitos na mesma coluna
+            selections.append(lists[0] if len(lists) == 1 else np.sort(np.concatenate(lists)))
+
+        if not selections:
+            return None
+
+        # Interseção entre colunas, começando pela lista mais curta
+        selections.sort(key=len)
+        positions = selections[0]
+        for other in selections[1:]:
+            if not len(positions):
+                break
+            positions = positions[np.isin(positions, other, assume_unique=True)]
+        return positions
@@ -1,11 +1,49 @@
 import pandas as pd
 import streamlit as st
-import time
 from products.service import ProductService
 from results.service import ResultService
-from st_aggrid import AgGrid, GridOptionsBuilder
+from components.server_grid import server_grid
+from home.warmup import wait_for_warmup
 from datetime import datetime
 
+# Intervalo, em segundos, de atualização do estado dos envios
+SUBMISSIONS_REFRESH = 3
+
+SUBMISSION_STATUS = {
+    'pending': '⏳ Pendente',
+    'synced': '✅ Sincronizado',
+    'failed': '❌ Rejeitado',
+    'needs_login': '🔑 Aguardando novo login',
+}
+
+
+def stream_results(result_service):
+    """
+    Carrega os resultados em páginas, exibindo a primeira página
+    enquanto as demais ainda estão chegando.
+
+    A prévia só aparece quando as páginas vêm da API; com os resultados
+    já em cache, a lista é devolvida sem desenhar nada.
+
+    Returns:
+        list: Todos os resultados carregados.
+    """
+    if result_service.has_cached_results():
+        return result_service.get_results()
+
+    status = st.empty()
+    preview = st.empty()
+    results = []
+    for page in result_service.iter_results():
+        if not results and page:
+            preview.dataframe(pd.json_normalize(page), use_container_width=True)
+        results.extend(page)
+        status.caption(f'Carregando resultados... {len(results)} registros recebidos')
+    status.empty()
+    preview.empty()
+    return results
+
+
 def show_results():
     result_service = ResultService()
     product_service = ProductService()
@@ -13,143 +51,175 @@ def show_results():
     tab1, tab2 = st.tabs(['Listar Resultados', 'Cadastrar Novo Resultado'])
 
     # --- Aba 1: Listar Resultados ---
+    # Cada aba é um fragmento: o formulário não reconstrói a listagem
     with tab1:
-        try:
-            results = result_service.get_results()
-        except Exception as e:
-            st.error(f'Erro ao carregar resultados: {str(e)}')
-            results = []
-
-        if results:
-            st.write('Lista de Resultados:')
-            results_df = pd.json_normalize(results)
-
-            # Formatar datas
-            if 'sample_taken_datetime' in results_df.columns:
-                results_df['sample_taken_datetime'] = pd.to_datetime(
-                    results_df['sample_taken_datetime']
-                ).dt.strftime('%Y-%m-%d %H:%M:%S')
-            if 'sample_extraction_datetime' in results_df.columns:
-                results_df['sample_extraction_datetime'] = pd.to_datetime(
-                    results_df['sample_extraction_datetime']
-                ).dt.strftime('%Y-%m-%d %H:%M:%S')
-
-            # Seleção de colunas
-            selected_columns = st.multiselect(
-                'Selecionar Colunas',
-                options=results_df.columns,
-                default=list(results_df.columns[:5])
-            )
-            results_df = results_df[selected_columns]
-
-            # Configurar AgGrid
-            grid_options = GridOptionsBuilder.from_dataframe(results_df)
-            grid_options.configure_pagination(enabled=True)
-            grid_options.configure_default_column(
-                sortable=True,
-                filterable=True,
-                resizable=True,
+        show_results_listing(result_service)
+
+    # --- Aba 2: Cadastrar Resultado ---
+    with tab2:
+        show_result_form(result_service, product_service)
+
+
+@st.fragment
+def show_results_listing(result_service):
+    """Aba de listagem; a seleção de colunas reexecuta apenas esta aba."""
+    # Resultados e tabela de exibição podem já estar em preparo desde o login
+    wait_for_warmup('listings')
+    try:
+        # A prévia por páginas só vale na primeira carga; com os resultados
+        # em cache a tabela de exibição é lida direto
+        if not result_service.has_cached_results():
+            stream_results(result_service)
+        # Tabela achatada e com datas formatadas, refeita só quando os dados mudam
+        table = result_service.get_display_table()
+    except Exception as e:
+        st.error(f'Erro ao carregar resultados: {str(e)}')
+        table = None
+
+    if table is not None and not table.frame.empty:
+        st.write('Lista de Resultados:')
+
+        # Seleção de colunas: apenas uma projeção da tabela
+        selected_columns = st.multiselect(
+            'Selecionar Colunas',
+            options=table.columns,
+            default=table.columns[:5]
+        )
+        results_df = table.project(selected_columns)
+
+        # Grade paginada no servidor: só o bloco visível vai ao navegador
+        server_grid(
+            results_df,
+            key='results_grid',
+            version=result_service.get_data_version(),
+            enable_enterprise_modules=True,
+            fit_columns_on_grid_load=True,
+        )
+    else:
+        st.warning('Nenhum resultado encontrado.')
+
+
+@st.fragment
+def show_result_form(result_service, product_service):
+    """Formulário de cadastro; suas interações não reconstroem a listagem."""
+    st.title('Cadastrar Novo Resultado')
+
+    # Seleção de produtos
+    try:
+        products = product_service.get_products()
+        product_titles = {product['part_number']: product['id'] for product in products}
+    except Exception as e:
+        st.error(f'Erro ao carregar produtos: {str(e)}')
+        return
+
+    selected_product = st.selectbox('Produto', list(product_titles.keys()))
+    sample_types = st.multiselect(
+        'Tipo de Amostra',
+        options=['centragem', 'cone'],
+        default=['centragem']
+    )
+
+    result_data = {}
+
+    # Campos para cada tipo
+    for sample_type in sample_types:
+        with st.expander(f"Resultados para {sample_type}", expanded=True):
+            force_key = f"force_{sample_type}"
+            percentage_key = f"percentage_{sample_type}"
+
+            force_N = st.number_input(
+                label=f'Força (N) - {sample_type}',
+                min_value=0.0,
+                step=0.1,
+                value=400.0 if sample_type == 'cone' else 500.0,
+                key=force_key
             )
-            AgGrid(
-                data=results_df,
-                gridOptions=grid_options.build(),
-                enable_enterprise_modules=True,
-                fit_columns_on_grid_load=True,
-                reload_data=True,
-                key='results_grid',
+            result_percentage = st.number_input(
+                label=f'Resultado (%) - {sample_type}',
+                min_value=0.0,
+                max_value=100.0,
+                step=0.1,
+                key=percentage_key
             )
-        else:
-            st.warning('Nenhum resultado encontrado.')
 
-    # --- Aba 2: Cadastrar Resultado ---
-    with tab2:  # ✅ Tudo dentro deste bloco pertence à aba de cadastro
-        st.title('Cadastrar Novo Resultado')
-
-        # Seleção de produtos
-        try:
-            products = product_service.get_products()
-            product_titles = {product['part_number']: product['id'] for product in products}
-        except Exception as e:
-            st.error(f'Erro ao carregar produtos: {str(e)}')
-            return
+            result_data[sample_type] = {
+                'force_N': force_N,
+                'result_percentage': result_percentage
+            }
 
-        selected_product = st.selectbox('Produto', list(product_titles.keys()))
-        sample_types = st.multiselect(
-            'Tipo de Amostra',
-            options=['centragem', 'cone'],
-            default=['centragem']
-        )
+            sample_side_key = f"sample_side_{sample_type}"
+            sample_side = st.selectbox(f'Lado da Amostra - {sample_type}', ['direito', 'esquerdo'], key=sample_side_key)
+            result_data[sample_type]['sample_side'] = sample_side
 
-        result_data = {}
+    # Campos comuns
+    production_batch = st.text_input('Lote de Produção')
+    comment = st.text_area('Comentário')
 
-        # Campos para cada tipo
+    # Botão de cadastro
+    if st.button('Cadastrar'):
+        if not production_batch.strip():
+            st.error('Lote de produção é obrigatório')
+            return
+
+        # Validar força mínima
+        errors = []
         for sample_type in sample_types:
-            with st.expander(f"Resultados para {sample_type}", expanded=True):
-                force_key = f"force_{sample_type}"
-                percentage_key = f"percentage_{sample_type}"
-
-                force_N = st.number_input(
-                    label=f'Força (N) - {sample_type}',
-                    min_value=0.0,
-                    step=0.1,
-                    value=400.0 if sample_type == 'cone' else 500.0,
-                    key=force_key
-                )
-                result_percentage = st.number_input(
-                    label=f'Resultado (%) - {sample_type}',
-                    min_value=0.0,
-                    max_value=100.0,
-                    step=0.1,
-                    key=percentage_key
-                )
-
-                result_data[sample_type] = {
-                    'force_N': force_N,
-                    'result_percentage': result_percentage
-                }
-                
-                sample_side_key = f"sample_side_{sample_type}"
-                sample_side = st.selectbox(f'Lado da Amostra - {sample_type}', ['direito', 'esquerdo'], key=sample_side_key)
-                result_data[sample_type]['sample_side'] = sample_side
-
-        # Campos comuns
-        production_batch = st.text_input('Lote de Produção')
-        comment = st.text_area('Comentário')
-
-        # Botão de cadastro
-        if st.button('Cadastrar'):
-            if not production_batch.strip():
-                st.error('Lote de produção é obrigatório')
-                return
-
-            # Validar força mínima
-            errors = []
-            for sample_type in sample_types:
-                min_force = 400 if sample_type == 'cone' else 500
-                if result_data[sample_type]['force_N'] < min_force:
-                    errors.append(f"Força mínima para '{sample_type}' é {min_force} N")
-
-            if errors:
-                st.error("\n".join(errors))
-                return
-
-            # Cadastrar resultados
-            try:
-                for sample_type in sample_types:
-                    new_result = result_service.create_result(
-                        sample=product_titles[selected_product],
-                        force_N=result_data[sample_type]['force_N'],
-                        result_percentage=result_data[sample_type]['result_percentage'],
-                        production_batch=production_batch,
-                        sample_type=sample_type,
-                        sample_side=result_data[sample_type]['sample_side'],
-                         comment=comment,
-                    )
-                    if not new_result:
-                        raise Exception("Falha ao cadastrar")
-
-                st.success('Resultados cadastrados!')
-                time.sleep(3)  # Delay de 3 segundos
-                st.rerun()
-            except Exception as e:
-                st.error(f'Erro: {str(e)}')
+            min_force = 400 if sample_type == 'cone' else 500
+            if result_data[sample_type]['force_N'] < min_force:
+                errors.append(f"Força mínima para '{sample_type}' é {min_force} N")
+
+        if errors:
+            st.error("\n".join(errors))
+            return
+
+        # Cadastrar todos os tipos de amostra em uma única operação
+        outcomes = result_service.create_results([
+            {
+                'sample': product_titles[selected_product],
+                'force_N': result_data[sample_type]['force_N'],
+                'result_percentage': result_data[sample_type]['result_percentage'],
+                'production_batch': production_batch,
+                'sample_type': sample_type,
+                'sample_side': result_data[sample_type]['sample_side'],
+                'comment': comment,
+            }
+            for sample_type in sample_types
+        ])
+        for sample_type, outcome in zip(sample_types, outcomes):
+            if outcome['ok']:
+                st.success(f"Resultado de {sample_type} registrado; envio à API em andamento.")
+            else:
+                st.error(f"Erro ao cadastrar {sample_type}: {outcome['error']}")
+
+    show_submissions(result_service)
+
+
+@st.fragment(run_every=SUBMISSIONS_REFRESH)
+def show_submissions(result_service):
+    """Exibe os envios desta sessão e o estado de cada um no outbox."""
+    submissions = result_service.get_submissions()
+    if not submissions:
+        return
+
+    counts = result_service.get_submission_counts()
+    st.subheader('Envios')
+    st.caption(
+        f"Pendentes: {counts['pending']} · Sincronizados: {counts['synced']} · Rejeitados: {counts['failed']}"
+        f" · Aguardando login: {counts['needs_login']}"
+    )
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'Registrado em': datetime.fromtimestamp(s['created_at']).strftime('%H:%M:%S'),
+                'Tipo de Amostra': s['payload'].get('sample_type'),
+                'Lote': s['payload'].get('production_batch'),
+                'Estado': SUBMISSION_STATUS.get(s['status'], s['status']),
+                'ID': (s['result'] or {}).get('id'),
+                'Tentativas': s['attempts'],
+                'Erro': s['last_error'] or '',
+            }
+            for s in submissions
+        ]),
+        use_container_width=True,
+        hide_index=True,
+    )
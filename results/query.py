@@ -0,0 +1,165 @@
+import logging
+from results.aggregates import _number, part_number_of
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Filtros do dashboard que podem ser enviados à API
+FILTER_FIELDS = ('part_number', 'sample_type', 'production_batch', 'sample_side')
+# Agregações simples suportadas e campos numéricos a que se aplicam
+AGGREGATE_FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+AGGREGATE_FIELDS = ('force_N', 'result_percentage')
+
+
+class ResultQuery:
+    """
+    Consulta de resultados: filtros, projeção de campos e agregações simples.
+
+    A mesma consulta é traduzida em parâmetros da API (`to_params`) quando o
+    backend os suporta, ou avaliada localmente (`apply`/`aggregate`) sobre a
+    lista de resultados quando não suporta.
+
+    Parâmetros gerados:
+        <filtro>=v1,v2      valores aceitos por filtro
+        fields=a,b          campos devolvidos
+        aggregate=avg:force_N,count
+    """
+
+    def __init__(self, filters=None, fields=None, aggregates=None):
+        """
+        Args:
+            filters (dict): Filtro -> valor ou lista de valores (None não restringe).
+            fields (iterable): Campos a devolver; None devolve todos.
+            aggregates (iterable): Agregações no formato 'função:campo' ou 'count'.
+        """
+        self.filters = {}
+        for column, accepted in (filters or {}).items():
+            if column not in FILTER_FIELDS:
+                raise ValueError(f"Filtro não suportado: {column}")
+            if accepted is None:
+                continue
+            if isinstance(accepted, str):
+                accepted = [accepted]
+            self.filters[column] = tuple(sorted(str(value) for value in accepted))
+        self.fields = tuple(fields) if fields else None
+        self.aggregates = tuple(aggregates or ())
+        for spec in self.aggregates:
+            self.__parse_aggregate(spec)
+
+    def where(self, **criteria) -> 'ResultQuery':
+        """Nova consulta com filtros adicionais."""
+        return ResultQuery({**self.filters, **criteria}, self.fields, self.aggregates)
+
+    def only(self, *fields) -> 'ResultQuery':
+        """Nova consulta que devolve apenas os campos informados."""
+        return ResultQuery(self.filters, fields, self.aggregates)
+
+    def aggregate_by(self, *aggregates) -> 'ResultQuery':
+        """Nova consulta com as agregações informadas."""
+        return ResultQuery(self.filters, self.fields, aggregates)
+
+    @property
+    def key(self) -> tuple:
+        """Chave estável da consulta, para cache."""
+        return (tuple(sorted(self.filters.items())), self.fields, self.aggregates)
+
+    @staticmethod
+    def __parse_aggregate(spec):
+        function, _, field = spec.partition(':')
+        if function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"Agregação não suportada: {spec}")
+        if function != 'count' and field not in AGGREGATE_FIELDS:
+            raise ValueError(f"Campo de agregação não suportado: {spec}")
+        return function, field
+
+    def to_params(self, capabilities: dict) -> tuple:
+        """
+        Traduz a consulta nos parâmetros aceitos pela API.
+
+        Args:
+            capabilities (dict): Recursos anunciados pela API
+                ({'filters': [...], 'fields': bool, 'aggregates': [...]}).
+
+        Returns:
+            tuple: (parâmetros, pushed) — `pushed` indica se todos os filtros
+            foram enviados; os restantes são avaliados localmente.
+        """
+        supported = set(capabilities.get('filters') or ())
+        params = {
+            column: ','.join(accepted)
+            for column, accepted in self.filters.items()
+            if column in supported
+        }
+        if self.fields and capabilities.get('fields'):
+            # Campos usados pelos filtros locais precisam vir na resposta
+            residual = [c for c in self.filters if c not in supported]
+            params['fields'] = ','.join(dict.fromkeys([*self.fields, *residual]))
+        return params, len(params.keys() & self.filters.keys()) == len(self.filters)
+
+    def residual(self, capabilities: dict) -> 'ResultQuery':
+        """Consulta com os filtros que a API não suporta, a avaliar localmente."""
+        supported = set(capabilities.get('filters') or ())
+        filters = {c: v for c, v in self.filters.items() if c not in supported}
+        return ResultQuery(filters, self.fields, self.aggregates)
+
+    def aggregate_params(self, capabilities: dict):
+        """
+        Parâmetros para agregar na API, ou None se ela não puder calcular
+        todas as agregações com todos os filtros.
+        """
+        params, pushed = self.to_params({**capabilities, 'fields': False})
+        functions = set(capabilities.get('aggregates') or ())
+        if not pushed or not all(spec.partition(':')[0] in functions for spec in self.aggregates):
+            return None
+        params['aggregate'] = ','.join(self.aggregates)
+        return params
+
+    def matches(self, result: dict) -> bool:
+        """Indica se o resultado atende a todos os filtros."""
+        for column, accepted in self.filters.items():
+            value = part_number_of(result) if column == 'part_number' else result.get(column)
+            if str(value) not in accepted:
+                return False
+        return True
+
+    def apply(self, results: list) -> list:
+        """
+        Avalia filtros e projeção localmente.
+
+        Args:
+            results (list): Resultados (lista de dicionários).
+
+        Returns:
+            list: Resultados filtrados, com apenas os campos pedidos.
+        """
+        selected = [r for r in results if self.matches(r)]
+        if self.fields:
+            selected = [{f: r.get(f) for f in self.fields if f in r} for r in selected]
+        return selected
+
+    def aggregate(self, results: list) -> dict:
+        """
+        Calcula as agregações localmente sobre os resultados filtrados.
+
+        Returns:
+            dict: Valor por agregação ('count', 'avg:force_N', ...).
+        """
+        selected = [r for r in results if self.matches(r)]
+        values = {}
+        for spec in self.aggregates:
+            function, field = self.__parse_aggregate(spec)
+            if function == 'count':
+                values[spec] = len(selected)
+                continue
+            numbers = [n for n in (_number(r.get(field)) for r in selected) if n is not None]
+            if not numbers:
+                values[spec] = None
+            elif function == 'sum':
+                values[spec] = sum(numbers)
+            elif function == 'avg':
+                values[spec] = sum(numbers) / len(numbers)
+            elif function == 'min':
+                values[spec] = min(numbers)
+            else:
+                values[spec] = max(numbers)
+        return values
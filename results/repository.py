@@ -1,71 +1,221 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import streamlit as st
+from api.auth import BearerAuth, TokenPair, expire_session, get_auth
+from api.cache import get_cache
+from api.client import BASE_URL, get_client
+from api.outbox import get_outbox
+from api.store import get_store
+from results.query import ResultQuery
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 
+RESULTS_PAGE_SIZE = 500
+# Envios simultâneos quando a API não aceita cadastro em lote
+MAX_CONCURRENT_POSTS = 4
+
+# Parâmetro de consulta usado pela API para cada tipo de marca d'água
+SINCE_PARAMS = {
+    'updated_at': 'updated_after',
+    'id': 'id_after',
+}
+
 class ResultRepository:
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
+        self.__client = get_client()
+        self.__store = get_store()
+        self.__cache = get_cache()
         self.__results_endpoint = f'{self.__base_url}results/'
+        self.__results_ids_endpoint = f'{self.__results_endpoint}ids/'
+        self.__capabilities_endpoint = f'{self.__results_endpoint}capabilities/'
+        self.__aggregate_endpoint = f'{self.__results_endpoint}aggregate/'
         
         # Validação de token
         if 'token' not in st.session_state:
             logging.error("Token de autorização não encontrado")
             st.error("Sessão expirada. Faça login novamente.")
-            st.session_state.clear()
+            expire_session()
             st.rerun()
             
         self.__headers = {
-            'Authorization': f'Bearer {st.session_state.token}',
             'Content-Type': 'application/json'
         }
+        # Token renovado antes de expirar; em 401 a requisição é repetida uma vez
+        self.__auth = get_auth()
+
+        # Cada envio do outbox segue com os tokens da sessão que o gravou
+        self.__outbox = get_outbox()
+        self.__outbox.start('results', send_results)
+
+    def iter_results(self, page_size: int = RESULTS_PAGE_SIZE, filters: dict = None):
+        """Percorre os resultados da API página a página (generator)"""
+        url = self.__results_endpoint
+        params = {**(filters or {}), 'page': 1, 'page_size': page_size}
+        while url:
+            try:
+                logging.info(f"GET {url} {params or ''}")
+                payload = self.__client.get_shared(
+                    url,
+                    self.__handle_response,
+                    params=params,
+                    headers=self.__headers,
+                    auth=self.__auth
+                )
+            except Exception as e:
+                logging.error(f"Erro na requisição: {str(e)}")
+                st.error("Falha na comunicação com o servidor")
+                raise
+
+            # API sem paginação devolve a coleção inteira como lista
+            if isinstance(payload, list):
+                yield payload
+                return
+
+            yield payload.get('results', [])
+            # O link 'next' já carrega os parâmetros da próxima página
+            url, params = payload.get('next'), None
+
+    def get_results_since(self, field: str, value) -> list:
+        """Obtém apenas os resultados criados/alterados após a marca d'água"""
+        filters = {SINCE_PARAMS[field]: value} if field else {}
+        changed = []
+        for page in self.iter_results(filters=filters):
+            changed.extend(page)
+        return changed
 
-    @st.cache_data(ttl=300, hash_funcs={requests.sessions.Session: id})
-    def get_results(_self) -> list:
-        """Obtém resultados da API com cache inteligente"""
+    def get_result_ids(self):
+        """Obtém os IDs existentes na API (None se o endpoint não existir)"""
         try:
-            logging.info(f"GET {_self.__results_endpoint}")
-            response = requests.get(
-                _self.__results_endpoint,
-                headers=_self.__headers,
-                timeout=10
+            logging.info(f"GET {self.__results_ids_endpoint}")
+            return self.__client.get_shared(
+                self.__results_ids_endpoint,
+                self.__handle_ids_response,
+                headers=self.__headers,
+                auth=self.__auth
             )
-            return _self.__handle_response(response)    
         except Exception as e:
             logging.error(f"Erro na requisição: {str(e)}")
-            st.error("Falha na comunicação com o servidor")
             raise
 
+    @st.cache_data(ttl=3600, hash_funcs={requests.sessions.Session: id})
+    def get_capabilities(_self) -> dict:
+        """Filtros, projeção e agregações aceitos pela API (vazio se não houver)"""
+        try:
+            logging.info(f"GET {_self.__capabilities_endpoint}")
+            response = _self.__client.get(
+                _self.__capabilities_endpoint,
+                headers=_self.__headers,
+                auth=_self.__auth
+            )
+            if response.status_code == 404:
+                logging.info("API sem filtros no servidor; consultas avaliadas localmente.")
+                return {}
+            return _self.__handle_response(response)
+        except Exception as e:
+            logging.error(f"Erro ao consultar recursos da API: {str(e)}")
+            return {}
+
+    def query_results(self, query: ResultQuery) -> list:
+        """Resultados da consulta, filtrando na API o que ela suportar"""
+        capabilities = self.get_capabilities()
+        params, pushed = query.to_params(capabilities)
+        if not pushed:
+            logging.info(f"Filtros avaliados localmente: {query.key}")
+        rows = []
+        for page in self.iter_results(filters=params):
+            rows.extend(page)
+        # Completa localmente os filtros e a projeção que a API não aplicou
+        return query.residual(capabilities).apply(rows)
+
+    def can_aggregate(self, query: ResultQuery) -> bool:
+        """Se a API calcula as agregações da consulta sem enviar os resultados"""
+        return query.aggregate_params(self.get_capabilities()) is not None
+
+    def aggregate_results(self, query: ResultQuery) -> dict:
+        """Agregações da consulta, calculadas na API quando possível"""
+        params = query.aggregate_params(self.get_capabilities())
+        if params is None:
+            logging.info(f"Agregações calculadas localmente: {query.key}")
+            fields = [spec.partition(':')[2] for spec in query.aggregates]
+            rows = self.query_results(query.only('id', *filter(None, fields)))
+            # As linhas já vêm filtradas e projetadas; resta só agregar
+            return ResultQuery(aggregates=query.aggregates).aggregate(rows)
+        logging.info(f"GET {self.__aggregate_endpoint} {params}")
+        return self.__client.get_shared(
+            self.__aggregate_endpoint,
+            self.__handle_response,
+            params=params,
+            headers=self.__headers,
+            auth=self.__auth
+        )
+
+    def load_stored_results(self):
+        """Lê os resultados do cache local em disco (None se não houver)"""
+        return self.__store.load_records('results')
+
+    def store_results(self, results: list) -> int:
+        """Grava todos os resultados no cache local em disco (carga completa)"""
+        return self.__store.replace_records('results', results)
+
+    def store_result_changes(self, changed: list, deleted_ids: list) -> int:
+        """Grava no cache local apenas os resultados alterados e excluídos"""
+        return self.__store.save_records('results', changed, deleted_ids)
+
     def create_result(self, result_data: dict) -> dict:
         """Cria novo resultado na API"""
         try:
             logging.info(f"POST {self.__results_endpoint}")
-            response = requests.post(
+            response = self.__client.post(
                 self.__results_endpoint,
                 json=result_data,
                 headers=self.__headers,
-                timeout=10
+                auth=self.__auth
             )
-            return self.__handle_response(response)
+            result = self.__handle_response(response)
+            self.__cache.invalidate('results')
+            return result
         except Exception as e:
             logging.error(f"Falha ao criar: {str(e)}")
             st.error("Erro ao registrar resultado")
             raise
 
+    def create_results(self, items: list, keys: list = None) -> list:
+        """Cria vários resultados: em lote, ou em paralelo se a API não aceitar lote"""
+        return ResultSender(self.__auth.tokens).send(items, keys)
+
+    def enqueue_results(self, items: list) -> list:
+        """Grava os resultados no outbox local e devolve suas chaves de idempotência"""
+        return self.__outbox.enqueue('results', items, self.__auth.tokens)
+
+    def get_submissions(self, keys=None, limit: int = 50) -> list:
+        """Envios do outbox com seu estado (pending, synced, failed, needs_login)"""
+        return self.__outbox.entries('results', keys, limit)
+
+    def get_submission_counts(self) -> dict:
+        """Quantidade de envios do outbox por estado"""
+        return self.__outbox.counts('results')
+
+    def get_synced_submissions(self, since: float) -> tuple:
+        """Resultados confirmados pela API após `since` (e o novo `since`)"""
+        return self.__outbox.synced_since('results', since)
+
     def update_result(self, result_id: int, updated_data: dict) -> dict:
         """Atualiza resultado existente"""
         try:
             endpoint = f"{self.__results_endpoint}{result_id}/"
             logging.info(f"PUT {endpoint}")
-            response = requests.put(
+            response = self.__client.put(
                 endpoint,
                 json=updated_data,
                 headers=self.__headers,
-                timeout=10
+                auth=self.__auth
             )
-            return self.__handle_response(response)
+            result = self.__handle_response(response)
+            self.__cache.invalidate('results')
+            return result
         except Exception as e:
             logging.error(f"Falha ao atualizar: {str(e)}")
             st.error("Erro ao atualizar registro")
@@ -76,27 +226,40 @@ class ResultRepository:
         try:
             endpoint = f"{self.__results_endpoint}{result_id}/"
             logging.info(f"DELETE {endpoint}")
-            response = requests.delete(
+            response = self.__client.delete(
                 endpoint,
                 headers=self.__headers,
-                timeout=10
+                auth=self.__auth
             )
-            return self.__handle_response(response)
+            result = self.__handle_response(response)
+            self.__cache.invalidate('results')
+            return result
         except Exception as e:
             logging.error(f"Falha ao excluir: {str(e)}")
             st.error("Erro ao remover resultado")
             raise
 
+    def __handle_ids_response(self, response):
+        """Trata a resposta da lista de IDs (None se o endpoint não existir)"""
+        if response.status_code == 404:
+            logging.warning("API não expõe a lista de IDs de resultados.")
+            return None
+        return self.__handle_response(response)
+
     def __handle_response(self, response) -> dict:
         """Trata respostas da API com logging detalhado"""
         if response.status_code in (200, 201):
             logging.info(f"Resposta bem-sucedida: {response.status_code}")
             return response.json()
+
+        if response.status_code == 204:
+            logging.info("Resposta bem-sucedida: 204 (sem conteúdo)")
+            return {}
             
         if response.status_code == 401:
             logging.error("Token inválido/expirado")
             st.error("Sessão expirada. Faça login novamente.")
-            st.session_state.clear()
+            expire_session()
             st.rerun()
             
         if response.status_code >= 500:
@@ -105,4 +268,108 @@ class ResultRepository:
             
         logging.error(f"Erro {response.status_code}: {response.text}")
         response.raise_for_status()
-        return {}
\ No newline at end of file
+        return {}
+
+
+class ResultSender:
+    """
+    Envia novos resultados à API sem depender da sessão do Streamlit,
+    para uso também pelo worker do outbox.
+
+    Cada resultado pode levar uma chave de idempotência: no corpo
+    ('idempotency_key') no envio em lote e no cabeçalho Idempotency-Key
+    no envio individual.
+
+    Recebe um token de acesso ou um TokenPair; com o TokenPair, um 401
+    renova o token e repete o envio.
+    """
+
+    def __init__(self, token):
+        self.__client = get_client()
+        self.__results_endpoint = f'{BASE_URL}results/'
+        self.__bulk_endpoint = f'{self.__results_endpoint}bulk/'
+        self.__headers = {
+            'Content-Type': 'application/json'
+        }
+        self.__auth = BearerAuth(token if isinstance(token, TokenPair) else TokenPair(token))
+
+    def send(self, items: list, keys: list = None) -> list:
+        """Envia em lote ou, sem endpoint de lote, em paralelo; um resultado por item"""
+        keys = keys or [None] * len(items)
+        outcomes = self.__post_bulk(items, keys)
+        if outcomes is not None:
+            return outcomes
+        logging.info(f"Cadastro em lote indisponível; enviando {len(items)} resultados em paralelo.")
+        workers = max(min(len(items), MAX_CONCURRENT_POSTS), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.__post_one, items, keys))
+
+    def __post_bulk(self, items: list, keys: list):
+        """POST em lote; None se a API não expuser o endpoint ou a resposta não casar com os itens"""
+        logging.info(f"POST {self.__bulk_endpoint} ({len(items)} itens)")
+        body = [{**item, 'idempotency_key': key} if key else item for item, key in zip(items, keys)]
+        try:
+            response = self.__client.post(
+                self.__bulk_endpoint,
+                json=body,
+                headers=self.__headers,
+                auth=self.__auth
+            )
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Falha no envio em lote: {str(e)}")
+            return [{'ok': False, 'result': None, 'error': str(e), 'status': None} for _ in items]
+        if response.status_code in (404, 405):
+            return None
+        if not 200 <= response.status_code < 300:
+            logging.error(f"Erro {response.status_code}: {response.text}")
+            error = f"Erro {response.status_code}: {response.text}"
+            return [{'ok': False, 'result': None, 'error': error, 'status': response.status_code} for _ in items]
+        try:
+            outcomes = response.json()
+        except ValueError:
+            outcomes = None
+        if not isinstance(outcomes, list) or len(outcomes) != len(items):
+            # Sem um resultado por item não há como saber quais foram gravados;
+            # o envio individual repete as chaves de idempotência e a API descarta as duplicatas
+            logging.warning("Resposta do lote não corresponde aos itens enviados; enviando um a um.")
+            return None
+        return [
+            {'ok': True, 'result': o['result'], 'error': None, 'status': o['status']}
+            if 200 <= (o.get('status') or 0) < 300
+            else {'ok': False, 'result': None, 'error': str(o.get('errors') or o.get('detail')), 'status': o.get('status')}
+            for o in outcomes
+        ]
+
+    def __post_one(self, item: dict, key: str = None) -> dict:
+        """POST individual (executado em outra thread)"""
+        headers = {**self.__headers, 'Idempotency-Key': key} if key else self.__headers
+        try:
+            response = self.__client.post(
+                self.__results_endpoint,
+                json=item,
+                headers=headers,
+                auth=self.__auth
+            )
+            if response.status_code in (200, 201):
+                return {'ok': True, 'result': response.json(), 'error': None, 'status': response.status_code}
+            logging.error(f"Erro {response.status_code}: {response.text}")
+            error = f"Erro {response.status_code}: {response.text}"
+            return {'ok': False, 'result': None, 'error': error, 'status': response.status_code}
+        except Exception as e:
+            logging.error(f"Falha ao criar: {str(e)}")
+            return {'ok': False, 'result': None, 'error': str(e), 'status': None}
+
+
+def send_results(items: list, keys: list, token) -> list:
+    """Envio usado pelo worker do outbox (ver `Outbox.start`)"""
+    return ResultSender(token).send(items, keys)
+
+
+def start_outbox():
+    """Inicia o worker do outbox de resultados, com ou sem sessão autenticada"""
+    get_outbox().start('results', send_results)
+
+
+def resume_outbox(tokens):
+    """Retoma os envios do usuário que aguardavam um novo login"""
+    return get_outbox().resume(tokens)
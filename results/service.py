@@ -1,33 +1,424 @@
 # result_service.py (versão corrigida)
 import logging
+import time
 import streamlit as st
 from datetime import datetime
-from results.repository import ResultRepository
-from products.repository import ProductRepository
+from api.cache import get_cache
+from results.repository import ResultRepository, RESULTS_PAGE_SIZE
+from results.aggregates import DIMENSIONS, ResultAggregates
+from components.display_table import DisplayTable, display_table
+from results.export import ExportCache
+from results.frame import ResultFrame
+from results.index import ResultIndex
+from results.query import ResultQuery
+from results.stats import calculate_stats
+from results.views import FilteredView, FilteredViewCache, normalize_filters
+from results.sync import SYNC_INTERVAL, high_water_mark, merge_results
+from products.service import ProductService
 from dateutil.parser import parse
 
 logging.basicConfig(level=logging.INFO)  # Corrigido typo
 
 class ResultService:
+    # Campos enviados à API ao cadastrar um resultado
+    RESULT_FIELDS = ('sample', 'force_N', 'result_percentage', 'comment', 'sample_type', 'sample_side', 'production_batch')
+    DATETIME_COLUMNS = ('sample_taken_datetime', 'sample_extraction_datetime')
+    # Agregações dos KPIs que a API pode calcular antes da carga dos resultados
+    KPI_AGGREGATES = ('count', 'avg:force_N', 'avg:result_percentage')
+
     def __init__(self):
         self.result_repository = ResultRepository()
-        self.product_repository = ProductRepository()  # Adicionado
+        self.product_service = ProductService()
+        self.__cache = get_cache()
 
     def get_results(self) -> list:
-        if 'results' in st.session_state:
-            logging.info("Resultados carregados do cache.")
-            return st.session_state.results
+        if not self.__cache.is_current('results'):
+            # Outra sessão alterou os resultados: sincroniza já, sem esperar o intervalo
+            st.session_state.pop('results_synced_at', None)
+        if self.has_cached_results():
+            if self.__sync_due():
+                self.sync_results()
+            else:
+                logging.info("Resultados carregados do cache.")
+            return self.__merge_submissions()
         try:
-            logging.info("Buscando resultados na API...")
-            results = self.result_repository.get_results()
+            # Primeira carga em páginas, como em iter_results
+            for _ in self.__load_pages():
+                pass
         except Exception as e:
             logging.error(f"Erro ao obter resultados: {e}")
             st.error(f"Erro ao obter resultados: {e}")
             return []
-        
+        return st.session_state.results
+
+    def sync_results(self) -> list:
+        """
+        Sincroniza o cache da sessão de forma incremental.
+
+        Busca apenas os registros criados/alterados após a marca d'água e
+        reconcilia exclusões com a lista de IDs da API. Se a API não expõe
+        essa lista, faz uma recarga completa paginada.
+
+        Returns:
+            list: Resultados atualizados.
+        """
+        results = st.session_state.get('results', [])
+        field, value = high_water_mark(results)
+        changes = []
+
+        def on_change(old, new):
+            if old != new:
+                changes.append((old, new))
+                self.__apply_change(old, new)
+
+        try:
+            logging.info(f"Sincronizando resultados desde {field}={value}...")
+            live_ids = self.result_repository.get_result_ids()
+            if live_ids is None:
+                merged = [r for page in self.result_repository.iter_results() for r in page]
+            else:
+                changed = self.result_repository.get_results_since(field, value)
+                # part_number incluído de uma vez para todo o lote alterado
+                self.__add_part_numbers(changed)
+                merged = merge_results(results, changed, live_ids, on_change=on_change)
+        except Exception as e:
+            # Mantém os dados em cache; a próxima leitura tenta de novo
+            logging.error(f"Erro ao sincronizar resultados: {e}")
+            return results
+
+        if live_ids is None:
+            self.__set_results(merged)
+            self.__persist(merged)
+        elif changes:
+            # Os agregados já foram atualizados registro a registro
+            st.session_state.results = merged
+            self.__bump_version()
+            self.__persist_changes(changes)
+        self.__mark_synced()
+        logging.info(f"Sincronização concluída: {len(merged)} resultados em cache.")
+        return merged
+
+    def has_cached_results(self) -> bool:
+        """Se os resultados já estão na sessão (ou no cache local em disco)."""
+        return 'results' in st.session_state or self.__load_stored()
+
+    def __load_stored(self) -> bool:
+        """
+        Preenche a sessão a partir do cache local em disco, se existir.
+
+        O horário da gravação vira o horário da última sincronização, de
+        modo que dados antigos são atualizados logo na leitura seguinte.
+        """
+        try:
+            stored = self.result_repository.load_stored_results()
+        except Exception as e:
+            logging.error(f"Erro ao ler resultados do cache local: {e}")
+            return False
+        if stored is None:
+            return False
+        self.__set_results(stored['payload'])
+        st.session_state.results_synced_at = stored['fetched_at']
+        logging.info(f"{len(stored['payload'])} resultados carregados do cache local (versão {stored['version']}).")
+        return True
+
+    def __persist(self, results: list):
+        try:
+            self.result_repository.store_results(results)
+        except Exception as e:
+            logging.error(f"Erro ao gravar resultados no cache local: {e}")
+
+    def __persist_changes(self, changes: list):
+        """Grava no disco só os registros do delta: (antigo, novo) por alteração."""
+        try:
+            self.result_repository.store_result_changes(
+                [new for _, new in changes if new is not None],
+                [old['id'] for old, new in changes if new is None],
+            )
+        except Exception as e:
+            logging.error(f"Erro ao gravar resultados no cache local: {e}")
+
+    def get_data_version(self) -> int:
+        """Versão dos resultados da sessão; muda a cada alteração do conjunto."""
+        return self.__cache.session_version('results')
+
+    def get_result_frame(self) -> ResultFrame:
+        """
+        Obtém o ResultFrame dos resultados (com part_number), construído
+        uma única vez por versão dos dados.
+
+        Returns:
+            ResultFrame: Frame tipado dos resultados da sessão.
+        """
+        results = self.get_results_with_products()  # Pode sincronizar e mudar a versão
+        version = self.get_data_version()
+        frame = st.session_state.get('results_frame')
+        if frame is None or frame.version != version:
+            frame = ResultFrame.from_records(results, version)
+            st.session_state.results_frame = frame
+        return frame
+
+    def get_display_table(self) -> DisplayTable:
+        """
+        Obtém a tabela de exibição dos resultados (campos achatados e datas
+        formatadas), construída uma única vez por versão dos dados.
+
+        Returns:
+            DisplayTable: Tabela pronta para a listagem.
+        """
+        results = self.get_results()  # Pode sincronizar e mudar a versão
+        return display_table('results', self.get_data_version(), lambda: results, self.DATETIME_COLUMNS)
+
+    def get_result_index(self) -> ResultIndex:
+        """
+        Obtém o índice de filtros do ResultFrame, construído uma única vez
+        por versão dos dados.
+
+        Returns:
+            ResultIndex: Índice invertido dos filtros do dashboard.
+        """
+        frame = self.get_result_frame()
+        index = st.session_state.get('results_index')
+        if index is None or index.version != frame.version:
+            index = ResultIndex(frame)
+            st.session_state.results_index = index
+        return index
+
+    def get_filtered_view(self, **criteria) -> FilteredView:
+        """
+        Obtém as linhas filtradas e suas estatísticas, reaproveitando visões
+        recentes da mesma versão dos dados.
+
+        Args:
+            **criteria: Filtros de `ResultIndex.select` (None não restringe).
+
+        Returns:
+            FilteredView: Frame filtrado, estatísticas e entradas derivadas.
+        """
+        index = self.get_result_index()
+        if 'results_views' not in st.session_state:
+            st.session_state.results_views = FilteredViewCache()
+        cache = st.session_state.results_views
+
+        key = (index.version, normalize_filters(**criteria))
+        view = cache.get(key)
+        if view is None:
+            frame = self.get_result_frame().take(index.select(**criteria))
+            view = FilteredView(frame, self.calculate_stats(frame), key)
+            cache.put(key, view)
+        return view
+
+    def get_exported(self, view: FilteredView, fmt: str):
+        """Arquivo já exportado para a visão no formato pedido, ou None."""
+        exports = st.session_state.get('results_exports')
+        if exports is None or view.key is None:
+            return None
+        return exports.path(fmt, view.key)
+
+    def export_results(self, view: FilteredView, fmt: str) -> str:
+        """
+        Exporta as linhas da visão filtrada (ver `results.export`).
+
+        O arquivo é gerado em blocos e reaproveitado enquanto a versão dos
+        dados e os filtros não mudarem.
+
+        Args:
+            view (FilteredView): Visão a exportar.
+            fmt (str): 'csv', 'parquet' ou 'xlsx'.
+
+        Returns:
+            str: Caminho do arquivo gerado.
+
+        Raises:
+            ValueError: Se o formato não puder ser gerado (ex.: limite do Excel).
+        """
+        if 'results_exports' not in st.session_state:
+            st.session_state.results_exports = ExportCache()
+        return st.session_state.results_exports.export(view.frame.df, fmt, view.key)
+
+    def get_aggregates(self) -> ResultAggregates:
+        """
+        Obtém os agregados incrementais dos resultados, construídos uma vez
+        e depois mantidos a cada criação, alteração, exclusão e sincronização.
+
+        Returns:
+            ResultAggregates: Agregados por tipo, número de peça e lote.
+        """
+        aggregates = st.session_state.get('results_aggregates')
+        if aggregates is None:
+            aggregates = ResultAggregates.from_results(self.get_results_with_products())
+            st.session_state.results_aggregates = aggregates
+        return aggregates
+
+    def get_kpis(self, **criteria) -> dict:
+        """
+        KPIs do dashboard para uma seleção de filtros.
+
+        Sem filtros, ou com um único valor em uma dimensão agregada, lê
+        direto dos agregados incrementais; nos demais casos usa as
+        estatísticas da visão filtrada.
+
+        Args:
+            **criteria: Filtros de `ResultIndex.select` (None não restringe).
+
+        Returns:
+            dict: total, average_force, average_percentage, samples_with_comments, ...
+        """
+        active = {column: value for column, value in criteria.items() if value is not None}
+        if not active:
+            return self.get_aggregates().kpis()
+        if len(active) == 1:
+            (column, value), = active.items()
+            values = [value] if isinstance(value, str) else list(value)
+            if column in DIMENSIONS and len(values) == 1:
+                return self.get_aggregates().kpis(column, values[0])
+        return self.get_filtered_view(**criteria).stats
+
+    def get_remote_kpis(self, **criteria):
+        """
+        KPIs principais calculados pela API, sem carregar os resultados.
+
+        Usado na primeira carga da sessão, para que o dashboard mostre os
+        totais enquanto as páginas de resultados ainda estão chegando.
+
+        Args:
+            **criteria: Filtros de `ResultQuery` (None não restringe).
+
+        Returns:
+            dict: total, average_force e average_percentage; None se a API
+            não calcula essas agregações (ou a consulta falhar).
+        """
+        query = ResultQuery(criteria, aggregates=self.KPI_AGGREGATES)
+        try:
+            if not self.result_repository.can_aggregate(query):
+                return None
+            values = self.result_repository.aggregate_results(query)
+        except Exception as e:
+            logging.error(f"Erro ao obter KPIs da API: {e}")
+            return None
+        return {
+            'total': values.get('count') or 0,
+            'average_force': values.get('avg:force_N') or 0,
+            'average_percentage': values.get('avg:result_percentage') or 0,
+        }
+
+    def __apply_change(self, old, new):
+        """
+        Atualiza os agregados, se já construídos, com uma alteração de registro.
+
+        O registro novo já deve ter `part_number` (ver `__add_part_numbers`,
+        chamado uma vez por lote de alterações).
+        """
+        aggregates = st.session_state.get('results_aggregates')
+        if aggregates is None:
+            return
+        aggregates.replace(old, new)
+
+    def __set_results(self, results: list):
+        # part_number definido antes de os registros entrarem nos agregados
+        st.session_state.results_part_numbers = self.__part_number_map()
+        self.__add_part_numbers(results, st.session_state.results_part_numbers)
         st.session_state.results = results
+        # A carga completa já inclui os envios confirmados até aqui
+        st.session_state.results_submissions_since = time.time()
+        # Conjunto substituído por completo: agregados são refeitos sob demanda
+        st.session_state.pop('results_aggregates', None)
+        self.__bump_version()
+
+    def __merge_submissions(self) -> list:
+        """Incorpora à sessão os resultados do outbox já confirmados pela API."""
+        since = st.session_state.setdefault('results_submissions_since', time.time())
+        synced, since = self.result_repository.get_synced_submissions(since)
+        st.session_state.results_submissions_since = since
+        if synced:
+            self.__add_part_numbers(synced)
+            st.session_state.results = merge_results(
+                st.session_state.get('results', []), synced, on_change=self.__apply_change
+            )
+            self.__bump_version()
+            logging.info(f"{len(synced)} resultados do outbox incorporados ao cache.")
+        return st.session_state.results
+
+    def __bump_version(self):
+        self.__cache.bump('results')
+
+    def __sync_due(self) -> bool:
+        synced_at = st.session_state.get('results_synced_at')
+        return synced_at is None or time.time() - synced_at >= SYNC_INTERVAL
+
+    def __mark_synced(self):
+        st.session_state.results_synced_at = time.time()
+        self.__cache.mark_current('results')
+
+    def iter_results(self, page_size: int = RESULTS_PAGE_SIZE):
+        """
+        Carrega os resultados página a página, montando o cache da sessão.
+
+        O cache só é gravado quando a última página chega, para que uma
+        carga interrompida não deixe um conjunto parcial na sessão.
+
+        Yields:
+            list: Resultados de cada página, na ordem recebida da API.
+        """
+        if self.has_cached_results():
+            # Já em cache: get_results aplica a sincronização incremental se preciso
+            yield self.get_results()
+            return
+        yield from self.__load_pages(page_size)
+
+    def __load_pages(self, page_size: int = RESULTS_PAGE_SIZE):
+        """Busca os resultados na API em páginas e grava o cache ao receber a última."""
+        logging.info("Buscando resultados na API em páginas...")
+        results = []
+        for page in self.result_repository.iter_results(page_size):
+            results.extend(page)
+            yield page
+
+        self.__set_results(results)
+        self.__mark_synced()
+        self.__persist(results)
         logging.info(f"{len(results)} resultados carregados e armazenados no cache.")
-        return results
+
+    def query_results(self, query: ResultQuery) -> list:
+        """
+        Executa uma consulta de resultados.
+
+        Com os resultados já na sessão, avalia localmente sem acessar a
+        API; caso contrário envia filtros e projeção à API, que devolve
+        apenas as linhas pedidas.
+
+        Args:
+            query (ResultQuery): Filtros, campos e agregações.
+
+        Returns:
+            list: Resultados que atendem à consulta.
+        """
+        if 'results' in st.session_state:
+            return query.apply(self.get_results())
+        try:
+            return self.result_repository.query_results(query)
+        except Exception as e:
+            logging.error(f"Erro ao consultar resultados: {e}")
+            st.error(f"Erro ao consultar resultados: {e}")
+            return []
+
+    def aggregate_results(self, query: ResultQuery) -> dict:
+        """
+        Calcula as agregações de uma consulta (ver `query_results`).
+
+        Args:
+            query (ResultQuery): Filtros e agregações ('avg:force_N', 'count', ...).
+
+        Returns:
+            dict: Valor por agregação.
+        """
+        if 'results' in st.session_state:
+            return query.aggregate(self.get_results())
+        try:
+            return self.result_repository.aggregate_results(query)
+        except Exception as e:
+            logging.error(f"Erro ao agregar resultados: {e}")
+            st.error(f"Erro ao agregar resultados: {e}")
+            return {}
 
     def create_result(self, sample: int, force_N: float, result_percentage: float, comment: str, sample_type: str, sample_side: str, production_batch: str) -> dict:  # Parâmetro adicionado
         logging.info("Tentando criar novo resultado...")
@@ -57,10 +448,157 @@ class ResultService:
 
         if 'results' not in st.session_state:
             st.session_state.results = []
+        self.__add_part_numbers([new_result])
         st.session_state.results.append(new_result)
+        self.__apply_change(None, new_result)
+        self.__cache.patch('results')
         logging.info("Novo resultado criado e adicionado ao cache.")
         return new_result
 
+    def create_results(self, items: list) -> list:
+        """
+        Registra vários resultados de uma vez (ex.: todos os tipos de amostra
+        de um formulário).
+
+        Os itens válidos são gravados no outbox local e a função retorna
+        imediatamente; o worker do outbox os envia à API em lote, com
+        novas tentativas. Quando confirmados, entram no cache da sessão
+        na próxima leitura dos resultados.
+
+        Args:
+            items (list): Dicionários com os argumentos de `create_result`.
+
+        Returns:
+            list: Um resultado por item, na mesma ordem:
+            {'ok': bool, 'key': str | None, 'error': str | None}.
+        """
+        outcomes = [None] * len(items)
+        payloads, positions = [], []
+        for position, item in enumerate(items):
+            try:
+                self.validate_result_data(
+                    sample=item.get('sample'),
+                    force_N=item.get('force_N'),
+                    result_percentage=item.get('result_percentage'),
+                    production_batch=item.get('production_batch'),
+                )
+            except (TypeError, ValueError) as e:
+                outcomes[position] = {'ok': False, 'key': None, 'error': str(e)}
+                continue
+            payloads.append({field: item.get(field) for field in self.RESULT_FIELDS})
+            positions.append(position)
+
+        if payloads:
+            error = None
+            try:
+                keys = self.result_repository.enqueue_results(payloads)
+            except Exception as e:
+                logging.error(f"Erro ao gravar resultados no outbox: {e}")
+                keys = [None] * len(payloads)
+                error = str(e)
+            for position, key in zip(positions, keys):
+                outcomes[position] = {'ok': key is not None, 'key': key, 'error': None if key else error}
+
+        # Envios desta sessão, para acompanhar o estado na tela
+        keys = [o['key'] for o in outcomes if o['ok']]
+        st.session_state.results_submissions = st.session_state.get('results_submissions', []) + keys
+        logging.info(f"{len(keys)} de {len(items)} resultados registrados no outbox.")
+        return outcomes
+
+    def get_submissions(self) -> list:
+        """
+        Envios feitos nesta sessão, do mais recente ao mais antigo.
+
+        Returns:
+            list: Registros do outbox com 'status' pending, synced, failed ou
+            needs_login (aguardando novo login do usuário).
+        """
+        keys = st.session_state.get('results_submissions', [])
+        if not keys:
+            return []
+        return self.result_repository.get_submissions(keys, limit=len(keys))
+
+    def get_submission_counts(self) -> dict:
+        """Quantidade de envios no outbox do processo por estado."""
+        return self.result_repository.get_submission_counts()
+
+    def update_result(self, result_id: int, updated_data: dict) -> dict:
+        """
+        Atualiza um resultado existente.
+
+        Args:
+            result_id (int): ID do resultado a ser atualizado.
+            updated_data (dict): Dados atualizados do resultado.
+
+        Returns:
+            dict: Dados do resultado atualizado.
+
+        Raises:
+            ValueError: Se os dados fornecidos forem inválidos.
+        """
+        logging.info(f"Tentando atualizar resultado com result_id={result_id}...")
+        if not result_id or not isinstance(result_id, int):
+            raise ValueError("result_id deve ser um inteiro válido.")
+        if not updated_data or not isinstance(updated_data, dict):
+            raise ValueError("updated_data deve ser um dicionário válido.")
+
+        try:
+            updated_result = self.result_repository.update_result(result_id, updated_data)
+        except Exception as e:
+            logging.error(f"Erro ao atualizar resultado: {e}")
+            st.error(f"Erro ao atualizar resultado: {e}")
+            return None
+
+        # Atualizar o cache
+        if 'results' in st.session_state:
+            self.__add_part_numbers([updated_result])
+            results = st.session_state.results
+            for i, result in enumerate(results):
+                if result['id'] == result_id:
+                    self.__apply_change(result, updated_result)
+                    results[i] = updated_result
+                    break
+            self.__cache.patch('results')
+        logging.info("Resultado atualizado e cache atualizado.")
+        return updated_result
+
+    def delete_result(self, result_id: int) -> bool:
+        """
+        Exclui um resultado existente.
+
+        Args:
+            result_id (int): ID do resultado a ser excluído.
+
+        Returns:
+            bool: True se a exclusão for bem-sucedida, False caso contrário.
+
+        Raises:
+            ValueError: Se os dados fornecidos forem inválidos.
+        """
+        logging.info(f"Tentando excluir resultado com result_id={result_id}...")
+        if not result_id or not isinstance(result_id, int):
+            raise ValueError("result_id deve ser um inteiro válido.")
+
+        try:
+            self.result_repository.delete_result(result_id)
+        except Exception as e:
+            logging.error(f"Erro ao excluir resultado: {e}")
+            st.error(f"Erro ao excluir resultado: {e}")
+            return False
+
+        # Atualizar o cache
+        if 'results' in st.session_state:
+            kept = []
+            for result in st.session_state.results:
+                if result['id'] == result_id:
+                    self.__apply_change(result, None)
+                else:
+                    kept.append(result)
+            st.session_state.results = kept
+            self.__cache.patch('results')
+        logging.info("Resultado excluído e cache atualizado.")
+        return True
+
     def validate_result_data(self, sample: int, force_N: float, result_percentage: float, production_batch: str):
         if not isinstance(sample, int) or sample <= 0:
             raise ValueError("sample deve ser um ID válido")
@@ -72,73 +610,50 @@ class ResultService:
             raise ValueError("Lote inválido")
 
     def get_results_with_products(self):
+        """
+        Resultados da sessão com `part_number`.
+
+        O part_number é definido quando os registros entram na sessão, antes
+        dos agregados; os registros não são alterados depois. Se o catálogo
+        de produtos mudar, todos são refeitos de uma vez e os agregados e
+        a versão dos dados, descartados junto.
+        """
         results = self.get_results()
-        products = self.product_repository.get_products()
-        product_map = {p['id']: p for p in products}
-        
-        for result in results:
-            product_id = result.get('product_id')
-            product = product_map.get(product_id, {})
-            result['part_number'] = product.get('part_number', 'N/A')  # Corrigido typo
-            # Removido o código que deletava o campo 'id'
-        
+        part_numbers = self.__part_number_map()
+        if st.session_state.get('results_part_numbers') != part_numbers:
+            logging.info("Catálogo de produtos alterado: refazendo part_number dos resultados.")
+            self.__add_part_numbers(results, part_numbers)
+            st.session_state.results_part_numbers = part_numbers
+            st.session_state.pop('results_aggregates', None)
+            self.__bump_version()
         return results
 
-    def calculate_stats(self, results: list) -> dict:
-        logging.info("Calculando estatísticas...")
-        stats = {
-            'total': len(results),
-            'results_by_type': [],
-            'force_stats': {'average': 0, 'max': 0, 'min': 0},
-            'percentage_stats': {'average': 0, 'max': 0, 'min': 0},
-            'sample_counts': {'centragem': 0, 'cone': 0},
-            'comment_count': 0
-        }
-
-        type_counter = {}
-        force_values = []
-        percentage_values = []
+    def __part_number_map(self) -> dict:
+        # Usa o cache de sessão do ProductService, já preenchido pelo dashboard
+        return {p['id']: p.get('part_number', 'N/A') for p in self.product_service.get_products()}
 
+    def __add_part_numbers(self, results: list, part_numbers: dict = None) -> list:
+        if part_numbers is None:
+            part_numbers = self.__part_number_map()
         for result in results:
-            # Contagem por tipo
-            sample_type = result.get('sample_type', 'Não especificado')
-            type_counter[sample_type] = type_counter.get(sample_type, 0) + 1
-
-            # Coleta de valores numéricos
-            if (force := result.get('force_N')) is not None:
-                force_values.append(force)
-                stats['sample_counts'][sample_type] += 1
-            if (percentage := result.get('result_percentage')) is not None:
-                percentage_values.append(percentage)
-            if result.get('comment'):
-                stats['comment_count'] += 1
-
-        # Estatísticas de força
-        if force_values:
-            stats['force_stats'] = {
-                'average': sum(force_values)/len(force_values),
-                'max': max(force_values),
-                'min': min(force_values)
-            }
-
-        # Estatísticas de percentual
-        if percentage_values:
-            stats['percentage_stats'] = {
-                'average': sum(percentage_values)/len(percentage_values),
-                'max': max(percentage_values),
-                'min': min(percentage_values)
-            }
+            if not result:
+                continue
+            result['part_number'] = part_numbers.get(result.get('product_id'), 'N/A')
+            # Removido o código que deletava o campo 'id'
 
-        # Formata resultados por tipo
-        stats['results_by_type'] = [{'type': k, 'count': v} for k, v in type_counter.items()]
+        return results
 
-        # Estatísticas específicas por tipo
-        for sample_type in ['centragem', 'cone']:
-            filtered = [r for r in results if r.get('sample_type') == sample_type]
-            force_list = [r['force_N'] for r in filtered if 'force_N' in r]
-            percent_list = [r['result_percentage'] for r in filtered if 'result_percentage' in r]
+    def calculate_stats(self, results) -> dict:
+        """
+        Calcula as estatísticas dos resultados (ver `results.stats`).
 
-            stats[f'average_force_{sample_type}'] = sum(force_list)/len(force_list) if force_list else 0
-            stats[f'average_percentage_{sample_type}'] = sum(percent_list)/len(percent_list) if percent_list else 0
+        Args:
+            results (ResultFrame | list): Resultados em frame ou lista.
 
-        return stats
\ No newline at end of file
+        Returns:
+            dict: Estatísticas gerais e por tipo de amostra.
+        """
+        logging.info("Calculando estatísticas...")
+        if not isinstance(results, ResultFrame):
+            results = ResultFrame.from_records(results)
+        return calculate_stats(results)
@@ -0,0 +1,100 @@
+import logging
+import numpy as np
+from results.frame import ResultFrame
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Tipos sempre presentes nas chaves 'average_*_<tipo>' e 'sample_counts'
+DEFAULT_SAMPLE_TYPES = ('centragem', 'cone')
+
+
+def _summary(count, total, minimum, maximum):
+    if not count:
+        return {'average': 0, 'max': 0, 'min': 0}
+    return {'average': float(total / count), 'max': float(maximum), 'min': float(minimum)}
+
+
+def _grouped(codes, values, groups):
+    """Contagem, soma, mínimo e máximo por grupo, ignorando NaN."""
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    minimum = np.full(groups, np.inf)
+    maximum = np.full(groups, -np.inf)
+    np.minimum.at(minimum, codes, values)
+    np.maximum.at(maximum, codes, values)
+    return {
+        'count': np.bincount(codes, minlength=groups),
+        'sum': np.bincount(codes, weights=values, minlength=groups),
+        'min': minimum,
+        'max': maximum,
+    }
+
+
+def _overall(grouped):
+    count = grouped['count'].sum()
+    present = grouped['count'] > 0
+    if not count:
+        return _summary(0, 0, 0, 0)
+    return _summary(count, grouped['sum'].sum(), grouped['min'][present].min(), grouped['max'][present].max())
+
+
+def calculate_stats(frame: ResultFrame) -> dict:
+    """
+    Calcula as estatísticas dos resultados de forma vetorizada.
+
+    Contagens, somas, mínimos, máximos e comentários são agregados por
+    `sample_type` sobre os códigos da coluna categórica; os totais gerais
+    são derivados desses grupos. Qualquer tipo de amostra é aceito.
+
+    Args:
+        frame (ResultFrame): Resultados em formato colunar.
+
+    Returns:
+        dict: Estatísticas gerais e por tipo.
+    """
+    df = frame.df
+    types = df['sample_type'].cat.categories
+    codes = df['sample_type'].cat.codes.to_numpy()
+    groups = len(types)
+
+    sizes = np.bincount(codes, minlength=groups)
+    comments = np.bincount(codes, weights=df['comment'].to_numpy() != '', minlength=groups)
+    force = _grouped(codes, df['force_N'].to_numpy(dtype='float64'), groups)
+    percentage = _grouped(codes, df['result_percentage'].to_numpy(dtype='float64'), groups)
+
+    stats = {
+        'total': len(df),
+        'results_by_type': [],
+        'force_stats': _overall(force),
+        'percentage_stats': _overall(percentage),
+        'sample_counts': dict.fromkeys(DEFAULT_SAMPLE_TYPES, 0),
+        'comment_count': int(comments.sum()),
+        'by_type': {},
+    }
+    # Atalhos usados pelos KPIs do dashboard
+    stats['average_force'] = stats['force_stats']['average']
+    stats['average_percentage'] = stats['percentage_stats']['average']
+    stats['samples_with_comments'] = stats['comment_count']
+
+    for sample_type in DEFAULT_SAMPLE_TYPES:
+        stats[f'average_force_{sample_type}'] = 0
+        stats[f'average_percentage_{sample_type}'] = 0
+
+    for i, sample_type in enumerate(types):
+        if not sizes[i]:
+            continue
+        type_force = _summary(force['count'][i], force['sum'][i], force['min'][i], force['max'][i])
+        type_percentage = _summary(percentage['count'][i], percentage['sum'][i], percentage['min'][i], percentage['max'][i])
+        stats['results_by_type'].append({'type': sample_type, 'count': int(sizes[i])})
+        stats['sample_counts'][sample_type] = int(force['count'][i])
+        stats[f'average_force_{sample_type}'] = type_force['average']
+        stats[f'average_percentage_{sample_type}'] = type_percentage['average']
+        stats['by_type'][sample_type] = {
+            'count': int(sizes[i]),
+            'comment_count': int(comments[i]),
+            'force_stats': type_force,
+            'percentage_stats': type_percentage,
+        }
+
+    return stats
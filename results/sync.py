@@ -0,0 +1,73 @@
+import logging
+from dateutil.parser import parse
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Intervalo mínimo, em segundos, entre duas sincronizações incrementais
+SYNC_INTERVAL = 300
+
+
+def high_water_mark(results: list) -> tuple:
+    """
+    Calcula a marca d'água dos resultados já carregados.
+
+    Usa o maior `updated_at` quando a API fornece o campo; caso contrário,
+    recorre ao maior `id`.
+
+    Args:
+        results (list): Resultados em cache.
+
+    Returns:
+        tuple: (campo, valor) da marca d'água, ou (None, None) se vazio.
+    """
+    timestamps = [r['updated_at'] for r in results if r.get('updated_at')]
+    if timestamps:
+        return 'updated_at', max(timestamps, key=parse)
+
+    ids = [r['id'] for r in results if r.get('id') is not None]
+    if ids:
+        return 'id', max(ids)
+    return None, None
+
+
+def merge_results(results: list, changed: list, live_ids=None, on_change=None) -> list:
+    """
+    Incorpora os registros novos/alterados ao conjunto em cache.
+
+    Args:
+        results (list): Resultados em cache.
+        changed (list): Registros criados ou alterados desde a marca d'água.
+        live_ids (iterable): IDs existentes na API; quando informado,
+            registros ausentes são considerados excluídos.
+        on_change (callable): Chamado como on_change(antigo, novo) para cada
+            registro incluído (antigo None), alterado ou excluído (novo None).
+
+    Returns:
+        list: Novo conjunto de resultados, preservando a ordem original.
+    """
+    on_change = on_change or (lambda old, new: None)
+    changed_by_id = {r['id']: r for r in changed}
+    merged = []
+    for r in results:
+        new = changed_by_id.pop(r['id'], None)
+        if new is not None:
+            on_change(r, new)
+        merged.append(new or r)
+    for new in changed_by_id.values():
+        on_change(None, new)
+        merged.append(new)
+
+    if live_ids is not None:
+        live_ids = set(live_ids)
+        kept = []
+        for r in merged:
+            if r['id'] in live_ids:
+                kept.append(r)
+            else:
+                on_change(r, None)
+        if len(kept) != len(merged):
+            logging.info(f"{len(merged) - len(kept)} resultados excluídos na API removidos do cache.")
+        merged = kept
+
+    return merged
@@ -0,0 +1,128 @@
+import logging
+import threading
+from collections import OrderedDict
+from results.frame import ResultFrame
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Memória máxima, em bytes, ocupada pelas visões em cache de uma sessão
+VIEW_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_filters(**criteria) -> tuple:
+    """
+    Normaliza uma seleção de filtros em uma chave estável.
+
+    A ordem dos valores escolhidos não importa e None (sem restrição)
+    é mantido como está.
+
+    Returns:
+        tuple: ((coluna, valores), ...) ordenado por coluna.
+    """
+    key = []
+    for column in sorted(criteria):
+        accepted = criteria[column]
+        if accepted is not None:
+            if isinstance(accepted, str):
+                accepted = [accepted]
+            accepted = tuple(sorted(str(value) for value in accepted))
+        key.append((column, accepted))
+    return tuple(key)
+
+
+def _nbytes(value) -> int:
+    if hasattr(value, 'memory_usage'):
+        # DataFrame devolve o uso por coluna; Series, o total
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return 0
+
+
+class FilteredView:
+    """Linhas filtradas, suas estatísticas e entradas derivadas (gráficos)."""
+
+    def __init__(self, frame: ResultFrame, stats: dict, key=None):
+        self.frame = frame
+        self.stats = stats
+        # (versão dos dados, filtros normalizados); identifica o conteúdo
+        self.key = key
+        self.__derived = {}
+        # Medido uma vez (deep=True percorre as colunas de texto) e somado aos derivados
+        self.__nbytes = None
+
+    def derived(self, name, build):
+        """
+        Devolve um valor derivado da visão, calculando-o apenas uma vez.
+
+        Args:
+            name (str): Nome do valor (ex.: 'force_by_batch').
+            build (callable): Recebe o DataFrame filtrado e devolve o valor.
+        """
+        if name not in self.__derived:
+            value = build(self.frame.df)
+            self.__derived[name] = value
+            if self.__nbytes is not None:
+                self.__nbytes += _nbytes(value)
+        return self.__derived[name]
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelo frame e pelos derivados, incluindo textos."""
+        if self.__nbytes is None:
+            self.__nbytes = _nbytes(self.frame.df) + sum(_nbytes(v) for v in self.__derived.values())
+        return self.__nbytes
+
+
+class FilteredViewCache:
+    """
+    Cache LRU de visões filtradas, limitado pela memória ocupada.
+
+    As chaves são (versão dos dados, filtros normalizados); visões de
+    versões antigas deixam de ser acessadas e saem pela ordem de uso.
+    Pode ser usado ao mesmo tempo pela página e pelo aquecimento da sessão.
+    """
+
+    def __init__(self, max_bytes=VIEW_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__views = OrderedDict()
+        self.__lock = threading.RLock()
+
+    def get(self, key):
+        """Devolve a visão (marcando-a como recente) ou None."""
+        with self.__lock:
+            view = self.__views.get(key)
+            if view is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__views.move_to_end(key)
+            return view
+
+    def put(self, key, view: FilteredView):
+        """Guarda a visão e descarta as menos recentes acima do limite."""
+        with self.__lock:
+            self.__views[key] = view
+            self.__views.move_to_end(key)
+            while len(self.__views) > 1 and self.nbytes > self.max_bytes:
+                evicted, _ = self.__views.popitem(last=False)
+                logging.info(f"Visão filtrada descartada do cache: {evicted}")
+
+    @property
+    def nbytes(self) -> int:
+        with self.__lock:
+            return sum(view.nbytes for view in self.__views.values())
+
+    def stats(self) -> dict:
+        """Acertos, falhas, número de visões e memória ocupada."""
+        with self.__lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'views': len(self.__views),
+                'bytes': self.nbytes,
+            }
@@ -1,8 +1,7 @@
 import streamlit as st
 from samples.service import SampleService
 from products.service import ProductService
-from st_aggrid import AgGrid, GridOptionsBuilder
-import pandas as pd
+from components.server_grid import server_grid
 
 def show_samples():
     sample_service = SampleService()
@@ -26,11 +25,13 @@ def show_samples():
                     st.error(f"Erro ao carregar estatísticas: {str(e)}")
 
                 # Configurar tabela
-                df = pd.json_normalize(samples)
-                gb = GridOptionsBuilder.from_dataframe(df)
-                gb.configure_pagination(paginationPageSize=10)
-                gb.configure_side_bar()
-                AgGrid(df, gridOptions=gb.build(), key='samples_grid')
+                table = sample_service.get_display_table()
+                server_grid(
+                    table.frame,
+                    key='samples_grid',
+                    version=sample_service.get_data_version(),
+                    configure=lambda gb: gb.configure_side_bar(),
+                )
             else:
                 st.warning("Nenhuma amostra encontrada.")
         except Exception as e:
@@ -1,12 +1,18 @@
 import logging
-import requests
 import streamlit as st
+from api.auth import expire_session, get_auth
+from api.cache import get_cache
+from api.client import BASE_URL, get_client
+from api.store import get_store
 
 logging.basicConfig(level=logging.INFO)
 
 class SampleRepository:
     def __init__(self):
-        self.__base_url = 'https://verdann.pythonanywhere.com/api/v1/'
+        self.__base_url = BASE_URL
+        self.__client = get_client()
+        self.__store = get_store()
+        self.__cache = get_cache()
         self.__samples_url = f'{self.__base_url}samples/'
         self.__sample_stats_url = f'{self.__base_url}samples/stats/'
         
@@ -14,20 +20,26 @@ class SampleRepository:
             logging.error("Token de autorização não encontrado.")
             raise Exception("Token de autorização não encontrado.")
             
-        self.__headers = {
-            'Authorization': f'Bearer {st.session_state.token}'
-        }
+        # Token renovado antes de expirar; em 401 a requisição é repetida uma vez
+        self.__auth = get_auth()
+
+    def get_samples(self):
+        """Obtém todas as amostras (cache compartilhado por versão da entidade)"""
+        return self.__get_samples(self.__cache.version('samples'))
+
+    def get_sample_stats(self):
+        """Obtém estatísticas das amostras (mesmo namespace das amostras)"""
+        return self.__get_sample_stats(self.__cache.version('samples'))
 
     @st.cache_data(ttl=300)
-    def get_samples(_self):
-        """Obtém todas as amostras"""
+    def __get_samples(_self, version):
+        """Obtém todas as amostras (cache local atualizado em segundo plano)"""
         try:
-            response = requests.get(_self.__samples_url, headers=_self.__headers, timeout=10)
-            result = _self._handle_response(response)
+            result = _self.__store.read_through('samples', _self.__fetch_samples)
             
             if result is None:
                 st.error("Sessão expirada. Faça login novamente.")
-                st.session_state.clear()
+                expire_session()
                 st.rerun()
                 
             return result
@@ -36,19 +48,14 @@ class SampleRepository:
             raise
 
     @st.cache_data(ttl=300)
-    def get_sample_stats(_self):
-        """Obtém estatísticas das amostras"""
+    def __get_sample_stats(_self, version):
+        """Obtém estatísticas das amostras (cache local atualizado em segundo plano)"""
         try:
-            response = requests.get(
-                _self.__sample_stats_url,
-                headers=_self.__headers,
-                timeout=10
-            )
-            result = _self._handle_response(response)
+            result = _self.__store.read_through('sample_stats', _self.__fetch_sample_stats)
             
             if result is None:
                 st.error("Sessão expirada. Faça login novamente.")
-                st.session_state.clear()
+                expire_session()
                 st.rerun()
                 
             return result
@@ -59,17 +66,34 @@ class SampleRepository:
     def create_sample(self, sample_data):
         """Cria uma nova amostra"""
         try:
-            response = requests.post(
+            response = self.__client.post(
                 self.__samples_url,
-                headers=self.__headers,
-                json=sample_data,
-                timeout=10
+                auth=self.__auth,
+                json=sample_data
             )
-            return self._handle_response(response)
+            result = self._handle_response(response)
+            self.__cache.invalidate('samples')
+            return result
         except Exception as e:
             logging.error(f"Erro ao criar amostra: {e}")
             raise
 
+    def __fetch_samples(self):
+        """Busca as amostras na API (usado também pela atualização em segundo plano)"""
+        return self.__client.get_conditional(
+            self.__samples_url,
+            self._handle_response,
+            auth=self.__auth
+        )
+
+    def __fetch_sample_stats(self):
+        """Busca as estatísticas das amostras na API (usado também pela atualização em segundo plano)"""
+        return self.__client.get_conditional(
+            self.__sample_stats_url,
+            self._handle_response,
+            auth=self.__auth
+        )
+
     def _handle_response(self, response):
         """Trata a resposta da API"""
         if response.status_code in (200, 201):
@@ -1,12 +1,30 @@
+from api.cache import get_cache
+from components.display_table import DisplayTable, display_table
 from samples.repository import SampleRepository
 
 class SampleService:
+    DATETIME_COLUMNS = ('created_at',)
+
     def __init__(self):
         self.sample_repository = SampleRepository()
+        self.__cache = get_cache()
 
     def get_samples(self):
-        """Obtém amostras via repositório"""
-        return self.sample_repository.get_samples()
+        """Obtém amostras via repositório e as mantém na sessão"""
+        samples = self.__cache.get('samples')
+        if samples is None:
+            samples = self.sample_repository.get_samples()
+            self.__cache.put('samples', samples)
+        return samples
+
+    def get_data_version(self):
+        """Versão das amostras da sessão; muda a cada alteração do conjunto"""
+        return self.__cache.session_version('samples')
+
+    def get_display_table(self) -> DisplayTable:
+        """Tabela de exibição das amostras, construída uma vez por versão"""
+        samples = self.get_samples()
+        return display_table('samples', self.get_data_version(), lambda: samples, self.DATETIME_COLUMNS)
 
     def get_sample_stats(self):
         """Obtém estatísticas das amostras"""
@@ -27,4 +45,7 @@ class SampleService:
             'assembly': assembly_id,
             'products': [product_id]  # Garante formato de lista para compatibilidade
         }
-        return self.sample_repository.create_sample(sample_data)
\ No newline at end of file
+        new_sample = self.sample_repository.create_sample(sample_data)
+        if new_sample:
+            self.__cache.patch('samples', lambda samples: samples + [new_sample])
+        return new_sample
@@ -0,0 +1,98 @@
+import random
+import statistics
+import pytest
+from results.aggregates import ResultAggregates, RunningStats
+
+
+def assert_matches(stats, values):
+    assert stats.count == len(values)
+    if not values:
+        assert stats.summary() == {'average': 0, 'max': 0, 'min': 0, 'std': 0.0}
+        return
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.min == min(values)
+    assert stats.max == max(values)
+    expected_std = statistics.stdev(values) if len(values) > 1 else 0.0
+    assert stats.summary()['std'] == pytest.approx(expected_std, abs=1e-6)
+
+
+def test_running_stats_match_full_recalculation_under_random_changes():
+    rng = random.Random(7)
+    stats = RunningStats()
+    values = []
+    for _ in range(3000):
+        if values and rng.random() < 0.45:
+            value = values.pop(rng.randrange(len(values)))
+            stats.remove(value)
+        else:
+            # Poucos valores distintos para exercitar repetições do mínimo/máximo
+            value = rng.choice([rng.randint(0, 20), round(rng.uniform(0, 1000), 1)])
+            values.append(value)
+            stats.add(value)
+        if len(values) % 50 == 0:
+            assert_matches(stats, values)
+    assert_matches(stats, values)
+
+
+def test_removing_the_extreme_exposes_the_next_one():
+    stats = RunningStats()
+    for value in (5, 1, 9, 1, 9):
+        stats.add(value)
+
+    stats.remove(9)
+    assert stats.max == 9
+    stats.remove(9)
+    assert stats.max == 5
+    stats.remove(1)
+    stats.remove(1)
+    assert stats.min == 5
+
+
+def test_remove_of_unknown_value_is_ignored():
+    stats = RunningStats()
+    stats.add(3)
+    stats.remove(4)
+    assert_matches(stats, [3])
+
+
+def test_emptied_stats_reset_to_zero():
+    stats = RunningStats()
+    for value in (2, 4, 6):
+        stats.add(value)
+    for value in (4, 2, 6):
+        stats.remove(value)
+    assert_matches(stats, [])
+    stats.add(8)
+    assert_matches(stats, [8])
+
+
+def result(id, force, batch, comment=''):
+    return {
+        'id': id,
+        'force_N': force,
+        'result_percentage': 50,
+        'sample_type': 'cone',
+        'production_batch': batch,
+        'comment': comment,
+        'product': {'part_number': 'IM-10001'},
+    }
+
+
+def test_result_aggregates_follow_replace_and_drop_empty_groups():
+    old = result(1, 500, 'L1', comment='Rebarba')
+    aggregates = ResultAggregates.from_results([old, result(2, 700, 'L2')])
+
+    new = result(1, 900, 'L3')
+    aggregates.replace(old, new)
+
+    overall = aggregates.kpis()
+    assert overall['total'] == 2
+    assert overall['comment_count'] == 0
+    assert overall['force_stats']['max'] == 900
+    assert overall['force_stats']['min'] == 700
+    assert 'L1' not in aggregates.groups['production_batch']
+    assert aggregates.kpis('production_batch', 'L3')['total'] == 1
+
+    aggregates.replace(new, None)
+    assert aggregates.kpis()['force_stats']['min'] == 700
+    assert aggregates.kpis()['total'] == 1
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+import pytest
+import api.cache
+from api.cache import EntityCache
+
+
+class Store:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, name):
+        self.invalidated.append(name)
+
+
+class Sessions:
+    """Troca o `st.session_state` visto pelo cache, simulando várias sessões."""
+
+    def __init__(self, monkeypatch):
+        self.st = SimpleNamespace(session_state={})
+        monkeypatch.setattr(api.cache, 'st', self.st)
+        self.states = {}
+
+    def use(self, name):
+        self.st.session_state = self.states.setdefault(name, {})
+        return self.st.session_state
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    return Sessions(monkeypatch)
+
+
+@pytest.fixture
+def store():
+    return Store()
+
+
+def test_invalidate_bumps_only_that_entity(store):
+    cache = EntityCache(store)
+
+    assert cache.invalidate('products') == 1
+    assert cache.invalidate('products') == 2
+    assert cache.version('products') == 2
+    assert cache.version('samples') == 0
+
+
+def test_invalidate_drops_entity_store_entries(store):
+    cache = EntityCache(store)
+
+    cache.invalidate('samples')
+    cache.invalidate('results')
+    cache.invalidate('custom')
+
+    # Resultados em disco são sincronizados, não descartados
+    assert store.invalidated == ['samples', 'sample_stats', 'custom']
+
+
+def test_put_and_get_in_session(sessions, store):
+    cache = EntityCache(store)
+    sessions.use('a')
+
+    assert cache.get('products') is None
+    cache.put('products', [{'id': 1}])
+
+    assert cache.get('products') == [{'id': 1}]
+    assert cache.session_version('products') == 1
+
+
+def test_write_from_another_session_invalidates_the_copy(sessions, store):
+    cache = EntityCache(store)
+    sessions.use('a')
+    cache.put('products', [{'id': 1}])
+    sessions.use('b')
+    cache.put('products', [{'id': 1}])
+
+    cache.invalidate('products')
+
+    assert cache.get('products') is None
+    sessions.use('a')
+    assert cache.get('products') is None
+
+
+def test_patch_keeps_the_writing_session_current(sessions, store):
+    cache = EntityCache(store)
+    sessions.use('a')
+    cache.put('products', [{'id': 1}])
+
+    # A própria sessão grava: a API e a cópia local mudam juntas
+    cache.invalidate('products')
+    cache.patch('products', lambda products: products + [{'id': 2}])
+
+    assert cache.get('products') == [{'id': 1}, {'id': 2}]
+    assert cache.session_version('products') == 2
+
+
+def test_patch_after_a_concurrent_write_forces_reload(sessions, store):
+    cache = EntityCache(store)
+    sessions.use('a')
+    cache.put('products', [{'id': 1}])
+
+    cache.invalidate('products')  # Gravação de outra sessão
+    cache.invalidate('products')  # Gravação desta sessão
+    cache.patch('products', lambda products: products + [{'id': 3}])
+
+    assert cache.get('products') is None
+
+
+def test_patch_without_session_copy_does_nothing(sessions, store):
+    cache = EntityCache(store)
+    state = sessions.use('a')
+
+    cache.patch('products', lambda products: products + [{'id': 1}])
+
+    assert state == {}
@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+import pytest
+import requests
+from api.auth import BearerAuth, TokenPair
+from api.client import ApiClient
+
+
+URL = 'http://api.test/results/'
+
+
+def response(payload, status=200, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = json.dumps(payload).encode() if payload is not None else b''
+    r.headers.update(headers or {})
+    r.url = URL
+    return r
+
+
+class Server:
+    """Substitui `ApiClient.get`; segura as respostas até `release()`."""
+
+    def __init__(self, client, reply=None):
+        self.calls = []
+        self.released = threading.Event()
+        self.reply = reply or (lambda url, kwargs: response([{'id': 1, 'tags': []}]))
+        client.get = self.get
+
+    def get(self, url, **kwargs):
+        self.calls.append(kwargs)
+        self.released.wait(5)
+        return self.reply(url, kwargs)
+
+    def release(self):
+        self.released.set()
+
+
+def decode(r):
+    return r.json()
+
+
+def run_concurrently(client, calls):
+    """Dispara as chamadas em threads e devolve os resultados, na ordem."""
+    results = [None] * len(calls)
+
+    def run(i, call):
+        try:
+            results[i] = call()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail('condição não atingida a tempo')
+        time.sleep(0.005)
+
+
+def auth(token):
+    return BearerAuth(TokenPair(token))
+
+
+@pytest.fixture
+def client():
+    client = ApiClient()
+    yield client
+    client.close()
+
+
+def test_identical_gets_share_one_request_but_not_the_payload(client):
+    server = Server(client)
+    a = auth('token-a')
+    threads, results = run_concurrently(client, [lambda: client.get_shared(URL, decode, auth=a)] * 4)
+
+    wait_for(lambda: client.coalesce_stats()['coalesced'] == 3)
+    server.release()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.calls) == 1
+    assert all(r == [{'id': 1, 'tags': []}] for r in results)
+    # Cada chamada recebe a sua cópia e pode alterá-la
+    results[0][0]['tags'].append('x')
+    assert results[1][0]['tags'] == []
+    assert client.coalesce_stats() == {'requests': 1, 'coalesced': 3, 'inflight': 0}
+
+
+def test_different_credentials_are_not_coalesced(client):
+    server = Server(client, reply=lambda url, kwargs: response({'token': kwargs['auth'].tokens.access}))
+    server.release()
+    tokens = ['token-a', 'token-b']
+
+    threads, results = run_concurrently(
+        client, [lambda t=t: client.get_shared(URL, decode, auth=auth(t)) for t in tokens]
+    )
+    for thread in threads:
+        thread.join()
+
+    assert len(server.calls) == 2
+    assert results == [{'token': 'token-a'}, {'token': 'token-b'}]
+
+
+def test_different_params_are_not_coalesced(client):
+    server = Server(client)
+    server.release()
+    a = auth('token-a')
+
+    client.get_shared(URL, decode, params={'page': 1}, auth=a)
+    client.get_shared(URL, decode, params={'page': 2}, auth=a)
+
+    assert len(server.calls) == 2
+
+
+def test_each_caller_decodes_the_shared_response(client):
+    server = Server(client, reply=lambda url, kwargs: response({'detail': 'expirado'}, status=401))
+    a = auth('token-a')
+    decoded_by = []
+
+    def caller(name):
+        def decode_for(r):
+            decoded_by.append((name, r.status_code))
+            return None
+        return lambda: client.get_shared(URL, decode_for, auth=a)
+
+    threads, _ = run_concurrently(client, [caller('leader'), caller('follower')])
+    wait_for(lambda: client.coalesce_stats()['coalesced'] == 1)
+    server.release()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.calls) == 1
+    assert sorted(decoded_by) == [('follower', 401), ('leader', 401)]
+
+
+def test_errors_reach_every_waiter_and_clear_the_flight(client):
+    failures = iter([requests.ConnectionError('queda'), None])
+
+    def reply(url, kwargs):
+        error = next(failures)
+        if error:
+            raise error
+        return response([])
+
+    server = Server(client, reply=reply)
+    a = auth('token-a')
+    threads, results = run_concurrently(client, [lambda: client.get_shared(URL, decode, auth=a)] * 3)
+    wait_for(lambda: client.coalesce_stats()['coalesced'] == 2)
+    server.release()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(r, requests.ConnectionError) for r in results)
+    # A falha não fica presa à chave: a próxima chamada faz nova requisição
+    assert client.get_shared(URL, decode, auth=a) == []
+    assert len(server.calls) == 2
+
+
+def test_conditional_get_reuses_decoded_payload_on_304(client):
+    def reply(url, kwargs):
+        if kwargs['headers'].get('If-None-Match') == '"v1"':
+            return response(None, status=304)
+        return response([{'id': 1}], headers={'ETag': '"v1"'})
+
+    server = Server(client, reply=reply)
+    server.release()
+    a = auth('token-a')
+    decoded = []
+
+    def counting_decode(r):
+        decoded.append(r.status_code)
+        return r.json()
+
+    first = client.get_conditional(URL, counting_decode, auth=a)
+    second = client.get_conditional(URL, counting_decode, auth=a)
+
+    assert server.calls[1]['headers']['If-None-Match'] == '"v1"'
+    # O 304 não passa pelo decode: o payload da resposta 200 é reaproveitado
+    assert decoded == [200]
+    assert second is first
+    assert client.validator_stats() == {'hits': 1, 'misses': 1, 'endpoints': 1}
+
+
+def test_conditional_get_decodes_changed_resource(client):
+    versions = iter([('"v1"', [{'id': 1}]), ('"v2"', [{'id': 1}, {'id': 2}])])
+
+    def reply(url, kwargs):
+        etag, payload = next(versions)
+        return response(payload, headers={'ETag': etag})
+
+    server = Server(client, reply=reply)
+    server.release()
+    a = auth('token-a')
+
+    client.get_conditional(URL, decode, auth=a)
+    changed = client.get_conditional(URL, decode, auth=a)
+
+    assert server.calls[1]['headers']['If-None-Match'] == '"v1"'
+    assert changed == [{'id': 1}, {'id': 2}]
+    assert client.validator_stats()['misses'] == 2
@@ -0,0 +1,47 @@
+from streamlit.testing.v1 import AppTest
+
+
+def dashboard_tabs():
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from home.page import show_analysis, show_details
+    from results.frame import ResultFrame
+    from results.stats import calculate_stats
+    from results.views import FilteredView
+
+    frame = ResultFrame.from_records([
+        {'id': i, 'force_N': 400.0 + i, 'result_percentage': float(i % 100), 'sample_type': ('cone', 'centragem')[i % 2],
+         'production_batch': f'L{i % 3}', 'part_number': 'IM-1'}
+        for i in range(60)
+    ], version=1)
+    view = FilteredView(frame, calculate_stats(frame), key=(1, ()))
+
+    show_analysis(view)
+    show_details(view)
+    st.session_state.fragments = len(get_script_run_ctx().new_fragment_ids)
+
+
+def figure_stats(at):
+    return at.session_state.home_figures.stats()
+
+
+def test_dashboard_tabs_run_as_fragments():
+    at = AppTest.from_function(dashboard_tabs).run()
+
+    assert not at.exception
+    assert at.session_state.fragments == 2
+
+
+def test_scatter_mode_change_reuses_the_other_figures():
+    at = AppTest.from_function(dashboard_tabs).run()
+    # Linha, dispersão automática, treemap e histograma
+    assert figure_stats(at)['misses'] == 4
+
+    at.selectbox(key='scatter_mode').set_value('density').run()
+    assert not at.exception
+    # Só a dispersão no novo modo é construída
+    assert figure_stats(at)['misses'] == 5
+    assert 'Densidade (2D)' in at.caption[0].value
+
+    at.selectbox(key='scatter_mode').set_value('auto').run()
+    assert figure_stats(at)['misses'] == 5
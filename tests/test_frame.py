@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from results.frame import ResultFrame
+
+
+RECORDS = [
+    {
+        'id': 1, 'force_N': '512.5', 'result_percentage': 40, 'sample_type': 'cone', 'sample_side': 'direito',
+        'production_batch': 'L001', 'product': {'id': 1, 'part_number': 'IM-1'}, 'comment': None,
+        'sample_taken_datetime': '2025-01-02T10:00:00Z', 'updated_at': '2025-01-02T10:00:00.123456+00:00',
+    },
+    {
+        'id': 2, 'force_N': 'inválido', 'result_percentage': None, 'sample_type': 'centragem', 'sample_side': None,
+        'production_batch': 'L002', 'product': None, 'part_number': 'IM-2', 'comment': 'Rebarba',
+        'sample_taken_datetime': None, 'updated_at': '2025-01-03T08:30:00-03:00',
+    },
+]
+
+
+def test_columns_are_typed():
+    df = ResultFrame.from_records(RECORDS, version=7).df
+
+    assert df['force_N'].dtype == np.float32
+    assert df['result_percentage'].dtype == np.float32
+    for column in ResultFrame.CATEGORY_COLUMNS:
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    assert isinstance(df['updated_at'].dtype, pd.DatetimeTZDtype)
+
+
+def test_invalid_and_missing_values_are_normalized():
+    df = ResultFrame.from_records(RECORDS).df
+
+    assert df['force_N'].iloc[0] == np.float32(512.5)
+    assert np.isnan(df['force_N'].iloc[1]) and np.isnan(df['result_percentage'].iloc[1])
+    assert df['sample_side'].tolist() == ['direito', 'N/A']
+    assert df['comment'].tolist() == ['', 'Rebarba']
+    assert pd.isna(df['sample_taken_datetime'].iloc[1])
+    # Fusos diferentes são convertidos para UTC
+    assert df['updated_at'].iloc[1] == pd.Timestamp('2025-01-03T11:30:00Z')
+
+
+def test_part_number_comes_from_product_or_flat_field():
+    df = ResultFrame.from_records(RECORDS).df
+
+    assert df['part_number'].tolist() == ['IM-1', 'IM-2']
+    assert 'product' not in df.columns
+
+
+def test_empty_results_still_have_the_typed_columns():
+    frame = ResultFrame.from_records([])
+
+    assert len(frame) == 0
+    assert frame.df['force_N'].dtype == np.float32
+    assert frame.unique('sample_type') == []
+
+
+def test_take_and_filter_keep_the_version():
+    frame = ResultFrame.from_records(RECORDS, version=3)
+
+    assert frame.take(None) is frame
+    assert frame.take(np.array([1])).df['id'].tolist() == [2]
+    filtered = frame.filter(sample_types=['cone'], sample_side='direito')
+    assert filtered.df['id'].tolist() == [1]
+    assert filtered.version == frame.take(np.array([0])).version == 3
+    assert frame.unique('production_batch') == ['L001', 'L002']
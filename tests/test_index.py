@@ -0,0 +1,73 @@
+import numpy as np
+from results.frame import ResultFrame
+from results.index import ResultIndex
+
+
+RECORDS = [
+    {'id': 0, 'sample_type': 'cone', 'sample_side': 'direito', 'production_batch': 'L001', 'part_number': 'IM-10001'},
+    {'id': 1, 'sample_type': 'centragem', 'sample_side': 'esquerdo', 'production_batch': 'L001', 'part_number': 'IM-10002'},
+    {'id': 2, 'sample_type': 'cone', 'sample_side': 'esquerdo', 'production_batch': 'L002', 'part_number': 'IM-10001'},
+    {'id': 3, 'sample_type': 'cone', 'sample_side': 'direito', 'production_batch': 'L003', 'part_number': 'IM-20001-A'},
+    {'id': 4, 'sample_type': 'centragem', 'sample_side': None, 'production_batch': 'L002', 'part_number': 'IM-20001-A'},
+]
+
+
+def build_index():
+    return ResultIndex(ResultFrame.from_records(RECORDS, version=3))
+
+
+def brute_force(**criteria):
+    frame = ResultFrame.from_records(RECORDS).df
+    mask = np.ones(len(frame), dtype=bool)
+    for column, accepted in criteria.items():
+        if accepted is None:
+            continue
+        if isinstance(accepted, str):
+            accepted = [accepted]
+        mask &= frame[column].astype(str).isin(accepted).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def test_index_keeps_frame_version_and_size():
+    index = build_index()
+    assert index.version == 3
+    assert index.size == len(RECORDS)
+
+
+def test_values_and_counts():
+    index = build_index()
+    assert index.values('sample_type') == ['centragem', 'cone']
+    assert index.values('sample_side') == ['N/A', 'direito', 'esquerdo']
+    assert index.count('production_batch', 'L002') == 2
+    assert index.count('production_batch', 'L999') == 0
+
+
+def test_select_without_restrictions_returns_none():
+    assert build_index().select(sample_type=None, part_number=None) is None
+
+
+def test_select_matches_brute_force():
+    index = build_index()
+    cases = [
+        {'sample_type': 'cone'},
+        {'sample_type': 'cone', 'sample_side': 'direito'},
+        {'production_batch': ['L001', 'L002'], 'sample_type': 'centragem'},
+        {'part_number': ['IM-20001-A', 'IM-10001'], 'sample_side': ['esquerdo', 'N/A']},
+        {'sample_type': 'cone', 'production_batch': None},
+    ]
+    for criteria in cases:
+        np.testing.assert_array_equal(index.select(**criteria), brute_force(**criteria))
+
+
+def test_select_with_unknown_value_is_empty():
+    index = build_index()
+    assert len(index.select(sample_type='inexistente')) == 0
+    assert len(index.select(sample_type='cone', production_batch='L999')) == 0
+
+
+def test_search_is_case_insensitive_and_unions_columns():
+    index = build_index()
+    np.testing.assert_array_equal(index.search('  im-2 '), [3, 4])
+    np.testing.assert_array_equal(index.search('L00', columns=['production_batch']), [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(index.search('dir'), [0, 3])
+    assert len(index.search('xyz')) == 0
@@ -0,0 +1,187 @@
+import sqlite3
+import pytest
+import api.outbox
+from api.auth import TokenPair
+from api.outbox import FAILED, NEEDS_LOGIN, PENDING, SYNCED, Outbox
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class Sender:
+    """Sender falso: responde com os status programados e registra os envios."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def __call__(self, payloads, keys, tokens):
+        self.calls.append({'payloads': payloads, 'keys': keys, 'access': tokens.access})
+        status = self.statuses.pop(0) if self.statuses else 201
+        if status in (200, 201):
+            return [{'ok': True, 'result': {'id': i, **p}, 'error': None, 'status': status} for i, p in enumerate(payloads)]
+        return [{'ok': False, 'result': None, 'error': f'Erro {status}', 'status': status}] * len(payloads)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(api.outbox, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def make_outbox(tmp_path, monkeypatch, clock):
+    # Sem worker em segundo plano: os envios acontecem só em flush()
+    monkeypatch.setattr(Outbox, '_Outbox__run', lambda self: None)
+    path = str(tmp_path / 'outbox.sqlite3')
+
+    def make(sender):
+        outbox = Outbox(path)
+        outbox.start('results', sender)
+        return outbox
+    make.path = path
+    return make
+
+
+def stored_owners(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT owner, access, refresh FROM outbox_owners').fetchall()
+
+
+def test_enqueue_assigns_unique_keys_and_sends_them(make_outbox):
+    sender = Sender()
+    outbox = make_outbox(sender)
+    keys = outbox.enqueue('results', [{'force_N': 1}, {'force_N': 2}], TokenPair('a'))
+
+    assert len(set(keys)) == 2
+    assert outbox.flush() == 2
+    assert sender.calls[0]['keys'] == keys
+    assert outbox.counts('results') == {PENDING: 0, SYNCED: 2, FAILED: 0, NEEDS_LOGIN: 0}
+    # Registros sincronizados não são reenviados
+    assert outbox.flush() == 0
+
+
+def test_temporary_failure_is_retried_with_the_same_key(make_outbox, clock):
+    sender = Sender(503, 201)
+    outbox = make_outbox(sender)
+    [key] = outbox.enqueue('results', [{'force_N': 1}], TokenPair('a'))
+
+    outbox.flush()
+    [entry] = outbox.entries('results')
+    assert entry['status'] == PENDING
+    assert entry['attempts'] == 1
+    assert entry['last_error'] == 'Erro 503'
+
+    # Ainda no backoff: nada é enviado
+    assert outbox.flush() == 0
+    clock.now += 2
+    assert outbox.flush() == 1
+    assert [call['keys'] for call in sender.calls] == [[key], [key]]
+    assert outbox.entries('results')[0]['status'] == SYNCED
+
+
+def test_backoff_grows_exponentially(make_outbox, clock):
+    outbox = make_outbox(Sender(429, 429, 429))
+    outbox.enqueue('results', [{}], TokenPair('a'))
+
+    for delay in (1, 2, 4):
+        assert outbox.flush() == 1
+        clock.now += delay - 0.5
+        assert outbox.flush() == 0
+        clock.now += 0.5
+
+
+def test_rejected_record_is_marked_failed(make_outbox, clock):
+    outbox = make_outbox(Sender(400))
+    outbox.enqueue('results', [{}], TokenPair('a'))
+
+    outbox.flush()
+    clock.now += 3600
+    assert outbox.flush() == 0
+    assert outbox.entries('results')[0]['status'] == FAILED
+
+
+def test_each_record_is_sent_with_its_owner_tokens(make_outbox):
+    sender = Sender()
+    outbox = make_outbox(sender)
+    outbox.enqueue('results', [{'user': 'a'}], TokenPair('token-a'))
+    outbox.enqueue('results', [{'user': 'b'}, {'user': 'b'}], TokenPair('token-b'))
+
+    outbox.flush()
+
+    sent = {call['access']: [p['user'] for p in call['payloads']] for call in sender.calls}
+    assert sent == {'token-a': ['a'], 'token-b': ['b', 'b']}
+
+
+def test_pending_records_survive_a_restart(make_outbox):
+    first = make_outbox(Sender())
+    tokens = TokenPair('token-a', 'refresh-a', owner='ana')
+    [key] = first.enqueue('results', [{'force_N': 1}], tokens)
+
+    # Só o token de acesso vai para o disco
+    assert stored_owners(make_outbox.path) == [('ana', 'token-a', None)]
+    # Novo processo: nenhum token em memória, só o diário em disco
+    sender = Sender()
+    restarted = make_outbox(sender)
+    assert restarted.flush() == 1
+    assert sender.calls == [{'payloads': [{'force_N': 1}], 'keys': [key], 'access': 'token-a'}]
+
+
+def test_owner_tokens_are_deleted_once_drained(make_outbox, clock):
+    outbox = make_outbox(Sender(503, 201))
+    outbox.enqueue('results', [{}], TokenPair('token-a', 'refresh-a', owner='ana'))
+
+    outbox.flush()
+    assert stored_owners(make_outbox.path) == [('ana', 'token-a', None)]
+    clock.now += 2
+    outbox.flush()
+
+    assert stored_owners(make_outbox.path) == []
+
+
+def test_rejected_credentials_wait_for_a_new_login(make_outbox, clock):
+    sender = Sender(401)
+    outbox = make_outbox(sender)
+    [first, second] = outbox.enqueue('results', [{'n': 1}, {'n': 2}], TokenPair('old', owner='ana'))
+
+    outbox.flush()
+    clock.now += 3600
+    # Não volta para a fila: sem novo login, nada é reenviado
+    assert outbox.flush() == 0
+    assert {e['status'] for e in outbox.entries('results')} == {NEEDS_LOGIN}
+    assert stored_owners(make_outbox.path) == []
+
+    # Outro usuário não retoma os registros de 'ana'
+    assert outbox.resume(TokenPair('other', owner='bia')) == 0
+    assert outbox.resume(TokenPair('new', owner='ana')) == 2
+    assert outbox.flush() == 2
+    assert sender.calls[-1]['access'] == 'new'
+    assert sender.calls[-1]['keys'] == [first, second]
+    assert outbox.counts('results')[SYNCED] == 2
+
+
+def test_synced_since_returns_new_confirmations(make_outbox, clock):
+    outbox = make_outbox(Sender())
+    outbox.enqueue('results', [{'force_N': 1}], TokenPair('a'))
+    outbox.flush()
+
+    synced, since = outbox.synced_since('results', 0)
+    assert synced == [{'id': 0, 'force_N': 1}]
+    assert outbox.synced_since('results', since) == ([], since)
+
+
+def test_prune_forgets_owners_without_pending_records(make_outbox, clock):
+    outbox = make_outbox(Sender())
+    outbox.enqueue('results', [{}], TokenPair('a'))
+    outbox.flush()
+    clock.now += api.outbox.OUTBOX_RETENTION + 1
+
+    outbox.prune()
+
+    assert outbox.entries('results') == []
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+from components.paged_table import sort_order
+
+
+def ordered(values):
+    df = pd.DataFrame({'c': values})
+    return df['c'].iloc[sort_order(df, 'c')].tolist()
+
+
+def test_text_with_missing_values_sorts_missing_last():
+    assert ordered(['b', None, 'a', 'b', None]) == ['a', 'b', 'b', None, None]
+
+
+def test_mixed_types_sort_without_error():
+    assert ordered(['b', 10, None, 'a', 2]) == [2, 10, 'a', 'b', None]
+    assert ordered([{'x': 1}, 'a', None])[-1] is None
+
+
+def test_numbers_categories_and_dates_keep_their_order():
+    numbers = ordered([3.0, np.nan, 1.0])
+    assert numbers[:2] == [1.0, 3.0] and np.isnan(numbers[2])
+    categories = pd.Categorical(['alto', None, 'baixo'], categories=['baixo', 'alto'])
+    assert ordered(categories)[:2] == ['baixo', 'alto']
+    dates = pd.to_datetime(['2024-02-01', None, '2024-01-01'])
+    assert ordered(dates)[0] == pd.Timestamp('2024-01-01')
+
+
+def test_sort_is_stable():
+    df = pd.DataFrame({'c': ['b', 'a', 'b', 'a'], 'n': [0, 1, 2, 3]})
+    assert df['n'].iloc[sort_order(df, 'c')].tolist() == [1, 3, 0, 2]
+
+
+def table_page():
+    import pandas as pd
+    from components.paged_table import paged_table
+
+    df = pd.DataFrame({
+        'part_number': [f'IM-{i % 7}' if i % 5 else None for i in range(120)],
+        'force_N': [float(i) for i in range(120)],
+    })
+    df.index = df.index + 1000
+
+    def search(text):
+        return df.index[df['part_number'].fillna('').str.contains(text, case=False)]
+
+    paged_table(df, 'grid', search=search)
+
+
+def shown(at):
+    return at.dataframe[0].value
+
+
+def test_paged_table_sorts_searches_and_slices():
+    at = AppTest.from_function(table_page).run()
+    assert len(shown(at)) == 25
+    assert at.caption[0].value == 'Linhas 1–25 de 120'
+
+    at.selectbox(key='grid_sort').set_value('part_number').run()
+    assert shown(at)['part_number'].iloc[0] == 'IM-0'
+    at.toggle(key='grid_desc').set_value(True).run()
+    # Decrescente inverte a ordem, com os 24 ausentes primeiro
+    page = shown(at)['part_number']
+    assert page.iloc[:24].isna().all() and page.iloc[24] == 'IM-6'
+
+    at.number_input(key='grid_page').set_value(3).run()
+    at.text_input(key='grid_search').input('im-3').run()
+    page = shown(at)
+    # A busca reduz as linhas e volta para uma página existente
+    assert set(page['part_number']) == {'IM-3'}
+    assert at.number_input(key='grid_page').value == 1
+    assert not at.exception
@@ -0,0 +1,106 @@
+import pytest
+import requests
+from api.stub_server import StubDatabase, create_app
+from results.query import ResultQuery
+from results.repository import ResultRepository
+
+
+BASE = 'http://localhost/api/v1/'
+KPIS = ('count', 'avg:force_N', 'avg:result_percentage')
+
+
+class FlaskClient:
+    """Substitui o ApiClient do repositório, respondendo pelo servidor local."""
+
+    def __init__(self, app):
+        self.app = app.test_client()
+        self.paths = []
+
+    def get_shared(self, url, decode, params=None, headers=None, auth=None):
+        path = url.removeprefix('http://localhost')
+        self.paths.append(path.partition('?')[0])
+        reply = self.app.get(path, query_string=params, headers={'Authorization': 'Bearer teste'})
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response._content = reply.data
+        return decode(response)
+
+
+def make_repository(monkeypatch, pushdown):
+    db = StubDatabase(results=300, seed=7)
+    app = create_app(db, pushdown=pushdown)
+    client = FlaskClient(app)
+    repository = object.__new__(ResultRepository)
+    repository._ResultRepository__client = client
+    repository._ResultRepository__headers = {}
+    repository._ResultRepository__auth = None
+    repository._ResultRepository__results_endpoint = f'{BASE}results/'
+    repository._ResultRepository__aggregate_endpoint = f'{BASE}results/aggregate/'
+    capabilities = client.app.get(
+        '/api/v1/results/capabilities/', headers={'Authorization': 'Bearer teste'}
+    ).get_json() if pushdown else {}
+    monkeypatch.setattr(ResultRepository, 'get_capabilities', lambda self: capabilities)
+    return repository, client, list(db.results.values())
+
+
+def test_query_translates_supported_filters_only():
+    query = ResultQuery({'sample_type': 'cone', 'sample_side': None}, fields=['id'])
+    params, pushed = query.to_params({'filters': ['sample_type'], 'fields': True})
+
+    assert params == {'sample_type': 'cone', 'fields': 'id'}
+    assert pushed
+    params, pushed = query.where(production_batch='L1').to_params({'filters': ['sample_type'], 'fields': True})
+    # O filtro não suportado fica para a avaliação local e o campo precisa vir na resposta
+    assert params['fields'] == 'id,production_batch'
+    assert not pushed
+
+
+def test_aggregate_params_require_every_filter_and_function():
+    query = ResultQuery({'sample_type': 'cone'}, aggregates=['count', 'avg:force_N'])
+
+    assert query.aggregate_params({'filters': ['sample_type'], 'aggregates': ['count', 'avg']}) == {
+        'sample_type': 'cone', 'aggregate': 'count,avg:force_N',
+    }
+    assert query.aggregate_params({'filters': [], 'aggregates': ['count', 'avg']}) is None
+    assert query.aggregate_params({'filters': ['sample_type'], 'aggregates': ['count']}) is None
+
+
+def test_unsupported_filter_or_aggregate_is_rejected():
+    with pytest.raises(ValueError):
+        ResultQuery({'comment': 'x'})
+    with pytest.raises(ValueError):
+        ResultQuery(aggregates=['median:force_N'])
+
+
+def test_aggregates_are_pushed_down_to_the_api(monkeypatch):
+    repository, client, results = make_repository(monkeypatch, pushdown=True)
+    query = ResultQuery({'part_number': 'IM-10002', 'sample_type': 'cone'}, aggregates=KPIS)
+
+    assert repository.can_aggregate(query)
+    values = repository.aggregate_results(query)
+
+    # Uma única requisição pequena, sem baixar os resultados
+    assert client.paths == ['/api/v1/results/aggregate/']
+    assert values == pytest.approx(query.aggregate(results))
+    assert values['count'] > 0
+
+
+def test_aggregates_fall_back_to_local_evaluation(monkeypatch):
+    repository, client, results = make_repository(monkeypatch, pushdown=False)
+    query = ResultQuery({'part_number': 'IM-10002', 'sample_type': 'cone'}, aggregates=KPIS)
+
+    assert not repository.can_aggregate(query)
+    values = repository.aggregate_results(query)
+
+    assert set(client.paths) == {'/api/v1/results/'}
+    assert values == pytest.approx(query.aggregate(results))
+
+
+def test_query_results_filters_on_the_api_or_locally(monkeypatch):
+    query = ResultQuery({'sample_side': 'direito', 'production_batch': None}, fields=['id', 'sample_side'])
+    pushed, _, results = make_repository(monkeypatch, pushdown=True)
+    expected = query.apply(results)
+
+    assert pushed.query_results(query) == expected
+    local, _, _ = make_repository(monkeypatch, pushdown=False)
+    assert local.query_results(query) == expected
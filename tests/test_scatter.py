@@ -0,0 +1,79 @@
+import warnings
+import numpy as np
+import pandas as pd
+from home.scatter import (
+    DENSITY_BINS, SCATTER_DENSITY_THRESHOLD, SCATTER_DOWNSAMPLE_THRESHOLD, SCATTER_MAX_POINTS, SCATTER_WEBGL_THRESHOLD,
+    build_scatter, downsample, scatter_mode, trendlines,
+)
+
+
+def frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'force_N': rng.uniform(400, 900, rows),
+        'result_percentage': rng.uniform(0, 100, rows),
+        'sample_type': rng.choice(['cone', 'centragem'], rows, p=[0.8, 0.2]),
+        'production_batch': 'L001',
+        'comment': '',
+    })
+
+
+def test_mode_follows_the_thresholds():
+    assert scatter_mode(SCATTER_WEBGL_THRESHOLD) == 'svg'
+    assert scatter_mode(SCATTER_WEBGL_THRESHOLD + 1) == 'webgl'
+    assert scatter_mode(SCATTER_DOWNSAMPLE_THRESHOLD + 1) == 'downsample'
+    assert scatter_mode(SCATTER_DENSITY_THRESHOLD) == 'downsample'
+    assert scatter_mode(SCATTER_DENSITY_THRESHOLD + 1) == 'density'
+
+
+def test_downsample_keeps_proportions_and_extremes():
+    df = frame(10_000)
+    sample = downsample(df, max_points=1_000)
+
+    assert 990 <= len(sample) <= 1_000
+    assert sample.index.is_unique
+    share = (sample['sample_type'] == 'cone').mean()
+    assert abs(share - (df['sample_type'] == 'cone').mean()) < 0.01
+    for _, group in df.groupby('sample_type'):
+        for column in ('force_N', 'result_percentage'):
+            assert group[column].idxmin() in sample.index
+            assert group[column].idxmax() in sample.index
+
+
+def test_downsample_is_reproducible_and_skips_small_frames():
+    df = frame(5_000)
+    assert downsample(df, max_points=500).index.equals(downsample(df, max_points=500).index)
+    assert downsample(df, max_points=5_000) is df
+
+
+def test_downsample_ignores_missing_values():
+    df = frame(2_000)
+    df.loc[df['sample_type'] == 'centragem', 'result_percentage'] = np.nan
+    df.loc[:9, 'force_N'] = np.nan
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        sample = downsample(df, max_points=200)
+
+    assert sample.index.isin(df.index).all()
+    assert df['force_N'].idxmax() in sample.index
+
+
+def test_trendlines_fit_all_rows_per_type():
+    df = frame(1_000)
+    df['result_percentage'] = 0.1 * df['force_N'] + 5
+
+    traces = trendlines(df)
+
+    assert {t.name for t in traces} == {'cone (OLS)', 'centragem (OLS)'}
+    for trace in traces:
+        np.testing.assert_allclose(trace.y, 0.1 * np.asarray(trace.x) + 5)
+
+
+def test_build_scatter_limits_points_sent():
+    df = frame(SCATTER_DOWNSAMPLE_THRESHOLD + 1)
+    _, shown = build_scatter(df, 'downsample')
+    _, bins = build_scatter(df, 'density')
+
+    assert shown <= SCATTER_MAX_POINTS
+    assert bins == DENSITY_BINS * DENSITY_BINS
@@ -0,0 +1,77 @@
+import json
+import requests
+import results.repository
+from results.repository import ResultSender
+
+
+ITEMS = [{'sample': 1, 'force_N': 500.0}, {'sample': 2, 'force_N': 600.0}]
+KEYS = ['key-1', 'key-2']
+
+
+def response(payload, status=200):
+    r = requests.Response()
+    r.status_code = status
+    r._content = json.dumps(payload).encode() if payload is not None else b''
+    return r
+
+
+class Client:
+    """Substitui o ApiClient: responde ao lote com `bulk` e aos envios individuais com 201."""
+
+    def __init__(self, bulk):
+        self.bulk = bulk
+        self.posts = []
+
+    def post(self, url, json=None, headers=None, auth=None):
+        self.posts.append((url.rsplit('/', 2)[-2], headers.get('Idempotency-Key')))
+        if url.endswith('bulk/'):
+            if isinstance(self.bulk, Exception):
+                raise self.bulk
+            return self.bulk
+        return response({'id': json['sample'], **json}, status=201)
+
+
+def send(monkeypatch, bulk):
+    client = Client(bulk)
+    monkeypatch.setattr(results.repository, 'get_client', lambda: client)
+    return ResultSender('token').send(ITEMS, KEYS), client.posts
+
+
+def test_bulk_accepts_any_2xx(monkeypatch):
+    outcomes, posts = send(monkeypatch, response([
+        {'status': 201, 'result': {'id': 1}},
+        {'status': 400, 'errors': {'force_N': ['inválido']}},
+    ], status=207))
+
+    assert [o['ok'] for o in outcomes] == [True, False]
+    assert outcomes[1]['status'] == 400
+    assert posts == [('bulk', None)]
+
+
+def test_bulk_error_gives_one_failure_per_item(monkeypatch):
+    outcomes, _ = send(monkeypatch, response({'detail': 'erro'}, status=503))
+
+    assert [o['status'] for o in outcomes] == [503, 503]
+    assert outcomes[0] is not outcomes[1]
+
+
+def test_connection_error_gives_failures_without_status(monkeypatch):
+    outcomes, _ = send(monkeypatch, requests.ConnectionError('queda'))
+
+    assert [(o['ok'], o['status']) for o in outcomes] == [(False, None), (False, None)]
+    assert outcomes[0] is not outcomes[1]
+
+
+def test_mismatched_bulk_response_falls_back_to_single_posts(monkeypatch):
+    outcomes, posts = send(monkeypatch, response([{'status': 201, 'result': {'id': 1}}]))
+
+    # Cada item é reenviado com a sua chave; a API descarta o que o lote já gravou
+    assert sorted(posts[1:]) == [('results', 'key-1'), ('results', 'key-2')]
+    assert [o['result']['id'] for o in outcomes] == [1, 2]
+
+
+def test_missing_bulk_endpoint_falls_back_to_single_posts(monkeypatch):
+    outcomes, posts = send(monkeypatch, response(None, status=404))
+
+    assert len(posts) == 3
+    assert all(o['ok'] for o in outcomes)
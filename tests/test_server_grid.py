@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from components.server_grid import GridSource, condition_mask
+
+
+def source(**kwargs):
+    df = pd.DataFrame({
+        'part_number': ['IM-2', None, 'IM-1', 'IM-2', 'IM-3'],
+        'force_N': [500.0, 450.0, np.nan, 600.0, 550.0],
+        'sample_taken_datetime': pd.to_datetime([
+            '2025-01-01 08:00', '2025-01-02 13:00', None, '2025-01-03 09:00', '2025-01-02 07:00',
+        ], utc=True),
+        'comment': ['Rebarba', '', 'ok', 'rebarba leve', None],
+    })
+    return GridSource(df, version=1, **kwargs)
+
+
+def test_sort_puts_missing_first_ascending_and_last_descending():
+    grid = source()
+
+    assert grid.positions([{'colId': 'force_N', 'sort': 'asc'}], {}).tolist() == [2, 1, 0, 4, 3]
+    assert grid.positions([{'colId': 'force_N', 'sort': 'desc'}], {}).tolist() == [3, 4, 0, 1, 2]
+    # Colunas desconhecidas são ignoradas
+    assert grid.positions([{'colId': 'x', 'sort': 'asc'}], {}).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_multi_column_sort_uses_the_first_column_as_primary():
+    grid = source()
+    sort_model = [{'colId': 'part_number', 'sort': 'desc'}, {'colId': 'force_N', 'sort': 'asc'}]
+
+    assert grid.positions(sort_model, {}).tolist() == [4, 0, 3, 2, 1]
+
+
+def test_text_number_and_date_conditions():
+    grid = source()
+    df = grid.df
+
+    contains = condition_mask(df['comment'], {'filterType': 'text', 'type': 'contains', 'filter': 'REBARBA'})
+    assert contains.tolist() == [True, False, False, True, False]
+    in_range = condition_mask(df['force_N'], {'filterType': 'number', 'type': 'inRange', 'filter': 500, 'filterTo': 550})
+    assert in_range.tolist() == [True, False, False, False, True]
+    # Datas comparam apenas o dia, sem fuso
+    same_day = condition_mask(df['sample_taken_datetime'], {'filterType': 'date', 'type': 'equals', 'dateFrom': '2025-01-02 00:00:00'})
+    assert same_day.tolist() == [False, True, False, False, True]
+    assert condition_mask(df['comment'], {'type': 'blank'}).tolist() == [False, True, False, False, True]
+    assert condition_mask(df['comment'], {'filterType': 'desconhecido'}) is None
+
+
+def test_filter_model_combines_columns_and_conditions():
+    grid = source()
+    filter_model = {
+        'force_N': {
+            'filterType': 'number', 'operator': 'OR',
+            'conditions': [
+                {'filterType': 'number', 'type': 'lessThan', 'filter': 480},
+                {'filterType': 'number', 'type': 'greaterThan', 'filter': 580},
+            ],
+        },
+        'part_number': {'filterType': 'set', 'values': ['IM-2']},
+        'inexistente': {'filterType': 'text', 'type': 'equals', 'filter': 'x'},
+    }
+
+    assert grid.positions([], filter_model).tolist() == [3]
+
+
+def test_queries_are_cached_up_to_the_limit():
+    grid = source(max_queries=2)
+    by_force = [{'colId': 'force_N', 'sort': 'asc'}]
+    first = grid.positions(by_force, {})
+
+    assert grid.positions(by_force, {}) is first
+    grid.positions([{'colId': 'force_N', 'sort': 'desc'}], {})
+    grid.positions([{'colId': 'part_number', 'sort': 'asc'}], {})
+    # A consulta mais antiga saiu do cache e é recalculada
+    again = grid.positions(by_force, {})
+    assert again is not first and again.tolist() == first.tolist()
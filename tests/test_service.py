@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+import pytest
+import api.cache
+import results.service
+from api.cache import EntityCache
+from results.aggregates import ResultAggregates
+from results.service import ResultService
+
+
+class State(dict):
+    """`st.session_state` falso: dicionário com acesso por atributo."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class Store:
+    def invalidate(self, name):
+        pass
+
+
+class Products:
+    def __init__(self):
+        self.products = [{'id': 1, 'part_number': 'IM-1'}, {'id': 2, 'part_number': 'IM-2'}]
+
+    def get_products(self):
+        return self.products
+
+
+class Repository:
+    def __init__(self):
+        self.results = [
+            {'id': i, 'product_id': 1 + i % 2, 'force_N': float(i), 'result_percentage': 50.0}
+            for i in range(1, 11)
+        ]
+        self.live_ids = None
+        self.changed = []
+        self.since = []
+        self.stored_changes = []
+
+    def load_stored_results(self):
+        return None
+
+    def iter_results(self, page_size=None):
+        yield [dict(r) for r in self.results[:5]]
+        yield [dict(r) for r in self.results[5:]]
+
+    def store_results(self, results):
+        return len(results)
+
+    def get_synced_submissions(self, since):
+        return [], since
+
+    def delete_result(self, result_id):
+        return True
+
+    def get_result_ids(self):
+        return self.live_ids
+
+    def get_results_since(self, field, value):
+        self.since.append((field, value))
+        return [dict(r) for r in self.changed]
+
+    def store_result_changes(self, changed, deleted_ids):
+        self.stored_changes.append(([r['id'] for r in changed], deleted_ids))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    st = SimpleNamespace(session_state=State(), error=lambda *args, **kwargs: None, rerun=lambda: None)
+    monkeypatch.setattr(results.service, 'st', st)
+    monkeypatch.setattr(api.cache, 'st', st)
+    monkeypatch.setattr(results.service, 'get_cache', lambda: EntityCache(Store()))
+    monkeypatch.setattr(results.service, 'ResultRepository', Repository)
+    monkeypatch.setattr(results.service, 'ProductService', Products)
+    return ResultService()
+
+
+def totals_by_part_number(service):
+    aggregates = service.get_aggregates()
+    return {key: group.rows for key, group in aggregates.groups['part_number'].items()}
+
+
+def test_cold_load_sets_part_numbers_before_aggregating(service):
+    results = service.get_results()
+
+    assert len(results) == 10
+    assert {r['part_number'] for r in results} == {'IM-1', 'IM-2'}
+    assert totals_by_part_number(service) == {'IM-1': 5, 'IM-2': 5}
+
+
+def test_product_change_rebuilds_part_numbers_and_aggregates(service):
+    service.get_results()
+    assert totals_by_part_number(service) == {'IM-1': 5, 'IM-2': 5}
+    version = service.get_data_version()
+
+    service.product_service.products[1]['part_number'] = 'IM-2B'
+    frame = service.get_result_frame()
+
+    assert service.get_data_version() > version
+    assert set(frame.df['part_number']) == {'IM-1', 'IM-2B'}
+    assert totals_by_part_number(service) == {'IM-1': 5, 'IM-2B': 5}
+    # Exclusões seguintes saem do grupo certo, sem deixar grupos órfãos
+    service.delete_result(3)
+    assert totals_by_part_number(service) == {'IM-1': 5, 'IM-2B': 4}
+
+
+def test_unchanged_catalog_keeps_version(service):
+    service.get_result_frame()
+    version = service.get_data_version()
+
+    service.get_results_with_products()
+    service.get_result_frame()
+
+    assert service.get_data_version() == version
+
+
+def sync_now(service, repository, changed, live_ids):
+    repository.changed, repository.live_ids = changed, live_ids
+    results.service.st.session_state.results_synced_at = 0  # Intervalo vencido
+    return service.get_results()
+
+
+def test_sync_fetches_only_the_delta_and_keeps_aggregates_current(service):
+    service.get_results()
+    service.get_aggregates()
+    repository = service.result_repository
+
+    merged = sync_now(service, repository, [
+        {'id': 4, 'product_id': 2, 'force_N': 400.0, 'result_percentage': 10.0},
+        {'id': 11, 'product_id': 1, 'force_N': 11.0, 'result_percentage': 50.0},
+    ], live_ids=[i for i in range(1, 12) if i != 2])
+
+    # Marca d'água pelo maior id (sem updated_at nos registros)
+    assert repository.since == [('id', 10)]
+    assert [r['id'] for r in merged] == [1, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+    assert merged[2]['force_N'] == 400.0 and merged[2]['part_number'] == 'IM-2'
+    # Só o delta vai para o disco
+    [(stored, deleted)] = repository.stored_changes
+    assert (sorted(stored), deleted) == ([4, 11], [2])
+    # Agregados incrementais iguais aos refeitos do zero
+    kpis, rebuilt = service.get_kpis(), ResultAggregates.from_results(merged).kpis()
+    assert kpis['total'] == rebuilt['total']
+    assert kpis['force_stats'] == pytest.approx(rebuilt['force_stats'])
+
+
+def test_sync_without_ids_endpoint_reloads_in_pages(service):
+    service.get_results()
+    repository = service.result_repository
+    repository.results[0]['force_N'] = 99.0
+
+    merged = sync_now(service, repository, [], live_ids=None)
+
+    assert repository.since == []
+    assert merged[0]['force_N'] == 99.0
+    assert service.get_kpis()['total'] == 10
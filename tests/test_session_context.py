@@ -0,0 +1,61 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+import home.session_context
+from home.session_context import supported
+
+
+def background_writes():
+    import threading
+    import streamlit as st
+    from home.session_context import attach, current_context, detached_context
+
+    def check(state):
+        if 'closed' in state:
+            raise PermissionError('sessão encerrada')
+
+    ctx = detached_context(current_context(), check)
+    refused = []
+
+    def work():
+        attach(ctx)
+        st.error('descartado: sem execução do script')
+        st.session_state.from_thread = 'ok'
+        st.session_state.closed = True
+        try:
+            st.session_state.after_close = 'não deveria gravar'
+        except PermissionError:
+            refused.append('after_close')
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    st.write(f'recusadas: {refused}')
+
+
+@pytest.fixture
+def clear_support_cache():
+    supported.cache_clear()
+    yield
+    supported.cache_clear()
+
+
+def test_installed_streamlit_is_supported(clear_support_cache):
+    # Falha ao atualizar o Streamlit: verifique o adaptador e ajuste STREAMLIT_VERSIONS
+    assert supported()
+
+
+def test_unverified_streamlit_version_disables_detached_context(monkeypatch, clear_support_cache):
+    monkeypatch.setattr(home.session_context.st, '__version__', '1.99.0')
+
+    assert not supported()
+    assert home.session_context.detached_context(object(), lambda state: None) is None
+
+
+def test_detached_context_writes_session_state_and_drops_ui():
+    at = AppTest.from_function(background_writes).run()
+
+    assert not at.exception
+    assert at.session_state['from_thread'] == 'ok'
+    assert 'after_close' not in at.session_state
+    assert not at.error
+    assert at.markdown[0].value == "recusadas: ['after_close']"
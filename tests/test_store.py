@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+from api.store import EntityStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache' / 'store.sqlite3')
+
+
+def test_entities_survive_a_restart_and_version_only_on_change(path):
+    store = EntityStore(path)
+    assert store.save('products', [{'id': 1}]) == 1
+    assert store.save('products', [{'id': 1}]) == 1
+    assert store.save('products', [{'id': 1}, {'id': 2}]) == 2
+
+    restarted = EntityStore(path)
+    assert restarted.load('products')['payload'] == [{'id': 1}, {'id': 2}]
+    assert restarted.load('samples') is None
+
+
+def test_records_are_saved_per_id_in_insertion_order(path):
+    store = EntityStore(path)
+    store.replace_records('results', [{'id': 3, 'v': 'a'}, {'id': 1, 'v': 'b'}, {'id': 2, 'v': 'c'}])
+
+    version = store.save_records('results', changed=[{'id': 1, 'v': 'B'}, {'id': 4, 'v': 'd'}], deleted_ids=[2])
+
+    entry = EntityStore(path).load_records('results')
+    assert entry['version'] == version == 2
+    # Alterados mantêm a posição; novos vão para o fim
+    assert entry['payload'] == [{'id': 3, 'v': 'a'}, {'id': 1, 'v': 'B'}, {'id': 4, 'v': 'd'}]
+
+
+def test_empty_delta_keeps_the_version(path):
+    store = EntityStore(path)
+    store.replace_records('results', [{'id': 1}])
+    assert store.save_records('results') == 1
+
+
+def test_invalidate_removes_both_formats(path):
+    store = EntityStore(path)
+    store.save('samples', [1])
+    store.replace_records('results', [{'id': 1}])
+
+    store.invalidate('samples')
+    store.invalidate('results')
+
+    assert store.load('samples') is None
+    assert store.load_records('results') is None
+
+
+def test_read_through_fetches_once_and_refreshes_stale_entries_in_background(path):
+    store = EntityStore(path)
+    calls = []
+    released = threading.Event()
+
+    def fetch():
+        calls.append(time.monotonic())
+        if len(calls) > 1:
+            released.wait(5)
+        return [{'id': len(calls)}]
+
+    assert store.read_through('products', fetch) == [{'id': 1}]
+    assert store.read_through('products', fetch) == [{'id': 1}]
+    assert len(calls) == 1
+
+    # Vencido: devolve o que está no disco e atualiza uma única vez em segundo plano
+    assert store.read_through('products', fetch, max_age=0) == [{'id': 1}]
+    assert store.read_through('products', fetch, max_age=0) == [{'id': 1}]
+    released.set()
+    deadline = time.monotonic() + 5
+    while store.load('products')['payload'] != [{'id': 2}]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert len(calls) == 2
+
+
+def test_failed_fetch_stores_nothing(path):
+    store = EntityStore(path)
+    assert store.read_through('assemblies', lambda: None) is None
+    assert store.load('assemblies') is None
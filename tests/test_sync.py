@@ -0,0 +1,58 @@
+from results.sync import high_water_mark, merge_results
+
+
+def record(id, updated_at=None, **fields):
+    return {'id': id, 'updated_at': updated_at, **fields}
+
+
+def test_high_water_mark_prefers_updated_at():
+    results = [
+        record(1, '2025-01-01T10:00:00Z'),
+        record(2, '2025-01-01T12:00:00+00:00'),
+        record(3, '2025-01-01T11:00:00Z'),
+    ]
+    assert high_water_mark(results) == ('updated_at', '2025-01-01T12:00:00+00:00')
+
+
+def test_high_water_mark_falls_back_to_id():
+    assert high_water_mark([{'id': 4}, {'id': 9}, {'id': 2}]) == ('id', 9)
+    assert high_water_mark([]) == (None, None)
+
+
+def test_merge_replaces_changed_in_place_and_appends_new():
+    results = [record(1, force_N=10), record(2, force_N=20), record(3, force_N=30)]
+    changed = [record(4, force_N=40), record(2, force_N=25)]
+
+    merged = merge_results(results, changed)
+
+    assert [r['id'] for r in merged] == [1, 2, 3, 4]
+    assert [r['force_N'] for r in merged] == [10, 25, 30, 40]
+    # A lista original não é alterada
+    assert results[1]['force_N'] == 20
+
+
+def test_merge_drops_records_missing_from_live_ids():
+    results = [record(1), record(2), record(3)]
+
+    merged = merge_results(results, [record(5)], live_ids=[1, 3, 5])
+
+    assert [r['id'] for r in merged] == [1, 3, 5]
+
+
+def test_merge_reports_every_change():
+    results = [record(1, force_N=10), record(2, force_N=20)]
+    changes = []
+
+    merge_results(
+        results,
+        [record(2, force_N=21), record(3, force_N=30)],
+        live_ids=[2, 3],
+        on_change=lambda old, new: changes.append((old and old['id'], new and new['id'])),
+    )
+
+    assert sorted(changes, key=str) == sorted([(2, 2), (None, 3), (1, None)], key=str)
+
+
+def test_merge_without_changes_keeps_results():
+    results = [record(1), record(2)]
+    assert merge_results(results, []) == results
@@ -0,0 +1,60 @@
+import pandas as pd
+from results.frame import ResultFrame
+from results.views import FilteredView, FilteredViewCache, normalize_filters
+
+
+def view(rows, key=None, text='x'):
+    frame = ResultFrame(pd.DataFrame({'force_N': [1.0] * rows, 'comment': [text] * rows}))
+    return FilteredView(frame, stats={}, key=key)
+
+
+def test_normalize_filters_ignores_order():
+    assert normalize_filters(b=['2', '1'], a=None) == normalize_filters(a=None, b=['1', '2'])
+    assert normalize_filters(a='x') == (('a', ('x',)),)
+
+
+def test_view_size_counts_text_and_derived_values():
+    short, long = view(100, text='x'), view(100, text='x' * 1000)
+    assert long.nbytes > short.nbytes + 100 * 900
+
+    before = short.nbytes
+    short.derived('double', lambda df: df['force_N'] * 2)
+    short.derived('double', lambda df: df['force_N'] * 3)
+    assert short.nbytes > before
+    assert short.derived('double', None).iloc[0] == 2.0
+
+
+def test_cache_evicts_least_recently_used_above_the_limit():
+    size = view(1000).nbytes
+    cache = FilteredViewCache(max_bytes=int(size * 2.5))
+    for key in ('a', 'b'):
+        cache.put(key, view(1000, key))
+
+    cache.get('a')  # 'b' passa a ser a menos recente
+    cache.put('c', view(1000, 'c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_cache_keeps_the_latest_view_even_above_the_limit():
+    cache = FilteredViewCache(max_bytes=1)
+    cache.put('a', view(10, 'a'))
+    cache.put('b', view(10, 'b'))
+
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+    assert cache.stats()['views'] == 1
+
+
+def test_cache_counts_hits_and_misses():
+    cache = FilteredViewCache()
+    cache.put('a', view(1, 'a'))
+    cache.get('a')
+    cache.get('a')
+    cache.get('z')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['views']) == (2, 1, 1)
@@ -0,0 +1,116 @@
+import threading
+from types import SimpleNamespace
+import pytest
+import home.warmup
+from home.warmup import WARMUP_STAGES, Warmup, WarmupCancelled, _check_generation
+
+
+class State(dict):
+    """`st.session_state` falso: dicionário com acesso por atributo."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class Service:
+    """Serviço falso: registra as chamadas e executa o gancho de cada uma."""
+
+    calls = []
+    hooks = {}
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            Service.calls.append(name)
+            Service.hooks.get(name, lambda: None)()
+            return []
+        return call
+
+
+@pytest.fixture
+def state(monkeypatch):
+    state = State()
+    monkeypatch.setattr(home.warmup, 'st', SimpleNamespace(session_state=state))
+    monkeypatch.setattr(home.warmup, 'attach', lambda ctx: None)
+    monkeypatch.setattr(home.warmup, 'build_default_figures', lambda view: Service.calls.append('figures'))
+    for name in ('ResultService', 'ProductService', 'SampleService', 'AssemblyService'):
+        monkeypatch.setattr(home.warmup, name, Service)
+    Service.calls, Service.hooks = [], {}
+    return state
+
+
+def test_stages_run_in_order_for_the_current_generation(state):
+    state.warmup_generation = 'g1'
+    warmup = Warmup('g1')
+
+    warmup.run(ctx=None)
+
+    assert all(warmup.ready(stage) for stage in WARMUP_STAGES)
+    assert not warmup.running and not warmup.cancelled
+    assert Service.calls.index('get_results') < Service.calls.index('get_result_frame') < Service.calls.index('figures')
+
+
+def test_logout_during_a_stage_skips_the_next_ones(state):
+    state.warmup_generation = 'g1'
+    Service.hooks['get_results'] = lambda: state.pop('warmup_generation')
+    warmup = Warmup('g1')
+
+    warmup.run(ctx=None)
+
+    assert warmup.cancelled
+    assert warmup.ready('data') and not warmup.ready('tables')
+    assert 'get_result_frame' not in Service.calls and 'figures' not in Service.calls
+    # As páginas não ficam esperando etapas que não vão rodar
+    assert not warmup.wait('figures', timeout=0)
+
+
+def test_writes_are_refused_once_the_generation_changes(state):
+    state.warmup_generation = 'g1'
+    _check_generation(state, 'g1')
+
+    state.warmup_generation = 'g2'
+    with pytest.raises(WarmupCancelled):
+        _check_generation(state, 'g1')
+    home.warmup.cancel_warmup()
+    with pytest.raises(WarmupCancelled):
+        _check_generation(state, 'g2')
+
+
+def test_cancel_warmup_stops_the_session_warmup(state):
+    state.warmup_generation = 'g1'
+    state.warmup = Warmup('g1')
+
+    home.warmup.cancel_warmup()
+
+    assert 'warmup_generation' not in state
+    assert state.warmup.cancelled and not state.warmup.running
+    assert not home.warmup.wait_for_warmup('tables')
+
+
+def test_wait_timeout_hands_the_load_to_the_page(state):
+    state.warmup_generation = 'g1'
+    released = threading.Event()
+    Service.hooks['get_results'] = lambda: released.wait(5)
+    warmup = state.warmup = Warmup('g1')
+    thread = threading.Thread(target=warmup.run, args=(None,))
+    thread.start()
+
+    assert not home.warmup.wait_for_warmup('tables', timeout=0.05)
+    assert warmup.cancelled
+    released.set()
+    thread.join(5)
+    # A etapa em andamento termina, mas as seguintes ficam para a página
+    assert warmup.ready('data') and not warmup.ready('tables')
+
+
+def test_start_warmup_without_a_supported_context_does_nothing(state, monkeypatch):
+    monkeypatch.setattr(home.warmup, 'current_context', lambda: object())
+    monkeypatch.setattr(home.warmup, 'detached_context', lambda ctx, check: None)
+
+    assert home.warmup.start_warmup() is None
+    assert 'warmup_generation' not in state and 'warmup' not in state